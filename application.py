@@ -1,5 +1,7 @@
 import os
-from flask import Flask, jsonify, request
+import time
+import uuid
+from flask import Flask, jsonify, request, g
 from flask_cors import CORS
 from routes.identity_card_routes import cin_bp
 from routes.driving_license_routes import permis_bp
@@ -7,51 +9,119 @@ from routes.vehicle_registration_routes import gris_bp
 from auth.authentication_routes import auth_bp
 from charts.chart_routes import charts_bp
 from middlewares.decorators import token_required
+from middlewares.concurrency import register_overload_handler
+from middlewares.compression import register_compression
+from middlewares.quotas import usage as quota_usage
+from database.user_stats.user_stats_database_service import get_user_stats
 from swagger_configuration import setup_swagger
-from prometheus_client import Counter, generate_latest, CONTENT_TYPE_LATEST
+from config.profiling_config import ProfilingConfig
+from prometheus_client import CONTENT_TYPE_LATEST
+from utils.metrics import requests_total, http_request_duration_seconds, http_requests_in_flight, render_latest
+from utils.json_provider import OrjsonProvider
+from utils.logger import get_logger, bind_request, unbind_request
+from config.logging_config import LoggingConfig
+from config.tracing_config import TracingConfig
+from utils.tracing import start_request_span, end_request_span
 
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 CORS_ORIGIN = os.getenv("CORS_ORIGIN", "https://share-in-frontend-ai-agent.vercel.app")
 
+logger = get_logger("http")
+
 def create_app():
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 
     # Configuration CORS complète pour Railway → Vercel
     CORS(app, resources={r"/*": {
         "origins": CORS_ORIGIN,
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD", "PATCH"],
-        "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "Accept"],
-        "expose_headers": ["Content-Type", "Authorization"],
+        "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "Accept", "Idempotency-Key",
+                          LoggingConfig.REQUEST_ID_HEADER],
+        "expose_headers": ["Content-Type", "Authorization", "Retry-After", "Idempotent-Replayed",
+                           "X-Duplicate-Of", LoggingConfig.REQUEST_ID_HEADER],
         "supports_credentials": True,
         "max_age": 3600
     }})
     
-    requests_total = Counter(
-        "requests_total", 
-        "Total HTTP requests", 
-        ["method", "endpoint"]
-    )
+    def endpoint_label():
+        # Le gabarit de route (ex: /cin/process) garde une cardinalité bornée
+        return request.url_rule.rule if request.url_rule else "unmatched"
 
     @app.before_request
     def before_request():
+        g.request_start = time.perf_counter()
+        # Identifiant transmis par le proxy ou le front, sinon généré : repris dans chaque ligne de log
+        g.request_id = request.headers.get(LoggingConfig.REQUEST_ID_HEADER) or uuid.uuid4().hex
+        bind_request(g.request_id)
+        if TracingConfig.ENABLED and request.path not in TracingConfig.EXCLUDED_PATHS:
+            g.trace_span = start_request_span(
+                f"{request.method} {endpoint_label()}",
+                request.headers.get("traceparent"),
+                {"http.request.method": request.method, "http.route": endpoint_label(), "request.id": g.request_id},
+            )
+        g.in_flight_labels = (endpoint_label(), request.method)
+        http_requests_in_flight.labels(*g.in_flight_labels).inc()
+
         # Gérer les requêtes OPTIONS (preflight)
         if request.method == 'OPTIONS':
             response = jsonify({'status': 'ok'})
             response.headers.add('Access-Control-Allow-Origin', CORS_ORIGIN)
-            response.headers.add('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With, Accept')
+            response.headers.add('Access-Control-Allow-Headers',
+                                 f'Content-Type, Authorization, X-Requested-With, Accept, Idempotency-Key, {LoggingConfig.REQUEST_ID_HEADER}')
             response.headers.add('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
             response.headers.add('Access-Control-Max-Age', '3600')
             return response, 200
         
         requests_total.labels(
             method=request.method,
-            endpoint=request.path
+            endpoint=endpoint_label()
         ).inc()
 
+    @app.after_request
+    def after_request(response):
+        start = g.pop("request_start", None)
+        if start is not None:
+            duration = time.perf_counter() - start
+            http_request_duration_seconds.labels(
+                endpoint=endpoint_label(),
+                method=request.method,
+                status=str(response.status_code)
+            ).observe(duration)
+            logger.info("Requête traitée", extra={
+                "method": request.method,
+                "endpoint": endpoint_label(),
+                "status": response.status_code,
+                "duration_ms": round(duration * 1000, 2),
+                "sample_rate": LoggingConfig.ACCESS_SAMPLE_RATE if response.status_code < 500 else None,
+            })
+        if "request_id" in g:
+            response.headers[LoggingConfig.REQUEST_ID_HEADER] = g.request_id
+        trace_span = g.get("trace_span")
+        if trace_span is not None:
+            trace_span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 500:
+                trace_span.set_error(f"HTTP {response.status_code}")
+        return response
+
+    @app.teardown_request
+    def teardown_request(exc):
+        # Exécuté même si une exception interrompt la requête
+        in_flight_labels = g.pop("in_flight_labels", None)
+        if in_flight_labels is not None:
+            http_requests_in_flight.labels(*in_flight_labels).dec()
+        unbind_request()
+        # Fin du span racine ici : après une réponse en streaming ou une exception
+        trace_span = g.pop("trace_span", None)
+        if trace_span is not None:
+            end_request_span(trace_span, exc)
+
     
+    register_overload_handler(app)
+    register_compression(app)
     setup_swagger(app)
 
     app.register_blueprint(cin_bp, url_prefix="/cin")
@@ -60,6 +130,16 @@ def create_app():
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(charts_bp, url_prefix="/charts")
 
+    if ProfilingConfig.ENABLED:
+        # Import et hooks uniquement si activé : aucun surcoût sinon
+        from profiling.profiling_routes import profiling_bp
+        from profiling.request_profiler import start_request_profile, finish_request_profile, abort_request_profile
+
+        app.register_blueprint(profiling_bp, url_prefix="/admin/profile")
+        app.before_request(start_request_profile)
+        app.after_request(finish_request_profile)
+        app.teardown_request(abort_request_profile)
+
 
     @app.route("/me")
     @token_required
@@ -79,11 +159,8 @@ def create_app():
             "created_at": getattr(current_user, 'created_at', None),
             "last_login": getattr(current_user, 'last_login', None),
             "stats": {
-                "total_cards_processed": 35,
-                "identity_cards": 12,
-                "driving_licenses": 8,
-                "registration_cards": 15,
-                "last_activity": "Il y a 2 heures"
+                **get_user_stats(current_user.id),
+                "quota": quota_usage(current_user)
             }
         })
         
@@ -122,7 +199,7 @@ def create_app():
     
     @app.route("/metrics")
     def metrics():
-        return generate_latest(), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+        return render_latest(), 200, {'Content-Type': CONTENT_TYPE_LATEST}
     
     return app
 
@@ -1,5 +1,5 @@
-﻿import bcrypt
-from sqlalchemy import Column, Integer, String, create_engine
+﻿from auth.password_hashing import hash_password
+from sqlalchemy import Column, DateTime, Integer, String, create_engine, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config.database_config import DatabaseConfig
@@ -14,19 +14,23 @@ class UserDB(Base):
     hashed_password = Column(String, nullable=False)
     full_name = Column(String, nullable=True)
 
-    def verify_password(self, plain_password: str) -> bool:
-        return bcrypt.checkpw(plain_password.encode(), self.hashed_password.encode())
-
     @classmethod
     def create(cls, session, email: str, plain_password: str, full_name: str = None):
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(plain_password.encode(), salt).decode()
-        user = cls(email=email, hashed_password=hashed, full_name=full_name)
+        user = cls(email=email, hashed_password=hash_password(plain_password), full_name=full_name)
         session.add(user)
         session.commit()
         session.refresh(user)
         return user
 
+class RevokedTokenDB(Base):
+    """Jetons révoqués (logout, rotation des refresh tokens), conservés jusqu'à leur expiration."""
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    user_id = Column(Integer, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=False, server_default=func.now(), default=func.now(), index=True)
+
 # Create engine with connection pooling and SSL configuration
 engine = create_engine(
     DatabaseConfig.get_db_url(),
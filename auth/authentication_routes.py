@@ -3,14 +3,24 @@ from auth.authentication_model import UserDB
 import jwt
 from datetime import datetime, timedelta
 from utils.config import Config
-import bcrypt
 from auth.authentication_model import SessionLocal
-from middlewares.jwt_manager import create_access_token, JWT_SECRET, JWT_ALGORITHM
+from auth.password_hashing import hash_password, verify_password
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from middlewares.concurrency import StageOverloadedError
+from middlewares.rate_limiter import rate_limited
+from config.rate_limit_config import RateLimitConfig
+from utils.logger import get_logger
+from middlewares.jwt_manager import (
+    create_access_token, create_token_pair, decode_token, revoke_token, claim_token, is_expired, REFRESH_TOKEN
+)
 
 auth_bp = Blueprint("auth_bp", __name__)
+logger = get_logger(__name__)
 
 
 @auth_bp.route("/register", methods=["POST"])
+@rate_limited("register", RateLimitConfig.REGISTER_PER_IP)
 def register():
     data = request.get_json() or {}
     email = data.get("email")
@@ -22,19 +32,34 @@ def register():
 
     session = SessionLocal()
     try:
-        existing = session.query(UserDB).filter_by(email=email).first()
-        if existing:
-            return jsonify({"error": "Email already registered"}), 400
+        existing = session.query(UserDB.id).filter_by(email=email).first()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        session.close()
+    if existing:
+        return jsonify({"error": "Email already registered"}), 400
 
-        salt   = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(pwd.encode(), salt).decode()
+    # Calcul bcrypt dans le pool de hachage (503 si saturé), hors session
+    try:
+        hashed = hash_password(pwd)
+    except StageOverloadedError:
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
+    session = SessionLocal()
+    try:
         new_user = UserDB(email=email, hashed_password=hashed, full_name=full_name)
         session.add(new_user)
         session.commit()
 
         return jsonify({"message": "User registered successfully"}), 201
 
+    except IntegrityError:
+        # Inscription concurrente avec le même email
+        session.rollback()
+        return jsonify({"error": "Email already registered"}), 400
     except Exception as e:
         session.rollback()
         return jsonify({"error": str(e)}), 500
@@ -43,6 +68,7 @@ def register():
         session.close()
 
 @auth_bp.route("/login", methods=["POST"])
+@rate_limited("login", RateLimitConfig.LOGIN_PER_IP, RateLimitConfig.LOGIN_PER_ACCOUNT)
 def login():
     data = request.get_json() or {}
     email = data.get("email")
@@ -51,25 +77,100 @@ def login():
     if not email or not pwd:
         return jsonify({"error": "Email and password required"}), 400
 
+    # Session rendue au pool avant le calcul bcrypt : aucune connexion n'est
+    # immobilisée pendant les ~100 ms de vérification
     session = SessionLocal()
     try:
-        user = session.query(UserDB).filter_by(email=email).first()
-        if not user or not user.verify_password(pwd):
-            return jsonify({"error": "Invalid credentials"}), 401
+        user = session.query(UserDB.id, UserDB.hashed_password).filter_by(email=email).first()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        session.close()
 
-        token = create_access_token(user.id)
+    try:
+        valid, rehashed = verify_password(pwd, user.hashed_password) if user else (False, None)
+    except StageOverloadedError:
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    if not valid:
+        return jsonify({"error": "Invalid credentials"}), 401
 
-        return jsonify({"token": token}), 200
+    if rehashed is not None:
+        # Hash recalculé avec le nouveau BCRYPT_ROUNDS ; ignoré si le mot de
+        # passe a changé entre-temps
+        session = SessionLocal()
+        try:
+            session.execute(
+                update(UserDB)
+                .where(UserDB.id == user.id, UserDB.hashed_password == user.hashed_password)
+                .values(hashed_password=rehashed)
+            )
+            session.commit()
+        except Exception as e:
+            # L'ancien hash reste valide : la connexion n'échoue pas pour autant
+            session.rollback()
+            logger.warning("Mise à jour du hash échouée", extra={"user_id": user.id, "error": str(e)})
+        finally:
+            session.close()
+
+    return jsonify(create_token_pair(user.id)), 200
 
+@auth_bp.route("/refresh", methods=["POST"])
+def refresh():
+    """Échange un refresh token contre une nouvelle paire ; l'ancien est révoqué (rotation)."""
+    data = request.get_json(silent=True) or {}
+    refresh_token = data.get("refresh_token")
+    if not refresh_token:
+        return jsonify({"error": "refresh_token requis"}), 400
+
+    try:
+        payload = decode_token(refresh_token, REFRESH_TOKEN)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return jsonify({"error": str(e)}), 401
 
+    session = SessionLocal()
+    try:
+        user = session.get(UserDB, int(payload["sub"]))
     finally:
         session.close()
+    if not user:
+        return jsonify({"error": "Utilisateur introuvable"}), 401
+
+    # Révocation et vérification en une insertion : de deux refresh
+    # concurrents avec le même jeton, un seul obtient une nouvelle paire
+    if not claim_token(payload):
+        return jsonify({"error": "Le token a été révoqué"}), 401
+    return jsonify(create_token_pair(user.id)), 200
 
 @auth_bp.route("/logout", methods=["POST"])
 def logout():
-    return jsonify({"message": "Logged out (client should discard token)"}), 200
+    """
+    Révoque le token d'accès et, s'il est fourni, le refresh token.
+
+    Un token d'accès expiré (signature valide) est accepté : le refresh
+    token de la session est révoqué quand même.
+    """
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("Bearer "):
+        return jsonify({"error": "Token manquant"}), 401
+
+    try:
+        payloads = [decode_token(auth_header.split(" ")[1], allow_expired=True)]
+        refresh_token = (request.get_json(silent=True) or {}).get("refresh_token")
+        if refresh_token:
+            payloads.append(decode_token(refresh_token, REFRESH_TOKEN))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 401
+
+    if any(p["sub"] != payloads[0]["sub"] for p in payloads):
+        return jsonify({"error": "Le refresh token n'appartient pas à cet utilisateur"}), 400
+
+    for payload in payloads:
+        # Un jeton expiré est déjà refusé partout : inutile de le stocker
+        if not is_expired(payload):
+            revoke_token(payload)
+    return jsonify({"message": "Déconnexion effectuée"}), 200
 
 @auth_bp.route("/auth0-exchange", methods=["POST"])
 def auth0_exchange():
@@ -0,0 +1,164 @@
+"""
+Hachage et vérification bcrypt hors du thread de la requête.
+
+Les calculs sont exécutés dans un ProcessPoolExecutor propre à chaque worker
+Gunicorn, créé au premier appel (donc après le fork du worker). Le nombre de
+demandes en cours (calcul + file d'attente) est borné par un sémaphore non
+bloquant : au-delà, StageOverloadedError est levée immédiatement et le
+gestionnaire commun répond 503 avec Retry-After, sans attendre de slot.
+
+Les processus du pool sont démarrés en mode "spawn" : un fork depuis un
+worker multi-thread (gthread) ou gevent peut recopier des verrous tenus.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+import bcrypt
+from config.password_hashing_config import PasswordHashingConfig
+from middlewares.concurrency import StageOverloadedError
+from utils.tracing import record_span, span
+from utils.metrics import (
+    password_hash_duration_seconds,
+    password_hash_queue_wait_seconds,
+    password_rehash_total,
+    stage_in_flight,
+    stage_rejections_total,
+)
+
+STAGE = "password_hash"
+
+
+def cost_factor(hashed: bytes) -> int:
+    """Facteur de coût d'un hash bcrypt ($2b$12$... -> 12)."""
+    return int(hashed.split(b"$")[2])
+
+
+# Fonctions exécutées dans les processus du pool : horodatage de début pour
+# mesurer l'attente en file (time.time() est commun aux processus)
+
+def _hash(plain: bytes, rounds: int, submitted_at: float):
+    started_at = time.time()
+    hashed = bcrypt.hashpw(plain, bcrypt.gensalt(rounds))
+    return hashed, started_at - submitted_at, time.time() - started_at
+
+
+def _verify(plain: bytes, hashed: bytes, rounds: int, submitted_at: float):
+    started_at = time.time()
+    valid = bcrypt.checkpw(plain, hashed)
+    rehashed = None
+    if valid and cost_factor(hashed) != rounds:
+        # Le mot de passe en clair n'est disponible qu'au login : on en profite
+        rehashed = bcrypt.hashpw(plain, bcrypt.gensalt(rounds))
+    return (valid, rehashed), started_at - submitted_at, time.time() - started_at
+
+
+class PasswordHasher:
+    def __init__(self, pool_size: int, max_queue: int, timeout: float, retry_after: int):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(pool_size + max_queue)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def _get_executor(self):
+        with self._lock:
+            # Un pool hérité d'un autre processus (preload_app) est inutilisable
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.pool_size,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, _future=None):
+        stage_in_flight.labels(stage=STAGE).dec()
+        self._slots.release()
+
+    def run(self, operation: str, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            stage_rejections_total.labels(stage=STAGE).inc()
+            raise StageOverloadedError(STAGE, self.retry_after)
+        stage_in_flight.labels(stage=STAGE).inc()
+
+        with span(STAGE, {"operation": operation}):
+            executor = None
+            submitted_at = time.time()
+            try:
+                executor = self._get_executor()
+                future = executor.submit(fn, *args, submitted_at)
+            except BaseException:
+                self._release()
+                raise
+            # Le slot est rendu à la fin du calcul, même si la requête a abandonné
+            future.add_done_callback(self._release)
+
+            try:
+                result, queue_wait, duration = future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                stage_rejections_total.labels(stage=STAGE).inc()
+                raise StageOverloadedError(STAGE, self.retry_after)
+            except BrokenProcessPool:
+                # Processus du pool tué (OOM...) : un nouveau pool sera créé au prochain appel
+                self._reset(executor)
+                raise
+
+            password_hash_queue_wait_seconds.labels(operation=operation).observe(max(queue_wait, 0.0))
+            password_hash_duration_seconds.labels(operation=operation).observe(duration)
+            # Calcul mesuré dans le processus du pool, rattaché à la trace de la requête
+            started_at = submitted_at + max(queue_wait, 0.0)
+            record_span(f"{STAGE}.compute", started_at, started_at + duration, {"operation": operation})
+            return result
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._pid == os.getpid():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_hasher = PasswordHasher(
+    PasswordHashingConfig.POOL_SIZE,
+    PasswordHashingConfig.MAX_QUEUE,
+    PasswordHashingConfig.TIMEOUT_SECONDS,
+    PasswordHashingConfig.RETRY_AFTER_SECONDS,
+)
+atexit.register(_hasher.shutdown)
+
+
+def hash_password(plain_password: str) -> str:
+    hashed = _hasher.run("hash", _hash, plain_password.encode(), PasswordHashingConfig.BCRYPT_ROUNDS)
+    return hashed.decode()
+
+
+def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Vérifie le mot de passe.
+
+    Retourne (mot de passe correct, nouveau hash) ; le nouveau hash n'est
+    calculé que si le facteur de coût du hash stocké diffère de BCRYPT_ROUNDS.
+    """
+    valid, rehashed = _hasher.run(
+        "verify",
+        _verify,
+        plain_password.encode(),
+        hashed_password.encode(),
+        PasswordHashingConfig.BCRYPT_ROUNDS,
+    )
+    if rehashed is None:
+        return valid, None
+    password_rehash_total.inc()
+    return valid, rehashed.decode()
@@ -0,0 +1,157 @@
+"""
+Liste de révocation des JWT, vérifiée sans requête SQL par requête HTTP.
+
+Chaque worker garde en mémoire un filtre de Bloom des `jti` révoqués :
+- jti absent du filtre (cas normal) : jeton valide, aucun accès base ;
+- jti présent : confirmation exacte, d'abord dans le petit ensemble des
+  révocations déjà confirmées par le worker, puis en base (faux positif
+  du filtre ou révocation faite ailleurs).
+
+Le filtre est resynchronisé depuis la table revoked_tokens au plus toutes
+les REVOCATION_SYNC_SECONDS (lignes ajoutées depuis la dernière
+synchronisation) : une révocation faite par un autre worker est donc
+appliquée après ce délai au plus. Un filtre de Bloom ne permet pas de
+retirer un élément : il est reconstruit toutes les
+REVOCATION_REBUILD_SECONDS, après suppression des jetons expirés.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+from auth.authentication_model import RevokedTokenDB, SessionLocal
+from config.authentication_config import AuthConfig
+from database.date_buckets import utc_now
+from utils.bloom_filter import BloomFilter
+
+# Une ligne committée juste après la synchronisation peut porter un
+# revoked_at antérieur au dernier vu : la relecture chevauche cette marge
+SYNC_OVERLAP = timedelta(seconds=60)
+# Taille maximale de l'ensemble exact des révocations confirmées
+MAX_CONFIRMED = 10000
+
+
+class RevocationList:
+    def __init__(self, capacity: int, error_rate: float, sync_interval: float, rebuild_interval: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._confirmed = set()
+        self._watermark = None
+        self._last_sync = float("-inf")
+        self._last_rebuild = float("-inf")
+        self._lock = threading.Lock()
+
+    def _confirm(self, jti: str) -> None:
+        if len(self._confirmed) >= MAX_CONFIRMED:
+            self._confirmed.clear()
+        self._confirmed.add(jti)
+
+    def _rebuild(self, session) -> None:
+        now = utc_now()
+        session.execute(delete(RevokedTokenDB).where(RevokedTokenDB.expires_at < now))
+        session.commit()
+
+        active = session.execute(select(func.count()).select_from(RevokedTokenDB)).scalar_one()
+        bloom = BloomFilter(max(self.capacity, 2 * active), self.error_rate)
+        watermark = None
+        rows = session.execute(select(RevokedTokenDB.jti, RevokedTokenDB.revoked_at)).yield_per(10000)
+        for jti, revoked_at in rows:
+            bloom.add(jti)
+            if watermark is None or revoked_at > watermark:
+                watermark = revoked_at
+        # Révocations locales faites pendant la reconstruction
+        for jti in list(self._confirmed):
+            bloom.add(jti)
+
+        self._bloom, self._watermark = bloom, watermark
+        self._last_rebuild = time.monotonic()
+
+    def _sync(self, session) -> None:
+        if self._watermark is None:
+            self._rebuild(session)
+            return
+        statement = select(RevokedTokenDB.jti, RevokedTokenDB.revoked_at).where(
+            RevokedTokenDB.revoked_at >= self._watermark - SYNC_OVERLAP
+        )
+        for jti, revoked_at in session.execute(statement):
+            if jti not in self._bloom:
+                self._bloom.add(jti)
+            if revoked_at > self._watermark:
+                self._watermark = revoked_at
+
+    def refresh(self, force: bool = False) -> None:
+        """Resynchronise depuis la base si l'intervalle est écoulé (un seul thread à la fois)."""
+        now = time.monotonic()
+        if not force and now - self._last_sync < self.sync_interval:
+            return
+        if not self._lock.acquire(blocking=force):
+            return
+        try:
+            session = SessionLocal()
+            try:
+                if now - self._last_rebuild >= self.rebuild_interval or self._bloom.saturated:
+                    self._rebuild(session)
+                else:
+                    self._sync(session)
+            finally:
+                session.close()
+            self._last_sync = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def is_revoked(self, jti: str) -> bool:
+        self.refresh()
+        if jti not in self._bloom:
+            return False
+        if jti in self._confirmed:
+            return True
+        session = SessionLocal()
+        try:
+            revoked = session.get(RevokedTokenDB, jti) is not None
+        finally:
+            session.close()
+        if revoked:
+            self._confirm(jti)
+        return revoked
+
+    def revoke(self, jti: str, expires_at: datetime, user_id: int = None) -> None:
+        session = SessionLocal()
+        try:
+            # merge : révoquer deux fois le même jeton n'est pas une erreur
+            session.merge(RevokedTokenDB(jti=jti, user_id=user_id, expires_at=expires_at))
+            session.commit()
+        finally:
+            session.close()
+        self._bloom.add(jti)
+        self._confirm(jti)
+
+    def claim(self, jti: str, expires_at: datetime, user_id: int = None) -> bool:
+        """
+        Révoque le jeton en une seule insertion ; retourne False s'il l'était
+        déjà. La clé primaire départage deux usages concurrents du même jeton
+        (rotation des refresh tokens) : un seul obtient True.
+        """
+        session = SessionLocal()
+        try:
+            session.add(RevokedTokenDB(jti=jti, user_id=user_id, expires_at=expires_at))
+            session.commit()
+            claimed = True
+        except IntegrityError:
+            session.rollback()
+            claimed = False
+        finally:
+            session.close()
+        self._bloom.add(jti)
+        self._confirm(jti)
+        return claimed
+
+
+revocation_list = RevocationList(
+    AuthConfig.REVOCATION_BLOOM_CAPACITY,
+    AuthConfig.REVOCATION_BLOOM_ERROR_RATE,
+    AuthConfig.REVOCATION_SYNC_SECONDS,
+    AuthConfig.REVOCATION_REBUILD_SECONDS,
+)
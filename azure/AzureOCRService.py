@@ -4,6 +4,7 @@ from typing import Optional
 from dotenv import load_dotenv
 from azure.ai.formrecognizer import DocumentAnalysisClient
 from azure.core.credentials import AzureKeyCredential
+from utils.instrumentation import record_ocr_result
 
 load_dotenv()
 
@@ -18,7 +19,7 @@ class AzureOCRService:
         self.client = DocumentAnalysisClient(
             endpoint=endpoint, credential=AzureKeyCredential(key))
 
-    def extract_text(self, image_path: str) -> str:
+    def extract_text(self, image_path: str, document_type: str = "unknown") -> str:
         with open(image_path, "rb") as f:
             poller = self.client.begin_analyze_document("prebuilt-read", f)
         result = poller.result()
@@ -27,6 +28,7 @@ class AzureOCRService:
         for page in result.pages:
             for line in page.lines:
                 text.append(line.content)
+        record_ocr_result(document_type, len(result.pages), len(text))
         return "\n".join(text)
 
 
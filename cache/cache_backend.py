@@ -0,0 +1,47 @@
+"""
+Interface commune des backends de cache.
+
+Les backends ne manipulent que des octets ; la sérialisation (sans pickle)
+est faite par `cache/serialization.py` et les métriques par
+`cache/cache_service.py`.
+"""
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class CacheBackend(ABC):
+    name = "abstract"
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Écrit la valeur seulement si la clé est absente ; retourne True si écrite."""
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None, refresh_ttl: bool = False) -> int:
+        """
+        Incrément atomique ; `ttl` n'est appliqué qu'à la création de la clé,
+        ou à chaque incrément avec `refresh_ttl`.
+        """
+        ...
+
+    @abstractmethod
+    def decr_if_exists(self, key: str, amount: int = 1) -> Optional[int]:
+        """
+        Décrément atomique d'une clé existante, sans descendre sous zéro et
+        en gardant son TTL ; retourne None (sans créer la clé) si elle est
+        absente ou expirée.
+        """
+        ...
@@ -0,0 +1,106 @@
+"""
+Point d'entrée du cache partagé.
+
+    from cache.cache_service import get_cache
+    charts = get_cache("charts")
+    charts.set("overview", data, ttl=30)
+
+Le backend est choisi par CACHE_BACKEND (memory, sqlite, redis). Chaque
+espace de noms a sa propre capacité (CACHE_MAX_ENTRIES) : les graphiques ne
+peuvent pas évincer la version des données, les quotas ou les marqueurs
+d'idempotence. En mémoire, chaque espace a donc son propre LRU ; le fichier
+SQLite est élagué espace par espace.
+"""
+import os
+import tempfile
+import threading
+from config.cache_config import CacheConfig
+from cache import serialization
+from cache.cache_backend import CacheBackend
+from utils.metrics import cache_requests_total
+
+_MISSING = object()
+
+
+def create_backend(kind: str = None, url: str = None) -> CacheBackend:
+    kind = (kind or CacheConfig.CACHE_BACKEND).lower()
+    url = url if url is not None else CacheConfig.CACHE_URL
+
+    if kind == "memory":
+        from cache.memory_backend import MemoryLRUBackend
+        return MemoryLRUBackend(CacheConfig.CACHE_MAX_ENTRIES)
+    if kind == "sqlite":
+        from cache.sqlite_backend import SQLiteBackend
+        path = url or os.path.join(tempfile.gettempdir(), "ai-agent-cache.sqlite3")
+        return SQLiteBackend(path, CacheConfig.CACHE_MAX_ENTRIES, CacheConfig.CACHE_KEY_PREFIX)
+    if kind == "redis":
+        from cache.redis_backend import RedisBackend
+        return RedisBackend(url)
+    raise ValueError(f"⚠️ CACHE_BACKEND inconnu: {kind} (memory, sqlite ou redis)")
+
+
+class NamespacedCache:
+    def __init__(self, namespace: str, backend: CacheBackend, prefix: str):
+        self.namespace = namespace
+        self.backend = backend
+        self._prefix = f"{prefix}:{namespace}:"
+
+    def _key(self, key: str) -> str:
+        return self._prefix + key
+
+    def get(self, key: str, default=None):
+        raw = self.backend.get(self._key(key))
+        result = "miss" if raw is None else "hit"
+        cache_requests_total.labels(namespace=self.namespace, backend=self.backend.name, result=result).inc()
+        return default if raw is None else serialization.loads(raw)
+
+    def set(self, key: str, value, ttl: float = None) -> None:
+        self.backend.set(self._key(key), serialization.dumps(value), ttl)
+
+    def add(self, key: str, value, ttl: float = None) -> bool:
+        return self.backend.add(self._key(key), serialization.dumps(value), ttl)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(self._key(key))
+
+    def incr(self, key: str, amount: int = 1, ttl: float = None, refresh_ttl: bool = False) -> int:
+        return self.backend.incr(self._key(key), amount, ttl, refresh_ttl)
+
+    def decr_if_exists(self, key: str, amount: int = 1):
+        return self.backend.decr_if_exists(self._key(key), amount)
+
+    def get_or_set(self, key: str, compute, ttl: float = None):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+
+_lock = threading.Lock()
+_backend = None
+_caches = {}
+
+
+def get_backend() -> CacheBackend:
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+def get_cache(namespace: str) -> NamespacedCache:
+    cache = _caches.get(namespace)
+    if cache is None:
+        backend = get_backend()
+        with _lock:
+            cache = _caches.get(namespace)
+            if cache is None:
+                if backend.name == "memory":
+                    # Un LRU par espace de noms, borné séparément
+                    backend = create_backend("memory")
+                cache = NamespacedCache(namespace, backend, CacheConfig.CACHE_KEY_PREFIX)
+                _caches[namespace] = cache
+    return cache
@@ -0,0 +1,77 @@
+"""
+Backend LRU en mémoire, local au processus.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from cache.cache_backend import CacheBackend
+from utils.metrics import cache_evictions_total
+
+
+class MemoryLRUBackend(CacheBackend):
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def _live(self, key):
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key, value, ttl):
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            cache_evictions_total.labels(backend=self.name).inc()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None, refresh_ttl: bool = False) -> int:
+        with self._lock:
+            current = self._live(key)
+            if current is None:
+                value = amount
+                self._store(key, str(value).encode(), ttl)
+            else:
+                value = int(current) + amount
+                expires_at = time.monotonic() + ttl if refresh_ttl and ttl else self._entries[key][1]
+                self._entries[key] = (str(value).encode(), expires_at)
+            return value
+
+    def decr_if_exists(self, key: str, amount: int = 1) -> Optional[int]:
+        with self._lock:
+            current = self._live(key)
+            if current is None:
+                return None
+            value = max(0, int(current) - amount)
+            self._entries[key] = (str(value).encode(), self._entries[key][1])
+            return value
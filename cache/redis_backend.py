@@ -0,0 +1,67 @@
+"""
+Backend Redis (protocole RESP), pour partager le cache entre hôtes.
+
+Fonctionne avec un vrai serveur Redis ou avec le stand-in local
+`cache/resp_standin.py` pour le développement et les benchmarks.
+"""
+from typing import Optional
+from cache.cache_backend import CacheBackend
+
+# Lecture et écriture dans le même script : atomique côté serveur
+DECR_IF_EXISTS_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if not value then
+    return false
+end
+local result = math.max(0, tonumber(value) - tonumber(ARGV[1]))
+redis.call('SET', KEYS[1], result, 'KEEPTTL')
+return result
+"""
+
+
+class RedisBackend(CacheBackend):
+    name = "redis"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("⚠️ Le paquet 'redis' est requis pour CACHE_BACKEND=redis")
+        # RESP2 : compatible avec tous les serveurs Redis et avec le stand-in
+        self.client = redis.Redis.from_url(url or "redis://localhost:6379/0", protocol=2)
+        self._decr_if_exists = self.client.register_script(DECR_IF_EXISTS_SCRIPT)
+
+    @staticmethod
+    def _px(ttl):
+        return int(ttl * 1000) if ttl else None
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self.client.set(key, value, px=self._px(ttl))
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        return bool(self.client.set(key, value, px=self._px(ttl), nx=True))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None, refresh_ttl: bool = False) -> int:
+        if not ttl:
+            return int(self.client.incrby(key, amount))
+        pipe = self.client.pipeline(transaction=False)
+        if refresh_ttl:
+            pipe.incrby(key, amount)
+            pipe.pexpire(key, self._px(ttl))
+            value, _ = pipe.execute()
+            return int(value)
+        # SET NX : le TTL n'est posé qu'à la création de la clé
+        pipe.set(key, 0, px=self._px(ttl), nx=True)
+        pipe.incrby(key, amount)
+        _, value = pipe.execute()
+        return int(value)
+
+    def decr_if_exists(self, key: str, amount: int = 1) -> Optional[int]:
+        value = self._decr_if_exists(keys=[key], args=[amount])
+        return None if value is None else int(value)
@@ -0,0 +1,216 @@
+"""
+Stand-in local parlant le protocole Redis (RESP2), pour le développement et
+les benchmarks sans serveur Redis.
+
+Commandes supportées : HELLO (RESP2), PING, GET, SET (EX/PX/NX/XX), DEL,
+INCR, INCRBY, EXPIRE, PEXPIRE, TTL, FLUSHDB, et EVAL / EVALSHA limités aux
+scripts Lua de `cache/redis_backend.py` (réimplémentés en Python).
+
+Usage :
+    python -m cache.resp_standin --port 6379
+    CACHE_BACKEND=redis CACHE_URL=redis://127.0.0.1:6379/0 gunicorn ...
+"""
+import argparse
+import hashlib
+import socketserver
+import threading
+import time
+from cache.redis_backend import DECR_IF_EXISTS_SCRIPT
+
+
+class _Store:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}
+
+    def _live(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return item
+
+
+class _RESPHandler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _write(self, payload: bytes):
+        self.wfile.write(payload)
+
+    def _simple(self, text):
+        self._write(b"+" + text.encode() + b"\r\n")
+
+    def _error(self, text):
+        self._write(b"-ERR " + text.encode() + b"\r\n")
+
+    def _integer(self, value):
+        self._write(b":" + str(value).encode() + b"\r\n")
+
+    def _bulk(self, value):
+        if value is None:
+            self._write(b"$-1\r\n")
+        else:
+            self._write(b"$" + str(len(value)).encode() + b"\r\n" + value + b"\r\n")
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            if not args:
+                continue
+            command = args[0].upper().decode()
+            handler = getattr(self, f"cmd_{command.lower()}", None)
+            if handler is None:
+                self._error(f"unknown command '{command}'")
+                continue
+            try:
+                with store.lock:
+                    handler(store, args[1:])
+            except (ValueError, IndexError):
+                self._error("syntax error")
+
+    def cmd_hello(self, store, args):
+        if args and args[0] != b"2":
+            self._write(b"-NOPROTO unsupported protocol version\r\n")
+            return
+        fields = [b"server", b"resp-standin", b"version", b"7.0.0", b"proto"]
+        self._write(b"*6\r\n")
+        for field in fields:
+            self._bulk(field)
+        self._integer(2)
+
+    def cmd_ping(self, store, args):
+        self._simple("PONG")
+
+    def cmd_flushdb(self, store, args):
+        store.data.clear()
+        self._simple("OK")
+
+    def cmd_get(self, store, args):
+        item = store._live(args[0])
+        self._bulk(item[0] if item else None)
+
+    def cmd_set(self, store, args):
+        key, value = args[0], args[1]
+        options = [a.upper() for a in args[2:]]
+        expires_at = None
+        if b"EX" in options:
+            expires_at = time.monotonic() + int(args[2 + options.index(b"EX") + 1])
+        if b"PX" in options:
+            expires_at = time.monotonic() + int(args[2 + options.index(b"PX") + 1]) / 1000
+        exists = store._live(key) is not None
+        if (b"NX" in options and exists) or (b"XX" in options and not exists):
+            self._bulk(None)
+            return
+        store.data[key] = (value, expires_at)
+        self._simple("OK")
+
+    def cmd_del(self, store, args):
+        removed = sum(1 for key in args if store._live(key) is not None and store.data.pop(key))
+        self._integer(removed)
+
+    def cmd_incrby(self, store, args):
+        key, amount = args[0], int(args[1])
+        item = store._live(key)
+        value = (int(item[0]) if item else 0) + amount
+        store.data[key] = (str(value).encode(), item[1] if item else None)
+        self._integer(value)
+
+    def cmd_incr(self, store, args):
+        self.cmd_incrby(store, [args[0], b"1"])
+
+    def _expire(self, store, key, seconds):
+        item = store._live(key)
+        if item is None:
+            self._integer(0)
+            return
+        store.data[key] = (item[0], time.monotonic() + seconds)
+        self._integer(1)
+
+    def cmd_expire(self, store, args):
+        self._expire(store, args[0], int(args[1]))
+
+    def cmd_pexpire(self, store, args):
+        self._expire(store, args[0], int(args[1]) / 1000)
+
+    def _script_decr_if_exists(self, store, keys, args):
+        item = store._live(keys[0])
+        if item is None:
+            self._bulk(None)
+            return
+        value = max(0, int(item[0]) - int(args[0]))
+        store.data[keys[0]] = (str(value).encode(), item[1])
+        self._integer(value)
+
+    def _run_script(self, store, sha, args):
+        script = self.server.scripts.get(sha)
+        if script is None:
+            self._write(b"-NOSCRIPT No matching script. Please use EVAL.\r\n")
+            return
+        key_count = int(args[0])
+        script(self, store, args[1:1 + key_count], args[1 + key_count:])
+
+    def cmd_eval(self, store, args):
+        self._run_script(store, hashlib.sha1(args[0]).hexdigest(), args[1:])
+
+    def cmd_evalsha(self, store, args):
+        self._run_script(store, args[0].decode().lower(), args[1:])
+
+    def cmd_ttl(self, store, args):
+        item = store._live(args[0])
+        if item is None:
+            self._integer(-2)
+        elif item[1] is None:
+            self._integer(-1)
+        else:
+            self._integer(int(item[1] - time.monotonic()))
+
+
+class RESPStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.store = _Store()
+        self.scripts = {
+            hashlib.sha1(DECR_IF_EXISTS_SCRIPT.encode()).hexdigest(): _RESPHandler._script_decr_if_exists,
+        }
+        super().__init__((host, port), _RESPHandler)
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in Redis local (RESP2)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    server = RESPStandIn(args.host, args.port)
+    print(f"Stand-in Redis à l'écoute sur {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Sérialisation JSON des valeurs en cache, sans pickle.
+
+Les modèles Pydantic sont encodés avec leur nom de classe et restaurés via
+`model_validate` ; seules les classes enregistrées dans `_MODEL_REGISTRY`
+peuvent être reconstruites, une entrée de cache ne peut donc pas provoquer
+l'import ou l'exécution de code arbitraire.
+"""
+import base64
+import json
+from datetime import date, datetime
+from pydantic import BaseModel
+from models.identity_card_model import CINData
+from models.driving_license_model import PermisData
+from models.vehicle_registration_model import CartGrisData
+
+_MODEL_REGISTRY = {}
+
+
+def register_model(model_cls):
+    _MODEL_REGISTRY[f"{model_cls.__module__}.{model_cls.__qualname__}"] = model_cls
+    return model_cls
+
+
+for _model in (CINData, PermisData, CartGrisData):
+    register_model(_model)
+
+
+def _default(value):
+    if isinstance(value, BaseModel):
+        name = f"{type(value).__module__}.{type(value).__qualname__}"
+        if name not in _MODEL_REGISTRY:
+            raise TypeError(f"Modèle non enregistré pour le cache: {name}")
+        return {"__model__": name, "data": value.model_dump(mode="json")}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Type non sérialisable en cache: {type(value).__name__}")
+
+
+def _object_hook(obj):
+    if len(obj) <= 2:
+        if "__model__" in obj:
+            model_cls = _MODEL_REGISTRY.get(obj["__model__"])
+            if model_cls is None:
+                raise ValueError(f"Modèle inconnu dans le cache: {obj['__model__']}")
+            return model_cls.model_validate(obj["data"])
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        if "__date__" in obj:
+            return date.fromisoformat(obj["__date__"])
+        if "__bytes__" in obj:
+            return base64.b64decode(obj["__bytes__"])
+    return obj
+
+
+def dumps(value) -> bytes:
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(raw: bytes):
+    return json.loads(raw, object_hook=_object_hook)
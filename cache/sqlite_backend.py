@@ -0,0 +1,158 @@
+"""
+Backend fichier SQLite, partagé par tous les workers d'un même hôte.
+
+Le mode WAL permet des lectures concurrentes pendant les écritures ; chaque
+thread utilise sa propre connexion.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from cache.cache_backend import CacheBackend
+from utils.metrics import cache_evictions_total
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+class SQLiteBackend(CacheBackend):
+    name = "sqlite"
+
+    # Le nettoyage (expirations + LRU) n'est fait qu'une écriture sur N
+    TRIM_EVERY = 200
+
+    def __init__(self, path: str, max_entries: int = 10000, key_prefix: str = ""):
+        self.path = path
+        # Limite par espace de noms : clés "<key_prefix>:<namespace>:<clé>"
+        self.max_entries = max_entries
+        self._namespace_start = len(key_prefix) + 1 if key_prefix else 0
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().execute(_SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _after_write(self):
+        self._writes += 1
+        if self._writes % self.TRIM_EVERY == 0:
+            self.trim()
+
+    def trim(self):
+        conn = self._connection()
+        now = time.time()
+        expired = conn.execute(
+            "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        overflow = conn.execute(
+            "DELETE FROM cache_entries WHERE key IN ("
+            " SELECT key FROM ("
+            "  SELECT key, ROW_NUMBER() OVER ("
+            "   PARTITION BY substr(key, 1, ? + instr(substr(key, ? + 1), ':'))"
+            "   ORDER BY accessed_at DESC) AS position"
+            "  FROM cache_entries)"
+            " WHERE position > ?)",
+            (self._namespace_start, self._namespace_start, self.max_entries),
+        ).rowcount
+        if expired + overflow > 0:
+            cache_evictions_total.labels(backend=self.name).inc(expired + overflow)
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, now),
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, value, now + ttl if ttl else None, now),
+        )
+        self._after_write()
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE key = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+                (key, now),
+            )
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO cache_entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl if ttl else None, now),
+            ).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._after_write()
+        return inserted == 1
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None, refresh_ttl: bool = False) -> int:
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                value = amount
+                expires_at = now + ttl if ttl else None
+            else:
+                value = int(bytes(row[0])) + amount
+                expires_at = now + ttl if refresh_ttl and ttl else row[1]
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, str(value).encode(), expires_at, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def decr_if_exists(self, key: str, amount: int = 1) -> Optional[int]:
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now),
+            ).fetchone()
+            value = None
+            if row is not None:
+                value = max(0, int(bytes(row[0])) - amount)
+                conn.execute(
+                    "UPDATE cache_entries SET value = ?, accessed_at = ? WHERE key = ?",
+                    (str(value).encode(), now, key),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value
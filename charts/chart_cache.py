@@ -0,0 +1,105 @@
+"""
+Cache des réponses des graphiques du dashboard.
+
+Les réponses sont stockées dans le cache partagé (espace "charts") sous la
+clé (endpoint, version des données) : la version est incrémentée par les
+fonctions save_*_data, donc un nouveau document invalide immédiatement les
+entrées de tous les workers qui partagent le backend.
+
+- ETag fort (SHA-256 du corps) : un dashboard inchangé reçoit un 304.
+- Single-flight : lors d'un miss, un seul thread par worker calcule la
+  réponse pour une clé donnée, et un verrou dans le cache partagé évite que
+  plusieurs workers la calculent en même temps.
+- Une exception du calcul n'est jamais stockée : elle remonte à la route
+  (500) et la requête suivante recalcule.
+"""
+import hashlib
+import threading
+import time
+from flask import Response, request
+from cache.cache_service import get_cache
+from config.cache_config import CacheConfig
+from database.data_version import get_data_version
+from middlewares.concurrency import stage_slot
+from utils.json_provider import dumps_bytes
+
+LOCK_POLL_INTERVAL = 0.05
+
+
+class ChartResponseCache:
+    def __init__(self, ttl: float, wait_timeout: float):
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self.cache = get_cache("charts")
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def _compute_and_store(self, key, compute):
+        body = compute()
+        entry = {"etag": hashlib.sha256(body).hexdigest(), "body": body.decode("utf-8")}
+        self.cache.set(key, entry, ttl=self.ttl)
+        return entry
+
+    def _compute_across_workers(self, key, compute):
+        lock_key = f"lock:{key}"
+        if self.cache.add(lock_key, 1, ttl=self.wait_timeout):
+            try:
+                return self._compute_and_store(key, compute)
+            finally:
+                self.cache.delete(lock_key)
+
+        # Un autre worker calcule déjà cette clé : attendre son résultat
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry
+        return self._compute_and_store(key, compute)
+
+    def get_or_compute(self, endpoint: str, compute) -> dict:
+        key = f"{endpoint}:{get_data_version()}"
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = threading.Event()
+                self._inflight[key] = event
+
+        if not leader:
+            event.wait(self.wait_timeout)
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry
+            # Le calcul du leader a échoué ou expiré : calcul sans partage
+            return self._compute_and_store(key, compute)
+
+        try:
+            return self._compute_across_workers(key, compute)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+
+chart_cache = ChartResponseCache(CacheConfig.CHARTS_CACHE_TTL_SECONDS, CacheConfig.SINGLE_FLIGHT_WAIT_SECONDS)
+
+
+def cached_chart_response(endpoint: str, compute):
+    """Réponse JSON mise en cache, avec ETag fort et support de If-None-Match."""
+    def render():
+        with stage_slot("db"):
+            data = compute()
+        return dumps_bytes(data)
+
+    entry = chart_cache.get_or_compute(endpoint, render)
+    response = Response(entry["body"], mimetype="application/json")
+    response.set_etag(entry["etag"])
+    # Données authentifiées : revalidation systématique, jamais de cache partagé
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
@@ -0,0 +1,66 @@
+"""
+Requêtes SQL agrégées des graphiques du dashboard.
+
+Les comptages sont faits par la base (COUNT / GROUP BY) sur des colonnes
+indexées au lieu de charger toutes les lignes en Python. Les requêtes sont
+construites par des fonctions pour que le contrôle des plans d'exécution
+(testing/benchmarks/query_plans.py) vérifie exactement celles de l'application.
+"""
+from sqlalchemy import func, select
+from database.date_buckets import date_bucket
+from database.cart_identite_national.identity_card_entity import CINDataDB, SessionLocal as CINSession
+from database.cart_permi_conduite.driving_license_entity import PermiDataDB, SessionLocal as PermiSession
+from database.cart_gris_matricul.vehicle_registration_entity import GrisDataDB, SessionLocal as GrisSession
+
+SESSIONS = {
+    CINDataDB: CINSession,
+    PermiDataDB: PermiSession,
+    GrisDataDB: GrisSession,
+}
+
+
+def count_rows(entity):
+    return select(func.count()).select_from(entity)
+
+
+def count_by(*columns):
+    return select(*columns, func.count().label("count")).group_by(*columns)
+
+
+def count_created_since(entity, since):
+    return select(func.count()).select_from(entity).where(entity.created_at >= since)
+
+
+def dialect_name(entity) -> str:
+    return SESSIONS[entity].kw["bind"].dialect.name
+
+
+def processing_by_bucket(entity, unit, start, end):
+    """(période, documents, somme et nombre des durées de traitement) sur [start, end["""
+    bucket = date_bucket(entity.created_at, unit, dialect_name(entity)).label("bucket")
+    return (
+        select(
+            bucket,
+            func.count().label("count"),
+            func.sum(entity.processing_duration).label("duration_sum"),
+            func.count(entity.processing_duration).label("duration_count"),
+        )
+        .where(entity.created_at >= start, entity.created_at < end)
+        .group_by(bucket)
+    )
+
+
+def fetch_all(entity, statement):
+    session = SESSIONS[entity]()
+    try:
+        return session.execute(statement).all()
+    finally:
+        session.close()
+
+
+def fetch_scalar(entity, statement):
+    session = SESSIONS[entity]()
+    try:
+        return session.execute(statement).scalar_one()
+    finally:
+        session.close()
@@ -1,19 +1,33 @@
 """
 Routes pour les données des graphiques du dashboard
 """
-from flask import Blueprint, jsonify
+from functools import partial
+from flask import Blueprint, jsonify, request
 from middlewares.decorators import token_required
-from charts.chart_service import ChartService
+from middlewares.concurrency import StageOverloadedError
+from charts.chart_cache import cached_chart_response
+from charts.chart_service import ChartService, DEFAULT_MONTHS, MAX_MONTHS, DEFAULT_DAYS, MAX_DAYS
 
 charts_bp = Blueprint('charts', __name__)
 
+
+def window_param(name, default, maximum):
+    """Taille de fenêtre entière lue dans la query string, bornée à [1, maximum]"""
+    raw = request.args.get(name)
+    if raw is None:
+        return default
+    if not raw.isdigit() or not 1 <= int(raw) <= maximum:
+        raise ValueError(f"Paramètre '{name}' invalide: entier entre 1 et {maximum} attendu")
+    return int(raw)
+
 @charts_bp.route('/overview', methods=['GET'])
 @token_required
 def get_cards_overview(current_user):
     """Récupère l'aperçu général des cartes"""
     try:
-        data = ChartService.get_cards_overview()
-        return jsonify(data)
+        return cached_chart_response("overview", ChartService.get_cards_overview)
+    except StageOverloadedError:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -22,8 +36,9 @@ def get_cards_overview(current_user):
 def get_gender_distribution(current_user):
     """Récupère la distribution des genres"""
     try:
-        data = ChartService.get_gender_distribution()
-        return jsonify(data)
+        return cached_chart_response("gender-distribution", ChartService.get_gender_distribution)
+    except StageOverloadedError:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -32,8 +47,9 @@ def get_gender_distribution(current_user):
 def get_cities_distribution(current_user):
     """Récupère la distribution des villes"""
     try:
-        data = ChartService.get_cities_distribution()
-        return jsonify(data)
+        return cached_chart_response("cities-distribution", ChartService.get_cities_distribution)
+    except StageOverloadedError:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -42,8 +58,9 @@ def get_cities_distribution(current_user):
 def get_license_categories(current_user):
     """Récupère les catégories de permis"""
     try:
-        data = ChartService.get_license_categories()
-        return jsonify(data)
+        return cached_chart_response("license-categories", ChartService.get_license_categories)
+    except StageOverloadedError:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -52,28 +69,41 @@ def get_license_categories(current_user):
 def get_car_usage_types(current_user):
     """Récupère les types d'usage des voitures"""
     try:
-        data = ChartService.get_car_usage_types()
-        return jsonify(data)
+        return cached_chart_response("car-usage-types", ChartService.get_car_usage_types)
+    except StageOverloadedError:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @charts_bp.route('/monthly-stats', methods=['GET'])
 @token_required
 def get_monthly_stats(current_user):
-    """Récupère les statistiques mensuelles"""
+    """Récupère les statistiques mensuelles (?months=, 7 par défaut)"""
     try:
-        data = ChartService.get_monthly_processing_stats()
-        return jsonify(data)
+        months = window_param("months", DEFAULT_MONTHS, MAX_MONTHS)
+        return cached_chart_response(
+            f"monthly-stats:{months}", partial(ChartService.get_monthly_processing_stats, months)
+        )
+    except StageOverloadedError:
+        raise
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @charts_bp.route('/daily-stats', methods=['GET'])
 @token_required
 def get_daily_stats(current_user):
-    """Récupère les statistiques quotidiennes"""
+    """Récupère les statistiques quotidiennes (?days=, 7 par défaut)"""
     try:
-        data = ChartService.get_daily_processing_stats()
-        return jsonify(data)
+        days = window_param("days", DEFAULT_DAYS, MAX_DAYS)
+        return cached_chart_response(
+            f"daily-stats:{days}", partial(ChartService.get_daily_processing_stats, days)
+        )
+    except StageOverloadedError:
+        raise
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -82,8 +112,9 @@ def get_daily_stats(current_user):
 def get_all_dashboard_data(current_user):
     """Récupère toutes les données nécessaires pour le dashboard"""
     try:
-        data = ChartService.get_all_dashboard_charts()
-        return jsonify(data)
+        return cached_chart_response("dashboard", ChartService.get_all_dashboard_charts)
+    except StageOverloadedError:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -92,7 +123,8 @@ def get_all_dashboard_data(current_user):
 def get_essential_dashboard(current_user):
     """Récupère seulement les données essentielles et fiables"""
     try:
-        data = ChartService.get_essential_dashboard_data()
-        return jsonify(data)
+        return cached_chart_response("essential", ChartService.get_essential_dashboard_data)
+    except StageOverloadedError:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
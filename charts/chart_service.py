@@ -3,25 +3,35 @@ Service pour générer les données des graphiques du dashboard
 """
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
-import calendar
-from database.cart_identite_national.identity_card_database_service import get_all_cin_data
-from database.cart_gris_matricul.vehicle_registration_database_service import get_all_gris_data
-from database.cart_permi_conduite.driving_license_database_service import get_all_permi_data
+from database.cart_identite_national.identity_card_entity import CINDataDB
+from database.cart_gris_matricul.vehicle_registration_entity import GrisDataDB
+from database.cart_permi_conduite.driving_license_entity import PermiDataDB
+from database.date_buckets import bucket_key, month_starts, utc_now
+from utils.city_normalizer import get_city_normalizer
+from charts.chart_queries import count_rows, count_by, fetch_all, fetch_scalar, processing_by_bucket
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MONTH_LABELS = ['Jan', 'Fév', 'Mar', 'Avr', 'Mai', 'Jun', 'Jul', 'Aoû', 'Sep', 'Oct', 'Nov', 'Déc']
+DAY_LABELS = ['Lun', 'Mar', 'Mer', 'Jeu', 'Ven', 'Sam', 'Dim']
+DEFAULT_MONTHS = 7
+MAX_MONTHS = 24
+DEFAULT_DAYS = 7
+MAX_DAYS = 90
 
 
 class ChartService:
-    
+    # Une erreur de base est propagée (500) plutôt que remplacée par des
+    # valeurs vides : chart_cache ne stocke que les calculs réussis
+
     @staticmethod
     def get_cards_overview():
         """Récupère le nombre total de chaque type de carte"""
         try:
-            cin_data = get_all_cin_data()
-            gris_data = get_all_gris_data()
-            permi_data = get_all_permi_data()
-            
-            total_cin = len(cin_data) if cin_data else 0
-            total_gris = len(gris_data) if gris_data else 0
-            total_permi = len(permi_data) if permi_data else 0
+            total_cin = fetch_scalar(CINDataDB, count_rows(CINDataDB))
+            total_gris = fetch_scalar(GrisDataDB, count_rows(GrisDataDB))
+            total_permi = fetch_scalar(PermiDataDB, count_rows(PermiDataDB))
             total_cards = total_cin + total_gris + total_permi
             
             # Calculer les pourcentages
@@ -38,92 +48,53 @@ class ChartService:
                 "percentage_gris": percentage_gris,
                 "percentage_permi": percentage_permi
             }
-        except Exception as e:
-            print(f"Erreur dans get_cards_overview: {e}")
-            return {
-                "total_cin": 0,
-                "total_gris": 0,
-                "total_permi": 0,
-                "total_cards": 0,
-                "percentage_cin": 0,
-                "percentage_gris": 0,
-                "percentage_permi": 0
-            }
+        except Exception:
+            logger.exception("Erreur dans get_cards_overview")
+            raise
     
     @staticmethod
     def get_gender_distribution():
         """Analyse la distribution des genres dans les CIN"""
         try:
-            cin_data = get_all_cin_data()
-            if not cin_data:
+            rows = fetch_all(CINDataDB, count_by(CINDataDB.sexe))
+            total = sum(count for _, count in rows)
+            if not total:
                 return []
             
             gender_count = Counter()
-            for card in cin_data:
-                gender = getattr(card, 'sexe', None)
+            for gender, count in rows:
                 if gender == 'M':
-                    gender_count['Hommes'] += 1
+                    gender_count['Hommes'] += count
                 elif gender == 'F':
-                    gender_count['Femmes'] += 1
+                    gender_count['Femmes'] += count
                 else:
-                    gender_count['Non spécifié'] += 1
+                    gender_count['Non spécifié'] += count
             
             return [
-                {"name": gender, "value": count, "percentage": round((count / len(cin_data)) * 100)}
-                for gender, count in gender_count.items()
+                {"name": gender, "value": count, "percentage": round((count / total) * 100)}
+                for gender, count in gender_count.most_common()
             ]
-        except Exception as e:
-            print(f"Erreur dans get_gender_distribution: {e}")
-            return []
+        except Exception:
+            logger.exception("Erreur dans get_gender_distribution")
+            raise
     
     @staticmethod
     def get_cities_distribution():
-        """Analyse la distribution des villes dans les CIN"""
+        """Analyse la distribution des villes dans les CIN (city_code normalisé à l'enregistrement)"""
         try:
-            cin_data = get_all_cin_data()
-            if not cin_data:
+            rows = fetch_all(CINDataDB, count_by(CINDataDB.city_code))
+            total = sum(count for _, count in rows)
+            if not total:
                 return []
             
+            # Les CIN non encore normalisées (city_code NULL) sont comptées dans AUTRES
+            other = get_city_normalizer().other
             cities_count = Counter()
-            
-            for card in cin_data:
-                # Essayer d'extraire la ville depuis différents champs
-                city = None
-                lieu_fr = getattr(card, 'lieu_fr', None)
-                adresse_fr = getattr(card, 'adresse_fr', None)
-                
-                city_text = lieu_fr or adresse_fr or ""
-                city_text = city_text.upper()
-                
-                # Mapper les villes principales du Maroc
-                if 'CASABLANCA' in city_text or 'CASA' in city_text:
-                    city = 'CASABLANCA'
-                elif 'RABAT' in city_text:
-                    city = 'RABAT'
-                elif 'FES' in city_text or 'FÈS' in city_text:
-                    city = 'FES'
-                elif 'MARRAKECH' in city_text or 'MARRAKESH' in city_text:
-                    city = 'MARRAKECH'
-                elif 'AGADIR' in city_text:
-                    city = 'AGADIR'
-                elif 'TANGER' in city_text or 'TANGIER' in city_text:
-                    city = 'TANGER'
-                elif 'MEKNES' in city_text or 'MEKNÈS' in city_text:
-                    city = 'MEKNES'
-                elif 'OUJDA' in city_text:
-                    city = 'OUJDA'
-                elif 'KENITRA' in city_text or 'KÉNITRA' in city_text:
-                    city = 'KENITRA'
-                elif 'TETOUAN' in city_text or 'TÉTOUAN' in city_text:
-                    city = 'TETOUAN'
-                else:
-                    city = 'AUTRES'
-                
-                cities_count[city] += 1
+            for city, count in rows:
+                cities_count[city or other] += count
             
             # Retourner les top 10 villes
             top_cities = cities_count.most_common(10)
-            total = len(cin_data)
             
             return [
                 {
@@ -133,24 +104,23 @@ class ChartService:
                 }
                 for city, count in top_cities
             ]
-        except Exception as e:
-            print(f"Erreur dans get_cities_distribution: {e}")
-            return []
+        except Exception:
+            logger.exception("Erreur dans get_cities_distribution")
+            raise
     
     @staticmethod
     def get_license_categories():
         """Analyse les catégories de permis de conduire"""
         try:
-            permi_data = get_all_permi_data()
-            if not permi_data:
+            rows = fetch_all(PermiDataDB, count_by(PermiDataDB.categorie))
+            total = sum(count for _, count in rows)
+            if not total:
                 return []
             
             categories_count = Counter()
-            for card in permi_data:
-                category = getattr(card, 'categorie', 'B')  # Par défaut B
-                categories_count[category] += 1
+            for category, count in rows:
+                categories_count[category] += count
             
-            total = len(permi_data)
             return [
                 {
                     "name": f"Catégorie {category}",
@@ -159,24 +129,23 @@ class ChartService:
                 }
                 for category, count in categories_count.items()
             ]
-        except Exception as e:
-            print(f"Erreur dans get_license_categories: {e}")
-            return []
+        except Exception:
+            logger.exception("Erreur dans get_license_categories")
+            raise
     
     @staticmethod
     def get_car_usage_types():
         """Analyse les types d'usage des cartes grises"""
         try:
-            gris_data = get_all_gris_data()
-            if not gris_data:
+            rows = fetch_all(GrisDataDB, count_by(GrisDataDB.usage_type))
+            total = sum(count for _, count in rows)
+            if not total:
                 return []
             
             usage_count = Counter()
-            for card in gris_data:
-                usage = getattr(card, 'usage_type', None) or 'Particulier'
-                usage_count[usage] += 1
+            for usage, count in rows:
+                usage_count[usage or 'Particulier'] += count
             
-            total = len(gris_data)
             return [
                 {
                     "name": usage,
@@ -185,79 +154,61 @@ class ChartService:
                 }
                 for usage, count in usage_count.items()
             ]
-        except Exception as e:
-            print(f"Erreur dans get_car_usage_types: {e}")
-            return []
+        except Exception:
+            logger.exception("Erreur dans get_car_usage_types")
+            raise
     
     @staticmethod
-    def get_monthly_processing_stats():
-        """Statistiques de traitement mensuel basées sur les données réelles"""
-        months = ['Avr', 'Mai', 'Jun', 'Jul', 'Aoû', 'Sep', 'Oct']
-        
-        # Utiliser les vraies données actuelles
-        overview = ChartService.get_cards_overview()
-        total_cin = overview['total_cin']
-        total_gris = overview['total_gris']
-        total_permi = overview['total_permi']
-        
-        # Calculer une distribution mensuelle plus réaliste
-        base_cin = max(1, total_cin // 7)
-        base_gris = max(1, total_gris // 7)
-        base_permi = max(1, total_permi // 7)
+    def _processing_buckets(unit, start, end):
+        """Documents par période et par type, et durée moyenne de traitement."""
+        buckets = defaultdict(lambda: {"cin": 0, "gris": 0, "permis": 0, "duration_sum": 0.0, "duration_count": 0})
+        for key, entity in (("cin", CINDataDB), ("gris", GrisDataDB), ("permis", PermiDataDB)):
+            for bucket, count, duration_sum, duration_count in fetch_all(entity, processing_by_bucket(entity, unit, start, end)):
+                buckets[bucket][key] += count
+                buckets[bucket]["duration_sum"] += duration_sum or 0.0
+                buckets[bucket]["duration_count"] += duration_count
+        return buckets
+
+    @staticmethod
+    def _bucket_entry(bucket):
+        average = bucket["duration_sum"] / bucket["duration_count"] if bucket["duration_count"] else None
+        return {
+            "cin": bucket["cin"],
+            "gris": bucket["gris"],
+            "permis": bucket["permis"],
+            "duree_moyenne_s": round(average, 2) if average is not None else None
+        }
+
+    @staticmethod
+    def get_monthly_processing_stats(months=DEFAULT_MONTHS):
+        """Documents traités par mois (created_at) sur les `months` derniers mois, mois courant inclus"""
+        now = utc_now()
+        starts = month_starts(months, now.date())
+        buckets = ChartService._processing_buckets("month", datetime.combine(starts[0], datetime.min.time()), now + timedelta(seconds=1))
         
         monthly_stats = []
-        for i, month in enumerate(months):
-            # Simuler une croissance progressive avec pic en octobre (mois actuel)
-            if i < 6:  # Mois précédents
-                factor = 0.3 + (i * 0.1)  # Croissance progressive
-            else:  # Octobre (mois actuel)
-                factor = 2.0  # Pic d'activité ce mois-ci
-            
-            monthly_stats.append({
-                "mois": month,
-                "cin": max(0, int(base_cin * factor)),
-                "gris": max(0, int(base_gris * factor)),
-                "permis": max(0, int(base_permi * factor)),
-                "precision": min(98, 85 + i * 2)  # Amélioration progressive de la précision
-            })
+        for month_start in starts:
+            key = bucket_key(month_start, "month")
+            entry = {"mois": MONTH_LABELS[month_start.month - 1], "periode": key}
+            entry.update(ChartService._bucket_entry(buckets[key]))
+            monthly_stats.append(entry)
         
         return monthly_stats
     
     @staticmethod
-    def get_daily_processing_stats():
-        """Statistiques de traitement quotidien (7 derniers jours)"""
-        days = ['Lun', 'Mar', 'Mer', 'Jeu', 'Ven', 'Sam', 'Dim']
-        
-        # Utiliser les vraies données actuelles
-        overview = ChartService.get_cards_overview()
-        total_cin = overview['total_cin']
-        total_gris = overview['total_gris']
-        total_permi = overview['total_permi']
-        
-        # Calculer une moyenne journalière plus réaliste
-        base_daily_cin = max(1, total_cin // 7)  # Répartir sur 7 jours
-        base_daily_gris = max(1, total_gris // 7)
-        base_daily_permi = max(1, total_permi // 7)
+    def get_daily_processing_stats(days=DEFAULT_DAYS):
+        """Documents traités par jour (created_at) sur les `days` derniers jours, aujourd'hui inclus"""
+        now = utc_now()
+        first_day = now.date() - timedelta(days=days - 1)
+        buckets = ChartService._processing_buckets("day", datetime.combine(first_day, datetime.min.time()), now + timedelta(seconds=1))
         
         daily_stats = []
-        for i, day in enumerate(days):
-            # Variation selon le jour de la semaine avec plus de réalisme
-            if i < 5:  # Jours ouvrables (Lun-Ven)
-                factor = 1.0 + (i * 0.2)  # Augmentation progressive dans la semaine
-            else:  # Week-end (Sam-Dim)
-                factor = 0.2  # Très peu d'activité le week-end
-            
-            # Si c'est aujourd'hui (dernier jour), montrer une activité élevée
-            if i == 6:  # Dimanche (dernier jour de la semaine)
-                # Concentrer une partie des nouvelles données sur "aujourd'hui"
-                factor = 2.0
-            
-            daily_stats.append({
-                "jour": day,
-                "cin": max(0, int(base_daily_cin * factor)),
-                "gris": max(0, int(base_daily_gris * factor)),
-                "permis": max(0, int(base_daily_permi * factor))
-            })
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            key = bucket_key(day, "day")
+            entry = {"jour": DAY_LABELS[day.weekday()], "date": key}
+            entry.update(ChartService._bucket_entry(buckets[key]))
+            daily_stats.append(entry)
         
         return daily_stats
     
@@ -286,29 +237,9 @@ class ChartService:
                 "simple_stats": simple_stats,
                 "status": "success"
             }
-        except Exception as e:
-            print(f"Erreur dans get_essential_dashboard_data: {e}")
-            return {
-                "overview": {
-                    "total_cin": 0,
-                    "total_gris": 0,
-                    "total_permi": 0,
-                    "total_cards": 0,
-                    "percentage_cin": 0,
-                    "percentage_gris": 0,
-                    "percentage_permi": 0
-                },
-                "gender_distribution": [],
-                "simple_stats": {
-                    "total_documents": 0,
-                    "cin_count": 0,
-                    "gris_count": 0,
-                    "permi_count": 0,
-                    "most_common_gender": "Aucune donnée"
-                },
-                "status": "error",
-                "error": str(e)
-            }
+        except Exception:
+            logger.exception("Erreur dans get_essential_dashboard_data")
+            raise
 
     @staticmethod
     def get_all_dashboard_charts():
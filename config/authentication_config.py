@@ -3,7 +3,24 @@ import os
 
 class AuthConfig:
     SECRET_KEY = os.getenv("SECRET_KEY")
-    TOKEN_EXPIRATION_HOURS = int(os.getenv("TOKEN_EXPIRATION_HOURS"))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # HS256 (secret partagé SECRET_KEY) ou RS256 / ES256 (paire de clés PEM)
+    JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+    JWT_PRIVATE_KEY_PATH = os.getenv("JWT_PRIVATE_KEY_PATH", "")
+    JWT_PUBLIC_KEY_PATH = os.getenv("JWT_PUBLIC_KEY_PATH", "")
+
+    # Durée de vie du jeton d'accès : courte, les sessions longues passent
+    # par les refresh tokens (un jeton d'accès volé reste valide jusqu'à
+    # son expiration)
+    ACCESS_TOKEN_EXPIRATION_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRATION_MINUTES", "15"))
+    REFRESH_TOKEN_EXPIRATION_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRATION_DAYS", "30"))
+
+    # Liste de révocation en mémoire : resynchronisation incrémentale depuis
+    # la base et reconstruction complète (purge des jetons expirés)
+    REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+    REVOCATION_REBUILD_SECONDS = float(os.getenv("REVOCATION_REBUILD_SECONDS", "3600"))
+    REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+    REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+
     
\ No newline at end of file
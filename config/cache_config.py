@@ -0,0 +1,17 @@
+import os
+
+
+class CacheConfig:
+    # memory : LRU local au worker
+    # sqlite : fichier partagé par les workers d'un même hôte
+    # redis  : serveur Redis (ou stand-in local, cf. cache/resp_standin.py)
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+    CACHE_URL = os.getenv("CACHE_URL", "")
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "ai-agent")
+
+    # Durée de vie maximale d'une réponse de graphique en cache (borne la
+    # fraîcheur vis-à-vis des enregistrements faits par les autres workers)
+    CHARTS_CACHE_TTL_SECONDS = float(os.getenv("CHARTS_CACHE_TTL_SECONDS", "30"))
+    # Attente maximale d'un calcul déjà en cours pour la même clé
+    SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "30"))
@@ -0,0 +1,10 @@
+import os
+
+DEFAULT_GAZETTEER_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "utils", "data", "moroccan_cities.json"
+)
+
+
+class CityConfig:
+    # Fichier JSON {"other": ..., "cities": [{"code", "fr": [...], "ar": [...]}]}
+    GAZETTEER_PATH = os.getenv("CITY_GAZETTEER_PATH", DEFAULT_GAZETTEER_PATH)
@@ -0,0 +1,23 @@
+import os
+
+
+class CompressionConfig:
+    ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+    # En dessous de ce seuil, le gain ne compense pas le coût CPU et les en-têtes
+    MIN_SIZE_BYTES = int(os.getenv("COMPRESSION_MIN_SIZE_BYTES", "1024"))
+    GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    # Qualité brotli modérée : les réponses sont compressées à la volée
+    BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+    MIMETYPES = {
+        "application/json",
+        "application/javascript",
+        "application/xml",
+        "application/x-yaml",
+        "image/svg+xml",
+        "text/css",
+        "text/csv",
+        "text/html",
+        "text/plain",
+        "text/xml",
+        "text/yaml",
+    }
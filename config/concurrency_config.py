@@ -0,0 +1,26 @@
+import os
+
+
+class ConcurrencyConfig:
+    """
+    Limites de concurrence par étape du pipeline (par worker Gunicorn).
+
+    Chaque worker possède ses propres sémaphores : la capacité totale d'une
+    étape vaut donc `GUNICORN_WORKERS * MAX_CONCURRENT_<ETAPE>`.
+    """
+    MAX_CONCURRENT_OCR = int(os.getenv("MAX_CONCURRENT_OCR", "4"))
+    MAX_CONCURRENT_LLM = int(os.getenv("MAX_CONCURRENT_LLM", "4"))
+    MAX_CONCURRENT_DB = int(os.getenv("MAX_CONCURRENT_DB", "10"))
+
+    # Temps d'attente maximal pour obtenir un slot avant de répondre 503
+    ACQUIRE_TIMEOUT_SECONDS = float(os.getenv("STAGE_ACQUIRE_TIMEOUT_SECONDS", "1.0"))
+    # Valeur renvoyée dans l'en-tête Retry-After
+    RETRY_AFTER_SECONDS = int(os.getenv("STAGE_RETRY_AFTER_SECONDS", "5"))
+
+    @classmethod
+    def get_stage_limits(cls):
+        return {
+            "ocr": cls.MAX_CONCURRENT_OCR,
+            "llm": cls.MAX_CONCURRENT_LLM,
+            "db": cls.MAX_CONCURRENT_DB,
+        }
@@ -7,6 +7,8 @@ class DatabaseConfig:
     DB_PORT = os.getenv("DB_PORT", "5432")
     DB_NAME = os.getenv("DB_NAME", "intelli_backend_db")
     DB_SSLMODE = os.getenv("DB_SSLMODE", "require")
+    # URL complète prioritaire (ex: sqlite:///bench.db pour les benchmarks hors ligne)
+    DATABASE_URL = os.getenv("DATABASE_URL")
     # Note: channel_binding removed as it causes issues with Neon PostgreSQL
 
     @classmethod
@@ -14,7 +16,10 @@ class DatabaseConfig:
         """
         Returns database URL with SSL configuration for Neon PostgreSQL.
         Removes channel_binding to avoid SSL connection issues.
+        DATABASE_URL, when set, takes precedence over the DB_* variables.
         """
+        if cls.DATABASE_URL:
+            return cls.DATABASE_URL
         return (
             f"postgresql://{cls.DB_USER}:{cls.DB_PASSWORD}@{cls.DB_HOST}:{cls.DB_PORT}/{cls.DB_NAME}"
             f"?sslmode={cls.DB_SSLMODE}"
@@ -0,0 +1,23 @@
+import os
+
+
+class DuplicateConfig:
+    """
+    Détection des documents déjà enregistrés avant l'appel LLM (CIN, permis).
+
+    POLICY :
+    - return   : le document existant est renvoyé (200, en-tête X-Duplicate-Of)
+    - conflict : 409 avec l'identifiant du document existant
+    """
+    ENABLED = os.getenv("DUPLICATE_CHECK_ENABLED", "true").lower() in ("1", "true", "yes")
+    POLICY = os.getenv("DUPLICATE_POLICY", "return").lower()
+
+    # Filtre de Bloom des numéros par worker, complété par les lignes
+    # insérées par les autres workers au plus toutes les SYNC_SECONDS
+    SYNC_SECONDS = float(os.getenv("DUPLICATE_INDEX_SYNC_SECONDS", "5"))
+    BLOOM_CAPACITY = int(os.getenv("DUPLICATE_BLOOM_CAPACITY", "200000"))
+    BLOOM_ERROR_RATE = float(os.getenv("DUPLICATE_BLOOM_ERROR_RATE", "0.001"))
+
+    # Champs d'identité (noms fr/ar, date de naissance) de la ligne trouvée
+    # qui doivent figurer dans le texte OCR pour confirmer le doublon
+    MIN_IDENTITY_MATCHES = int(os.getenv("DUPLICATE_MIN_IDENTITY_MATCHES", "2"))
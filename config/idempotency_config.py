@@ -0,0 +1,19 @@
+import os
+
+
+class IdempotencyConfig:
+    """
+    En-tête Idempotency-Key des endpoints /process.
+
+    Les entrées passent par le cache partagé (CACHE_BACKEND) : avec le
+    backend memory, une relance servie par un autre worker est réexécutée.
+    """
+    HEADER = "Idempotency-Key"
+    MAX_KEY_LENGTH = int(os.getenv("IDEMPOTENCY_MAX_KEY_LENGTH", "255"))
+    # Conservation de la réponse d'une requête terminée
+    RESPONSE_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_RESPONSE_TTL_SECONDS", "86400"))
+    # Durée de vie du marqueur "en cours" (> timeout Gunicorn) : libère la clé si le worker meurt
+    PENDING_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_PENDING_TTL_SECONDS", "300"))
+    # Attente maximale d'une requête identique déjà en cours avant de répondre 409
+    WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "120"))
+    RETRY_AFTER_SECONDS = int(os.getenv("IDEMPOTENCY_RETRY_AFTER_SECONDS", "5"))
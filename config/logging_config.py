@@ -0,0 +1,17 @@
+import os
+
+
+class LoggingConfig:
+    LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    # json (une ligne JSON par message) ou text (lecture locale)
+    FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+    # File entre les threads de requête et le thread d'écriture ; pleine,
+    # les messages sont abandonnés (log_records_dropped_total) plutôt que d'attendre
+    QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    REQUEST_ID_HEADER = os.getenv("LOG_REQUEST_ID_HEADER", "X-Request-ID")
+
+    # Échantillonnage des messages fréquents (0 à 1) : ligne d'accès par
+    # requête et confirmations d'enregistrement. Les réponses 5xx et les
+    # messages WARNING et au-delà ne sont jamais échantillonnés.
+    ACCESS_SAMPLE_RATE = float(os.getenv("LOG_ACCESS_SAMPLE_RATE", "1.0"))
+    SUCCESS_SAMPLE_RATE = float(os.getenv("LOG_SUCCESS_SAMPLE_RATE", "0.1"))
@@ -0,0 +1,19 @@
+import os
+
+
+class MergeConfig:
+    """
+    Fusion d'un document re-scanné avec la ligne déjà enregistrée (même
+    CIN, même numéro de permis, même immatriculation).
+
+    POLICY :
+    - keep_newest    : les valeurs du dernier scan remplacent les anciennes
+    - keep_non_empty : un champ vide ou absent du dernier scan garde
+                       l'ancienne valeur
+
+    Seul un re-scan du propriétaire de la ligne est fusionné (une ligne sans
+    propriétaire est réclamée par le premier re-scan). Pour la CIN et
+    le permis, la détection des doublons (DuplicateConfig) passe avant : un
+    doublon confirmé est renvoyé tel quel, sans fusion.
+    """
+    POLICY = os.getenv("SAVE_MERGE_POLICY", "keep_newest").lower()
@@ -0,0 +1,21 @@
+import os
+
+
+class PasswordHashingConfig:
+    """
+    Hachage bcrypt des mots de passe dans un pool de processus dédié (par worker Gunicorn).
+
+    bcrypt est du calcul CPU pur : exécuté dans le thread de la requête, il
+    bloque le worker pendant plusieurs centaines de millisecondes.
+    """
+    # Facteur de coût bcrypt ; un changement est appliqué au prochain login (rehash)
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+    # Processus du pool ; la capacité totale vaut GUNICORN_WORKERS * POOL_SIZE
+    POOL_SIZE = int(os.getenv("PASSWORD_HASH_POOL_SIZE", "2"))
+    # Demandes en attente au-delà des processus occupés avant de répondre 503
+    MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "16"))
+    # Délai maximal d'attente du résultat (file + calcul)
+    TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "10"))
+    # Valeur renvoyée dans l'en-tête Retry-After
+    RETRY_AFTER_SECONDS = int(os.getenv("PASSWORD_HASH_RETRY_AFTER_SECONDS", "2"))
@@ -0,0 +1,17 @@
+import os
+
+
+class ProfilingConfig:
+    # Désactivé par défaut : aucune route ni hook n'est enregistré
+    ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+    ADMIN_EMAILS = {
+        email.strip().lower()
+        for email in os.getenv("ADMIN_EMAILS", "").split(",")
+        if email.strip()
+    }
+    MAX_SAMPLE_SECONDS = float(os.getenv("PROFILING_MAX_SECONDS", "30"))
+    DEFAULT_SAMPLE_SECONDS = float(os.getenv("PROFILING_DEFAULT_SECONDS", "10"))
+    DEFAULT_SAMPLE_INTERVAL = float(os.getenv("PROFILING_DEFAULT_INTERVAL", "0.005"))
+    REQUEST_HEADER = os.getenv("PROFILING_REQUEST_HEADER", "X-Profile")
+    # Profils par requête gardés dans le cache partagé, lisibles depuis tous les workers
+    REQUEST_PROFILE_TTL_SECONDS = float(os.getenv("PROFILING_REQUEST_TTL_SECONDS", "600"))
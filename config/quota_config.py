@@ -0,0 +1,35 @@
+import os
+
+
+class QuotaConfig:
+    """
+    Quotas des endpoints /process (OCR + LLM), par utilisateur et par tenant.
+
+    Le tenant est le domaine de l'email de l'utilisateur. Les domaines de
+    messagerie publics ne forment pas un tenant : seuls les quotas
+    utilisateur s'y appliquent.
+
+    Les compteurs passent par le cache partagé (CACHE_BACKEND) : avec le
+    backend memory, chaque worker Gunicorn compte séparément.
+    """
+    ENABLED = os.getenv("QUOTAS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    USER_DOCUMENTS_PER_MINUTE = int(os.getenv("QUOTA_USER_DOCUMENTS_PER_MINUTE", "10"))
+    USER_MAX_IN_FLIGHT = int(os.getenv("QUOTA_USER_MAX_IN_FLIGHT", "2"))
+    TENANT_DOCUMENTS_PER_MINUTE = int(os.getenv("QUOTA_TENANT_DOCUMENTS_PER_MINUTE", "100"))
+    TENANT_MAX_IN_FLIGHT = int(os.getenv("QUOTA_TENANT_MAX_IN_FLIGHT", "10"))
+
+    PUBLIC_EMAIL_DOMAINS = {
+        d.strip().lower()
+        for d in os.getenv(
+            "QUOTA_PUBLIC_EMAIL_DOMAINS",
+            "gmail.com,googlemail.com,outlook.com,hotmail.com,hotmail.fr,live.com,yahoo.com,yahoo.fr,icloud.com,proton.me",
+        ).split(",")
+        if d.strip()
+    }
+
+    # Filet de sécurité : un compteur d'appels en cours laissé par un
+    # worker tué expire ce délai après le dernier appel accepté (> timeout Gunicorn)
+    IN_FLIGHT_TTL_SECONDS = int(os.getenv("QUOTA_IN_FLIGHT_TTL_SECONDS", "600"))
+    # Retry-After quand la limite d'appels simultanés est atteinte
+    IN_FLIGHT_RETRY_AFTER_SECONDS = int(os.getenv("QUOTA_IN_FLIGHT_RETRY_AFTER_SECONDS", "5"))
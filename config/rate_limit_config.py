@@ -0,0 +1,23 @@
+import os
+
+
+class RateLimitConfig:
+    """
+    Limitation des tentatives sur /auth/login et /auth/register.
+
+    memory : token bucket local au worker (la limite effective vaut alors
+             GUNICORN_WORKERS * limite dans le pire cas)
+    cache  : fenêtre glissante partagée via le cache (CACHE_BACKEND sqlite ou redis)
+    """
+    ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+    BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    WINDOW_SECONDS = float(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "60"))
+
+    LOGIN_PER_IP = int(os.getenv("RATE_LIMIT_LOGIN_PER_IP", "20"))
+    LOGIN_PER_ACCOUNT = int(os.getenv("RATE_LIMIT_LOGIN_PER_ACCOUNT", "5"))
+    REGISTER_PER_IP = int(os.getenv("RATE_LIMIT_REGISTER_PER_IP", "5"))
+
+    # Derrière un proxy (Railway, nginx) : adresse client lue dans X-Forwarded-For
+    TRUST_FORWARDED_FOR = os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "false").lower() in ("1", "true", "yes")
+    # Nombre maximal de clés suivies par le backend mémoire
+    MAX_TRACKED_KEYS = int(os.getenv("RATE_LIMIT_MAX_TRACKED_KEYS", "100000"))
@@ -0,0 +1,26 @@
+import os
+
+
+class TracingConfig:
+    # Désactivé par défaut : aucun span n'est créé
+    ENABLED = os.getenv("TRACING_ENABLED", "false").lower() in ("1", "true", "yes")
+    # Fraction des requêtes tracées ; un en-tête traceparent entrant impose sa décision
+    SAMPLE_RATIO = float(os.getenv("TRACE_SAMPLE_RATIO", "0.1"))
+    SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "intelli-backend")
+    EXCLUDED_PATHS = {
+        path.strip()
+        for path in os.getenv("TRACE_EXCLUDED_PATHS", "/metrics,/health").split(",")
+        if path.strip()
+    }
+
+    # file : une requête OTLP/JSON par ligne dans EXPORT_FILE
+    # otlp_http : POST OTLP/JSON vers un collecteur (ex: OpenTelemetry Collector)
+    EXPORTER = os.getenv("TRACE_EXPORTER", "file").lower()
+    EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "traces.jsonl")
+    OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    OTLP_TIMEOUT_SECONDS = float(os.getenv("TRACE_OTLP_TIMEOUT_SECONDS", "5"))
+
+    # Export par lots depuis un thread dédié ; file pleine, les spans sont abandonnés
+    QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+    BATCH_SIZE = int(os.getenv("TRACE_BATCH_SIZE", "512"))
+    EXPORT_INTERVAL_SECONDS = float(os.getenv("TRACE_EXPORT_INTERVAL_SECONDS", "2"))
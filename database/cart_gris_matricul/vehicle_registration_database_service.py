@@ -1,10 +1,33 @@
-from database.cart_gris_matricul.vehicle_registration_entity import SessionLocal, GrisDataDB
+from sqlalchemy import func, select
+from database.cart_gris_matricul.vehicle_registration_entity import SessionLocal, GrisDataDB, engine
+from database.data_version import bump_data_version
+from database.user_stats.user_stats_database_service import record_document
+from database.row_queries import fetch_rows, stream_rows
+from database.upsert import save_document, INSERTED, OWNED_BY_OTHER, DocumentOwnedByOtherUserError
+from config.merge_config import MergeConfig
+from config.logging_config import LoggingConfig
+from utils.logger import get_logger
+from database.date_buckets import date_bucket
 from datetime import datetime
 
-def save_gris_data(gris_data):
+logger = get_logger(__name__)
+
+# Colonnes renvoyées par /gris/all (ni user_id ni colonnes internes)
+PUBLIC_COLUMNS = (
+    GrisDataDB.id, GrisDataDB.numero_matricule_marocain, GrisDataDB.immatriculation_anterieure,
+    GrisDataDB.date_premiere_immatriculation, GrisDataDB.date_derniere_immatriculation,
+    GrisDataDB.date_mutation, GrisDataDB.marque, GrisDataDB.type, GrisDataDB.genre,
+    GrisDataDB.type_carburant, GrisDataDB.numero_chassis, GrisDataDB.nombre_cylindres,
+    GrisDataDB.puissance_fiscale, GrisDataDB.restriction, GrisDataDB.usage_type,
+    GrisDataDB.usage_description, GrisDataDB.nom_fr, GrisDataDB.nom_ar, GrisDataDB.prenom_fr,
+    GrisDataDB.prenom_ar, GrisDataDB.adresse_fr, GrisDataDB.adresse_ar, GrisDataDB.date_validite,
+)
+
+def save_gris_data(gris_data, processing_duration=None, user_id=None):
+    """Enregistre la carte grise, ou la fusionne avec celle déjà enregistrée sous la même immatriculation (SAVE_MERGE_POLICY)."""
     session = SessionLocal()
     try:
-        db_entry = GrisDataDB(
+        values = dict(
             numero_matricule_marocain = gris_data.numero_matricule_marocain.numero,
             immatriculation_anterieure = gris_data.immatriculation_anterieure.numero,
             date_premiere_immatriculation = datetime.strptime(
@@ -39,11 +62,23 @@ def save_gris_data(gris_data):
 
             date_validite = datetime.strptime(
                 gris_data.valiadtion, "%d.%m.%Y"
-            ).date() if gris_data.valiadtion else None
+            ).date() if gris_data.valiadtion else None,
+
+            processing_duration = processing_duration,
+            user_id = user_id
         )
-        session.add(db_entry)
+        # Un re-scan met à jour la ligne existante au lieu d'échouer sur la contrainte unique
+        outcome = save_document(session, GrisDataDB.__table__, values, "numero_matricule_marocain", MergeConfig.POLICY)
+        if outcome == OWNED_BY_OTHER:
+            raise DocumentOwnedByOtherUserError(values["numero_matricule_marocain"])
+        # Même transaction : le compteur de /me ne compte que les insertions, pas les re-scans
+        if outcome == INSERTED:
+            record_document(session, user_id, "gris")
         session.commit()
-        print("Carte grise enregistrée avec succès !")
+        bump_data_version()
+        logger.info("Carte grise enregistrée avec succès !", extra={
+            "document_type": "gris", "user_id": user_id, "sample_rate": LoggingConfig.SUCCESS_SAMPLE_RATE
+        })
     except Exception as e:
         session.rollback()
         raise
@@ -56,5 +91,27 @@ def get_all_gris_data():
         return session.query(GrisDataDB).all()
     finally:
         session.close()
-                
 
+def get_all_gris_rows():
+    return fetch_rows(SessionLocal, PUBLIC_COLUMNS)
+
+def stream_all_gris_rows(batch_size=1000, slot=None):
+    return stream_rows(SessionLocal, PUBLIC_COLUMNS, batch_size, slot)
+
+def registration_months_query(start=None, end=None):
+    """Immatriculations par mois de première mise en circulation, dates NULL exclues, sur [start, end["""
+    column = GrisDataDB.date_premiere_immatriculation
+    month = date_bucket(column, "month", engine.dialect.name).label("month")
+    statement = select(month, func.count().label("count")).where(column.isnot(None))
+    if start is not None:
+        statement = statement.where(column >= start)
+    if end is not None:
+        statement = statement.where(column < end)
+    return statement.group_by(month).order_by(month)
+
+def count_gris_by_registration_month(start=None, end=None):
+    session = SessionLocal()
+    try:
+        return session.execute(registration_months_query(start, end)).all()
+    finally:
+        session.close()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Date, Float
+from sqlalchemy import create_engine, Column, Integer, String, Date, DateTime, Float, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config.database_config import DatabaseConfig
@@ -13,7 +13,7 @@ class GrisDataDB(Base):
     numero_matricule_marocain = Column(String, unique=True, nullable=False)
     immatriculation_anterieure = Column(String, nullable=True)
 
-    date_premiere_immatriculation = Column(Date, nullable=True)      
+    date_premiere_immatriculation = Column(Date, nullable=True, index=True)
     date_derniere_immatriculation = Column(Date, nullable=True)     
     date_mutation = Column(Date, nullable=True)
 
@@ -26,7 +26,7 @@ class GrisDataDB(Base):
     puissance_fiscale = Column(Integer, nullable=True)
     restriction = Column(String, nullable=True)
 
-    usage_type = Column(String, nullable=True)
+    usage_type = Column(String, nullable=True, index=True)
     usage_description = Column(String, nullable=True)
 
     nom_fr = Column(String, nullable=True)
@@ -39,6 +39,11 @@ class GrisDataDB(Base):
 
     date_validite = Column(Date, nullable=True)
 
+    created_at = Column(DateTime, server_default=func.now(), default=func.now(), index=True)
+    processing_duration = Column(Float, nullable=True)
+    # Utilisateur ayant soumis le document (NULL pour les documents antérieurs)
+    user_id = Column(Integer, nullable=True, index=True)
+
     def as_dict(self):
         return {c.name: getattr(self, c.name) for c in self.__table__.columns}
 
@@ -0,0 +1,26 @@
+"""
+Renseigne city_code pour les CIN existantes.
+
+Usage (depuis la racine du projet) :
+    python -m database.cart_identite_national.backfill_city_codes
+    python -m database.cart_identite_national.backfill_city_codes --all   # après modification du gazetteer
+"""
+import argparse
+from database.cart_identite_national.identity_card_database_service import backfill_city_codes
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="Recalculer toutes les lignes, pas seulement les NULL")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    updated = backfill_city_codes(recompute=args.all, batch_size=args.batch_size)
+    logger.info("Codes de ville renseignés", extra={"updated": updated, "recompute": args.all})
+
+
+if __name__ == "__main__":
+    main()
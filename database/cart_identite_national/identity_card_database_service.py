@@ -1,10 +1,37 @@
+from sqlalchemy import select, update
 from database.cart_identite_national.identity_card_entity import SessionLocal, CINDataDB
+from database.data_version import bump_data_version
+from database.user_stats.user_stats_database_service import record_document
+from database.row_queries import fetch_rows, stream_rows
+from database.upsert import save_document, INSERTED, OWNED_BY_OTHER, DocumentOwnedByOtherUserError
+from config.merge_config import MergeConfig
+from config.logging_config import LoggingConfig
+from utils.logger import get_logger
+from utils.city_normalizer import normalize_city
+from services.duplicate_detection import create_index
 from datetime import datetime
 
-def save_cin_data(cin_data):
+logger = get_logger(__name__)
+
+# Colonnes renvoyées par /cin/all (ni user_id ni colonnes internes)
+PUBLIC_COLUMNS = (
+    CINDataDB.id, CINDataDB.cin, CINDataDB.nom_fr, CINDataDB.nom_ar, CINDataDB.prenom_fr,
+    CINDataDB.prenom_ar, CINDataDB.date_naissance, CINDataDB.lieu_fr, CINDataDB.lieu_ar,
+    CINDataDB.adresse_fr, CINDataDB.adresse_ar, CINDataDB.sexe, CINDataDB.validite, CINDataDB.pere_fr,
+    CINDataDB.pere_ar, CINDataDB.mere_fr, CINDataDB.mere_ar, CINDataDB.numero_etat_civil,
+)
+
+# Numéros de CIN candidats dans le texte OCR (ex: AB123456, J 45678)
+cin_number_index = create_index(
+    "cin", CINDataDB.cin, SessionLocal, r"\b[A-Z]{1,3}\s?\d{3,6}[A-Z]{0,3}\b",
+    identity_columns=(CINDataDB.nom_fr, CINDataDB.prenom_fr, CINDataDB.nom_ar, CINDataDB.prenom_ar, CINDataDB.date_naissance),
+)
+
+def save_cin_data(cin_data, processing_duration=None, user_id=None):
+    """Enregistre la CIN, ou la fusionne avec celle déjà enregistrée sous le même numéro (SAVE_MERGE_POLICY)."""
     session = SessionLocal()
     try:
-        db_entry = CINDataDB(
+        values = dict(
             cin=cin_data.cin,
             nom_fr=cin_data.identite.nom.fr,
             nom_ar=cin_data.identite.nom.ar,
@@ -21,17 +48,58 @@ def save_cin_data(cin_data):
             pere_ar=cin_data.parents.pere.ar,
             mere_fr=cin_data.parents.mere.fr,
             mere_ar=cin_data.parents.mere.ar,
-            numero_etat_civil=cin_data.etat_civil.numero_etat_civil
+            numero_etat_civil=cin_data.etat_civil.numero_etat_civil,
+            city_code=normalize_city(
+                cin_data.naissance.lieu.fr, cin_data.adresse.fr,
+                cin_data.naissance.lieu.ar, cin_data.adresse.ar
+            ),
+            processing_duration=processing_duration,
+            user_id=user_id
         )
-        session.add(db_entry)
+        # Un re-scan met à jour la ligne existante au lieu d'échouer sur la contrainte unique
+        outcome = save_document(session, CINDataDB.__table__, values, "cin", MergeConfig.POLICY)
+        if outcome == OWNED_BY_OTHER:
+            raise DocumentOwnedByOtherUserError(values["cin"])
+        # Même transaction : le compteur de /me ne compte que les insertions, pas les re-scans
+        if outcome == INSERTED:
+            record_document(session, user_id, "cin")
         session.commit()
-        print("CIN enregistré avec succès !")
+        bump_data_version()
+        cin_number_index.add(values["cin"])
+        logger.info("CIN enregistré avec succès !", extra={
+            "document_type": "cin", "user_id": user_id, "sample_rate": LoggingConfig.SUCCESS_SAMPLE_RATE
+        })
     except Exception as e:
         session.rollback()
         raise e
     finally:
         session.close()
         
+def _format_date(value):
+    return value.strftime("%d.%m.%Y") if value else None
+
+def cin_record(row):
+    """Ligne cin_data au format de réponse de /cin/process (CINData)."""
+    return {
+        "cin": row.cin,
+        "identite": {
+            "nom": {"fr": row.nom_fr, "ar": row.nom_ar},
+            "prenom": {"fr": row.prenom_fr, "ar": row.prenom_ar},
+        },
+        "naissance": {
+            "date": _format_date(row.date_naissance),
+            "lieu": {"fr": row.lieu_fr, "ar": row.lieu_ar},
+        },
+        "adresse": {"fr": row.adresse_fr, "ar": row.adresse_ar},
+        "sexe": row.sexe,
+        "validite": _format_date(row.validite),
+        "parents": {
+            "pere": {"fr": row.pere_fr, "ar": row.pere_ar},
+            "mere": {"fr": row.mere_fr, "ar": row.mere_ar},
+        },
+        "etat_civil": {"numero_etat_civil": row.numero_etat_civil},
+    }
+
 def get_all_cin_data():
     session = SessionLocal()
     try:
@@ -39,4 +107,42 @@ def get_all_cin_data():
     finally:
         session.close()
 
-        
\ No newline at end of file
+def get_all_cin_rows():
+    return fetch_rows(SessionLocal, PUBLIC_COLUMNS)
+
+def stream_all_cin_rows(batch_size=1000, slot=None):
+    return stream_rows(SessionLocal, PUBLIC_COLUMNS, batch_size, slot)
+
+def backfill_city_codes(recompute=False, batch_size=1000):
+    """
+    Calcule city_code pour les CIN enregistrées avant son introduction
+    (ou pour toutes si recompute=True, après une mise à jour du gazetteer).
+    Parcours par lots sur la clé primaire ; retourne le nombre de lignes mises à jour.
+    """
+    columns = (CINDataDB.id, CINDataDB.lieu_fr, CINDataDB.adresse_fr, CINDataDB.lieu_ar, CINDataDB.adresse_ar)
+    updated = 0
+    last_id = 0
+    session = SessionLocal()
+    try:
+        while True:
+            query = select(*columns).where(CINDataDB.id > last_id).order_by(CINDataDB.id).limit(batch_size)
+            if not recompute:
+                query = query.where(CINDataDB.city_code.is_(None))
+            rows = session.execute(query).all()
+            if not rows:
+                break
+            session.execute(update(CINDataDB), [
+                {"id": row_id, "city_code": normalize_city(lieu_fr, adresse_fr, lieu_ar, adresse_ar)}
+                for row_id, lieu_fr, adresse_fr, lieu_ar, adresse_ar in rows
+            ])
+            session.commit()
+            updated += len(rows)
+            last_id = rows[-1][0]
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    if updated:
+        bump_data_version()
+    return updated
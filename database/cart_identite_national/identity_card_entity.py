@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Date
+from sqlalchemy import create_engine, Column, Integer, String, Date, DateTime, Float, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -20,13 +20,21 @@ class CINDataDB(Base):
     lieu_ar = Column(String)
     adresse_fr = Column(String)
     adresse_ar = Column(String)
-    sexe = Column(String)
+    sexe = Column(String, index=True)
     validite = Column(Date)
     pere_fr = Column(String)
     pere_ar = Column(String)
     mere_fr = Column(String)
     mere_ar = Column(String)
     numero_etat_civil = Column(String)
+    # Ville normalisée (utils/city_normalizer) calculée à l'enregistrement
+    city_code = Column(String, index=True)
+    # default côté client : les colonnes ajoutées par ensure_schema sur SQLite n'ont pas de défaut SQL
+    created_at = Column(DateTime, server_default=func.now(), default=func.now(), index=True)
+    # Durée du pipeline upload -> OCR -> LLM -> enregistrement, en secondes
+    processing_duration = Column(Float, nullable=True)
+    # Utilisateur ayant soumis le document (NULL pour les documents antérieurs)
+    user_id = Column(Integer, nullable=True, index=True)
 
 # Create engine with connection pooling and SSL configuration
 engine = create_engine(
@@ -1,11 +1,36 @@
 from database.cart_permi_conduite.driving_license_entity import SessionLocal, PermiDataDB
+from database.data_version import bump_data_version
+from database.user_stats.user_stats_database_service import record_document
+from database.row_queries import fetch_rows, stream_rows
+from database.upsert import save_document, INSERTED, OWNED_BY_OTHER, DocumentOwnedByOtherUserError
+from config.merge_config import MergeConfig
+from config.logging_config import LoggingConfig
+from utils.logger import get_logger
+from services.duplicate_detection import create_index
 from datetime import datetime
 
+logger = get_logger(__name__)
 
-def save_permi_data(permi_data):
+# Colonnes renvoyées par /permis/all (ni user_id ni colonnes internes)
+PUBLIC_COLUMNS = (
+    PermiDataDB.id, PermiDataDB.numero_permis, PermiDataDB.nom_fr, PermiDataDB.nom_ar, PermiDataDB.prenom_fr,
+    PermiDataDB.prenom_ar, PermiDataDB.date_naissance, PermiDataDB.lieu_fr, PermiDataDB.lieu_ar,
+    PermiDataDB.date_delivrance, PermiDataDB.date_expiration, PermiDataDB.categorie,
+)
+
+# Numéros de permis candidats dans le texte OCR (ex: 55/193059)
+permi_number_index = create_index(
+    "permis", PermiDataDB.numero_permis, SessionLocal, r"\b\d{1,2}\s?/\s?\d{6}\b",
+    identity_columns=(PermiDataDB.nom_fr, PermiDataDB.prenom_fr, PermiDataDB.nom_ar, PermiDataDB.prenom_ar,
+                      PermiDataDB.date_naissance),
+)
+
+
+def save_permi_data(permi_data, processing_duration=None, user_id=None):
+    """Enregistre le permis, ou le fusionne avec celui déjà enregistré sous le même numéro (SAVE_MERGE_POLICY)."""
     session = SessionLocal()
     try:
-        db_entry = PermiDataDB(
+        values = dict(
             numero_permis=permi_data.permis.numero_permis,
             nom_fr=permi_data.identite.nom.fr,
             nom_ar=permi_data.identite.nom.ar,
@@ -16,21 +41,60 @@ def save_permi_data(permi_data):
             lieu_ar=permi_data.naissance.lieu.ar,
             date_delivrance=datetime.strptime(permi_data.permis.date_delivrance, "%d.%m.%Y").date(),
             date_expiration=datetime.strptime(permi_data.permis.date_expiration, "%d.%m.%Y").date(),
-            categorie=permi_data.permis.categorie
+            categorie=permi_data.permis.categorie,
+            processing_duration=processing_duration,
+            user_id=user_id
         )
-        session.add(db_entry)
+        # Un re-scan met à jour la ligne existante au lieu d'échouer sur la contrainte unique
+        outcome = save_document(session, PermiDataDB.__table__, values, "numero_permis", MergeConfig.POLICY)
+        if outcome == OWNED_BY_OTHER:
+            raise DocumentOwnedByOtherUserError(values["numero_permis"])
+        # Même transaction : le compteur de /me ne compte que les insertions, pas les re-scans
+        if outcome == INSERTED:
+            record_document(session, user_id, "permis")
         session.commit()
-        print("Permis de conduire enregistré avec succès !")
+        bump_data_version()
+        permi_number_index.add(values["numero_permis"])
+        logger.info("Permis de conduire enregistré avec succès !", extra={
+            "document_type": "permis", "user_id": user_id, "sample_rate": LoggingConfig.SUCCESS_SAMPLE_RATE
+        })
     except Exception:
         session.rollback()
         raise
     finally:
         session.close()
 
+def _format_date(value):
+    return value.strftime("%d.%m.%Y") if value else None
+
+def permi_record(row):
+    """Ligne permi_data au format de réponse de /permis/process (PermisData)."""
+    return {
+        "permis": {
+            "numero_permis": row.numero_permis,
+            "date_delivrance": _format_date(row.date_delivrance),
+            "date_expiration": _format_date(row.date_expiration),
+            "categorie": row.categorie,
+        },
+        "identite": {
+            "nom": {"fr": row.nom_fr, "ar": row.nom_ar},
+            "prenom": {"fr": row.prenom_fr, "ar": row.prenom_ar},
+        },
+        "naissance": {
+            "date": _format_date(row.date_naissance),
+            "lieu": {"fr": row.lieu_fr, "ar": row.lieu_ar},
+        },
+    }
+
 def get_all_permi_data():
     session = SessionLocal()
     try:
         return session.query(PermiDataDB).all()
     finally:
         session.close()
-        
\ No newline at end of file
+
+def get_all_permi_rows():
+    return fetch_rows(SessionLocal, PUBLIC_COLUMNS)
+
+def stream_all_permi_rows(batch_size=1000, slot=None):
+    return stream_rows(SessionLocal, PUBLIC_COLUMNS, batch_size, slot)
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Date
+from sqlalchemy import create_engine, Column, Integer, String, Date, DateTime, Float, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -20,7 +20,12 @@ class PermiDataDB(Base):
     lieu_ar = Column(String)
     date_delivrance = Column(Date)
     date_expiration = Column(Date)
-    categorie = Column(String)
+    categorie = Column(String, index=True)
+    # Date d'enregistrement (séries temporelles du dashboard)
+    created_at = Column(DateTime, server_default=func.now(), default=func.now(), index=True)
+    processing_duration = Column(Float, nullable=True)
+    # Utilisateur ayant soumis le document (NULL pour les documents antérieurs)
+    user_id = Column(Integer, nullable=True, index=True)
 
 
 
@@ -0,0 +1,21 @@
+"""
+Numéro de version des données documentaires.
+
+Incrémenté à chaque enregistrement (save_*_data) : les caches dérivés des
+tables (graphiques du dashboard) sont indexés par cette version et
+deviennent donc obsolètes dès qu'un nouveau document est sauvegardé.
+
+La version est stockée dans le cache partagé (CACHE_BACKEND) : avec les
+backends sqlite ou redis, tous les workers voient le même numéro.
+"""
+from cache.cache_service import get_cache
+
+_VERSION_KEY = "documents"
+
+
+def get_data_version() -> int:
+    return get_cache("data-version").get(_VERSION_KEY, 0)
+
+
+def bump_data_version() -> int:
+    return get_cache("data-version").incr(_VERSION_KEY)
@@ -0,0 +1,41 @@
+"""
+Regroupement de dates par période (jour, mois) côté base de données.
+
+PostgreSQL : to_char(date_trunc(unit, col)) ; SQLite : strftime(col).
+Les deux renvoient la même clé texte ("AAAA-MM" ou "AAAA-MM-JJ"), ce qui
+permet aux appelants de fusionner les résultats sans dépendre du dialecte.
+"""
+from datetime import date, datetime, timezone
+from sqlalchemy import func
+
+SQLITE_FORMATS = {"day": "%Y-%m-%d", "month": "%Y-%m"}
+POSTGRES_FORMATS = {"day": "YYYY-MM-DD", "month": "YYYY-MM"}
+
+
+def date_bucket(column, unit: str, dialect_name: str):
+    if unit not in SQLITE_FORMATS:
+        raise ValueError(f"Unité de regroupement inconnue: {unit}")
+    if dialect_name == "postgresql":
+        return func.to_char(func.date_trunc(unit, column), POSTGRES_FORMATS[unit])
+    return func.strftime(SQLITE_FORMATS[unit], column)
+
+
+def bucket_key(value: date, unit: str) -> str:
+    return value.strftime(SQLITE_FORMATS[unit])
+
+
+def utc_now() -> datetime:
+    # created_at est rempli par now() / CURRENT_TIMESTAMP : UTC, sans fuseau
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def month_starts(count: int, today: date) -> list:
+    """Premiers jours des `count` derniers mois, du plus ancien au mois courant."""
+    year, month = today.year, today.month
+    months = []
+    for _ in range(count):
+        months.append(date(year, month, 1))
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return months[::-1]
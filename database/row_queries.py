@@ -0,0 +1,70 @@
+"""
+Lecture de tables sous forme de tuples SQL, sans hydratation ORM.
+
+Utilisé par les endpoints /all : les lignes sont sérialisées directement
+(voir utils.json_provider), sans créer d'objets mappés ni d'état de session.
+Seules les colonnes passées sont lues : chaque service fournit sa liste de
+colonnes publiques (ni user_id ni colonnes internes).
+"""
+from contextlib import ExitStack
+from sqlalchemy import select
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def fetch_rows(session_factory, columns):
+    """Retourne (noms de colonnes, liste de tuples) de `columns` pour toute la table."""
+    session = session_factory()
+    try:
+        result = session.execute(select(*columns))
+        return list(result.keys()), result.all()
+    finally:
+        session.close()
+
+
+class RowBatches:
+    """
+    Itérateur de lots de tuples lu depuis un curseur côté serveur (yield_per).
+
+    La session est ouverte et la requête exécutée dès la construction : une
+    erreur de base (ou un slot refusé) survient avant l'envoi du premier
+    octet. `close()` libère la session et le slot éventuel ; il est appelé
+    à l'épuisement et par la réponse quand elle se termine ou est abandonnée.
+    """
+
+    def __init__(self, session_factory, columns, batch_size: int = DEFAULT_BATCH_SIZE, slot=None):
+        self._resources = ExitStack()
+        try:
+            if slot is not None:
+                self._resources.enter_context(slot)
+            session = session_factory()
+            self._resources.callback(session.close)
+            result = session.execute(select(*columns).execution_options(yield_per=batch_size))
+            self._partitions = result.partitions()
+        except BaseException:
+            self._resources.close()
+            raise
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._partitions)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        self._resources.close()
+
+
+def stream_rows(session_factory, columns, batch_size: int = DEFAULT_BATCH_SIZE, slot=None):
+    """
+    Retourne (noms de colonnes, RowBatches).
+
+    `slot` (ex: `stage_slot("db")`) est réservé pendant toute la durée de
+    vie du curseur, pas seulement jusqu'au retour de la vue.
+    """
+    names = [column.name for column in columns]
+    return names, RowBatches(session_factory, columns, batch_size, slot)
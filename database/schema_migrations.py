@@ -0,0 +1,137 @@
+"""
+Mise à niveau du schéma des tables existantes.
+
+`Base.metadata.create_all()` crée les tables absentes mais ne modifie pas
+une table existante : les colonnes et index ajoutés aux entités après le
+premier déploiement (ex: created_at, index des graphiques) sont ajoutés ici.
+
+Exécuté une seule fois avant le démarrage des workers, jamais à l'import
+des entités :
+
+    python -m database.schema_migrations
+
+`gunicorn.conf.py` le lance dans `on_starting` (désactivable par
+SCHEMA_MIGRATE_ON_START=false quand une tâche de déploiement s'en charge).
+Sur PostgreSQL, un verrou consultatif sérialise les exécutions concurrentes
+(plusieurs réplicas) et les index sont créés avec CREATE INDEX CONCURRENTLY,
+hors transaction, pour ne pas bloquer les écritures.
+"""
+import importlib
+from contextlib import contextmanager
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateIndex
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Modules déclarant `engine` et `Base` ; leur import crée les tables absentes
+ENTITY_MODULES = (
+    "auth.authentication_model",
+    "database.user_stats.user_stats_entity",
+    "database.cart_identite_national.identity_card_entity",
+    "database.cart_permi_conduite.driving_license_entity",
+    "database.cart_gris_matricul.vehicle_registration_entity",
+)
+
+# Clé arbitraire du verrou consultatif PostgreSQL des migrations
+MIGRATION_LOCK_KEY = 723_104_036
+
+
+def _add_column(connection, table, column):
+    """
+    Ajoute la colonne sans renseigner les lignes existantes : un created_at
+    rempli à l'heure de la migration placerait tout l'historique dans le
+    mois (ou le jour) du déploiement. Les lignes antérieures restent NULL et
+    sont ignorées par les graphiques ; seules les nouvelles lignes reçoivent
+    le défaut.
+    """
+    dialect = connection.dialect
+    column_type = column.type.compile(dialect=dialect)
+    if dialect.name == "postgresql":
+        connection.execute(text(
+            f'ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS "{column.name}" {column_type}'
+        ))
+        if column.server_default is not None:
+            default = column.server_default.arg.compile(dialect=dialect)
+            connection.execute(text(f'ALTER TABLE {table.name} ALTER COLUMN "{column.name}" SET DEFAULT {default}'))
+        return
+
+    # SQLite ne sait ni ajouter une colonne avec un défaut non constant
+    # (CURRENT_TIMESTAMP) ni modifier un défaut : les nouvelles lignes sont
+    # horodatées par le défaut côté client de l'entité (default=func.now())
+    try:
+        connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+    except OperationalError as e:
+        if "duplicate column" not in str(e).lower():
+            raise
+
+
+@contextmanager
+def _migration_lock(engine):
+    with engine.connect() as connection:
+        if connection.dialect.name != "postgresql":
+            yield
+            return
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+
+def _invalid_indexes(connection):
+    """Index PostgreSQL laissés invalides par un CREATE INDEX CONCURRENTLY interrompu."""
+    if connection.dialect.name != "postgresql":
+        return set()
+    rows = connection.execute(text(
+        "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE NOT i.indisvalid"
+    ))
+    return {row[0] for row in rows}
+
+
+def _create_index(connection, index):
+    ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=connection.dialect))
+    if connection.dialect.name == "postgresql":
+        ddl = ddl.replace("INDEX ", "INDEX CONCURRENTLY ", 1)
+    connection.execute(text(ddl))
+
+
+def ensure_schema(engine, metadata):
+    """Ajoute les colonnes et index déclarés sur les entités mais absents en base."""
+    with _migration_lock(engine):
+        inspector = inspect(engine)
+        tables = [table for table in metadata.sorted_tables if inspector.has_table(table.name)]
+        with engine.begin() as connection:
+            for table in tables:
+                existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name not in existing_columns:
+                        logger.info("Ajout de colonne", extra={"table": table.name, "column": column.name})
+                        _add_column(connection, table, column)
+
+        # CREATE INDEX CONCURRENTLY est interdit dans une transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            invalid = _invalid_indexes(connection)
+            for table in tables:
+                existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+                for index in table.indexes:
+                    if index.name in invalid:
+                        connection.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"'))
+                    elif index.name in existing_indexes:
+                        continue
+                    logger.info("Création d'index", extra={"table": table.name, "index": index.name})
+                    _create_index(connection, index)
+
+
+def migrate():
+    """Crée les tables absentes puis met à niveau celles qui existent déjà."""
+    for name in ENTITY_MODULES:
+        module = importlib.import_module(name)
+        ensure_schema(module.engine, module.Base.metadata)
+        # Pas de connexion héritée par les processus lancés ensuite
+        module.engine.dispose()
+
+
+if __name__ == "__main__":
+    migrate()
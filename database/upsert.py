@@ -0,0 +1,135 @@
+"""
+INSERT ... ON CONFLICT DO UPDATE selon le dialecte (PostgreSQL, SQLite >= 3.24).
+
+Une seule instruction atomique remplace le SELECT puis INSERT/UPDATE, qui
+nécessiterait un verrou pour rester correct sous écritures concurrentes.
+"""
+from sqlalchemy import String, func, literal_column, or_
+from sqlalchemy.dialects import postgresql, sqlite
+
+_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def insert_for(dialect_name: str):
+    try:
+        return _INSERTS[dialect_name]
+    except KeyError:
+        raise ValueError(f"⚠️ Upsert non supporté pour le dialecte {dialect_name}")
+
+
+def upsert(dialect_name: str, table, values: dict, index_elements, update, where=None):
+    """
+    Insère `values` ou, en cas de conflit sur `index_elements`, applique
+    `update` : dict colonne -> expression, ou fonction recevant la pseudo-table
+    `excluded` (valeurs proposées) et retournant ce dict. `where` (expression,
+    ou fonction de `excluded`) restreint la mise à jour : faux, la ligne
+    existante reste inchangée.
+    """
+    statement = insert_for(dialect_name)(table).values(**values)
+    set_ = update(statement.excluded) if callable(update) else update
+    if callable(where):
+        where = where(statement.excluded)
+    return statement.on_conflict_do_update(index_elements=list(index_elements), set_=set_, where=where)
+
+
+def increment(dialect_name: str, table, key: dict, counters: dict, assignments: dict = None):
+    """
+    Ajoute `counters` (colonne -> delta) à la ligne identifiée par `key`,
+    créée si besoin ; `assignments` (colonne -> valeur) est écrit tel quel.
+    """
+    assignments = assignments or {}
+
+    def update(excluded):
+        set_ = {name: table.c[name] + excluded[name] for name in counters}
+        set_.update({name: excluded[name] for name in assignments})
+        return set_
+
+    return upsert(dialect_name, table, {**key, **counters, **assignments}, key.keys(), update)
+
+
+KEEP_NEWEST = "keep_newest"
+KEEP_NON_EMPTY = "keep_non_empty"
+
+
+def merge_update(table, columns, policy: str):
+    """
+    Fonction `update` de `upsert` fusionnant `columns` selon `policy` :
+    keep_newest écrit la valeur proposée, keep_non_empty ne l'écrit que si
+    elle n'est ni NULL ni une chaîne vide.
+    """
+    if policy not in (KEEP_NEWEST, KEEP_NON_EMPTY):
+        raise ValueError(f"⚠️ Politique de fusion inconnue : {policy}")
+
+    def update(excluded):
+        set_ = {}
+        for name in columns:
+            proposed = excluded[name]
+            if policy == KEEP_NON_EMPTY:
+                if isinstance(table.c[name].type, String):
+                    proposed = func.nullif(proposed, "")
+                proposed = func.coalesce(proposed, table.c[name])
+            set_[name] = proposed
+        return set_
+
+    return update
+
+
+def merge(dialect_name: str, table, values: dict, key: str, policy: str, owner: str = "user_id"):
+    """
+    Enregistre un document en une instruction : insertion, ou fusion avec la
+    ligne portant la même clé métier `key` (created_at et id conservés).
+
+    Règle de propriété : la ligne appartient à l'utilisateur qui l'a créée.
+    La fusion n'a lieu que si le scan vient de cet utilisateur, ou si la
+    ligne n'a pas de propriétaire (enregistrée avant `owner`) : le premier
+    re-scan la réclame. Sinon la ligne reste inchangée.
+    """
+    columns = [name for name in values if name not in (key, owner)]
+    merge_columns = merge_update(table, columns, policy)
+
+    def update(excluded):
+        set_ = merge_columns(excluded)
+        set_[owner] = excluded[owner]
+        return set_
+
+    return upsert(
+        dialect_name, table, values, [key], update,
+        where=lambda excluded: or_(table.c[owner].is_(None), table.c[owner] == excluded[owner]),
+    )
+
+
+INSERTED = "inserted"
+MERGED = "merged"
+OWNED_BY_OTHER = "owned_by_other"
+
+
+class DocumentOwnedByOtherUserError(Exception):
+    """Clé métier déjà enregistrée par un autre utilisateur : rien n'a été écrit."""
+
+
+def save_document(session, table, values: dict, key: str, policy: str, owner: str = "user_id") -> str:
+    """
+    Exécute `merge` dans la transaction de `session` et retourne INSERTED,
+    MERGED ou OWNED_BY_OTHER, pour ne compter que les vraies insertions.
+
+    PostgreSQL : `RETURNING (xmax = 0)`, vrai pour une ligne insérée, aucune
+    ligne retournée si la fusion est refusée. SQLite n'a pas d'équivalent :
+    un `INSERT ... ON CONFLICT DO NOTHING` tente d'abord l'insertion ; il
+    prend le verrou d'écriture de la base, la fusion qui suit (si la clé
+    existait) voit donc la même ligne jusqu'au commit.
+    """
+    dialect_name = session.get_bind().dialect.name
+    statement = merge(dialect_name, table, values, key, policy, owner)
+    if dialect_name == "postgresql":
+        row = session.execute(statement.returning(literal_column("xmax = 0").label("inserted"))).first()
+        if row is None:
+            return OWNED_BY_OTHER
+        return INSERTED if row.inserted else MERGED
+
+    insert = insert_for(dialect_name)(table).values(**values).on_conflict_do_nothing(index_elements=[key])
+    if session.execute(insert).rowcount:
+        return INSERTED
+    return MERGED if session.execute(statement).rowcount else OWNED_BY_OTHER
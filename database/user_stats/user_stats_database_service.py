@@ -0,0 +1,47 @@
+from sqlalchemy import func
+from database.user_stats.user_stats_entity import SessionLocal, UserStatsDB
+from database.upsert import increment
+
+# Type de document -> colonne de compteur
+COUNTER_COLUMNS = {
+    "cin": "identity_cards",
+    "permis": "driving_licenses",
+    "gris": "registration_cards",
+}
+
+
+def record_document(session, user_id, document_type):
+    """
+    Incrémente le compteur de `user_id` dans la transaction de `session`
+    (le commit de l'enregistrement du document valide aussi le compteur).
+    """
+    if user_id is None:
+        return
+    statement = increment(
+        session.get_bind().dialect.name,
+        UserStatsDB.__table__,
+        {"user_id": user_id},
+        {COUNTER_COLUMNS[document_type]: 1},
+        {"last_activity": func.now()},
+    )
+    session.execute(statement)
+
+
+def get_user_stats(user_id):
+    """Statistiques de /me : une lecture par clé primaire."""
+    session = SessionLocal()
+    try:
+        stats = session.get(UserStatsDB, user_id)
+    finally:
+        session.close()
+
+    identity_cards = stats.identity_cards if stats else 0
+    driving_licenses = stats.driving_licenses if stats else 0
+    registration_cards = stats.registration_cards if stats else 0
+    return {
+        "total_cards_processed": identity_cards + driving_licenses + registration_cards,
+        "identity_cards": identity_cards,
+        "driving_licenses": driving_licenses,
+        "registration_cards": registration_cards,
+        "last_activity": stats.last_activity if stats else None,
+    }
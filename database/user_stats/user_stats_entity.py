@@ -0,0 +1,25 @@
+from sqlalchemy import create_engine, Column, Integer, DateTime
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from config.database_config import DatabaseConfig
+
+Base = declarative_base()
+
+class UserStatsDB(Base):
+    """Compteurs de documents par utilisateur, incrémentés à chaque enregistrement."""
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    identity_cards = Column(Integer, nullable=False, default=0, server_default="0")
+    driving_licenses = Column(Integer, nullable=False, default=0, server_default="0")
+    registration_cards = Column(Integer, nullable=False, default=0, server_default="0")
+    last_activity = Column(DateTime, nullable=True)
+
+
+# Create engine with connection pooling and SSL configuration
+engine = create_engine(
+    DatabaseConfig.get_db_url(),
+    **DatabaseConfig.get_engine_options()
+)
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+Base.metadata.create_all(engine)
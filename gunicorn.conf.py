@@ -0,0 +1,50 @@
+"""
+Profil de déploiement Gunicorn haute concurrence.
+
+Usage : gunicorn -c gunicorn.conf.py "application:create_app()"
+
+- GUNICORN_WORKER_CLASS=gthread (défaut) : N threads par worker, aucune
+  dépendance supplémentaire.
+- GUNICORN_WORKER_CLASS=gevent : greenlets, adapté aux appels OCR/LLM
+  dominés par l'attente réseau. Ne pas activer `preload_app` dans ce mode :
+  le monkey-patching doit précéder l'import de l'application.
+
+Les étapes coûteuses restent bornées par les sémaphores de
+`middlewares/concurrency.py` (MAX_CONCURRENT_OCR / LLM / DB) : au-delà, les
+requêtes reçoivent un 503 avec Retry-After au lieu d'attendre le timeout.
+"""
+import os
+import subprocess
+import sys
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS", "4"))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "100"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Métriques Prometheus agrégées entre workers (voir utils/metrics.py)
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+
+
+def on_starting(server):
+    # Repartir d'un dossier vide : les fichiers d'une exécution précédente
+    # fausseraient les compteurs agrégés
+    multiproc_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    os.makedirs(multiproc_dir, exist_ok=True)
+    for name in os.listdir(multiproc_dir):
+        if name.endswith(".db"):
+            os.remove(os.path.join(multiproc_dir, name))
+
+    # Migrations du schéma une seule fois, avant le fork des workers, dans un
+    # processus séparé : le maître n'hérite d'aucune connexion ouverte
+    if os.getenv("SCHEMA_MIGRATE_ON_START", "true").lower() == "true":
+        subprocess.run([sys.executable, "-m", "database.schema_migrations"], check=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,143 @@
+"""
+Compression des réponses négociée via Accept-Encoding (brotli, gzip).
+
+- Seules les réponses textuelles (JSON, YAML, HTML...) sont compressées :
+  images, PDF et archives le sont déjà.
+- Les réponses complètes plus petites que COMPRESSION_MIN_SIZE_BYTES sont
+  envoyées telles quelles.
+- Les réponses streamées (ex: /cin/all?stream=1) sont compressées lot par
+  lot avec un flush à chaque morceau, le client reçoit donc les données au
+  fil de l'eau.
+- L'ETag d'une réponse compressée devient faible (W/"..."), comme le fait
+  nginx : la comparaison faible de If-None-Match continue de produire des
+  304 quel que soit l'encodage.
+
+brotli est optionnel : sans le paquet, seul gzip est proposé.
+"""
+import gzip
+import time
+import zlib
+from flask import request
+from config.compression_config import CompressionConfig
+from utils.metrics import response_compression_bytes_saved_total, response_compression_duration_seconds
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    brotli = None
+
+SKIPPED_STATUSES = {204, 206, 304}
+
+
+def available_encodings():
+    # Ordre de préférence du serveur à qualité égale
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=CompressionConfig.BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=CompressionConfig.GZIP_LEVEL, mtime=0)
+
+
+class _GzipStream:
+    def __init__(self):
+        self._compressor = zlib.compressobj(CompressionConfig.GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=CompressionConfig.BROTLI_QUALITY)
+
+    def process(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _compress_stream(chunks, encoding: str):
+    compressor = _BrotliStream() if encoding == "br" else _GzipStream()
+    saved = 0
+    elapsed = 0.0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if not chunk:
+                continue
+            start = time.perf_counter()
+            compressed = compressor.process(chunk)
+            elapsed += time.perf_counter() - start
+            saved += len(chunk) - len(compressed)
+            yield compressed
+
+        start = time.perf_counter()
+        tail = compressor.finish()
+        elapsed += time.perf_counter() - start
+        saved -= len(tail)
+        yield tail
+    finally:
+        # Ferme le générateur d'origine (session SQL, contexte de requête)
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+        response_compression_duration_seconds.labels(encoding, "true").observe(elapsed)
+        response_compression_bytes_saved_total.labels(encoding).inc(max(saved, 0))
+
+
+def _is_compressible(response) -> bool:
+    if request.method == "HEAD" or response.direct_passthrough:
+        return False
+    if response.status_code < 200 or response.status_code in SKIPPED_STATUSES:
+        return False
+    if "Content-Encoding" in response.headers or response.cache_control.no_transform:
+        return False
+    return response.mimetype in CompressionConfig.MIMETYPES
+
+
+def _weaken_etag(response):
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def compress_response(response):
+    if not _is_compressible(response):
+        return response
+
+    # La représentation dépend de Accept-Encoding, y compris pour les caches
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(available_encodings())
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < CompressionConfig.MIN_SIZE_BYTES:
+            return response
+        start = time.perf_counter()
+        compressed = compress_bytes(data, encoding)
+        response_compression_duration_seconds.labels(encoding, "false").observe(time.perf_counter() - start)
+        if len(compressed) >= len(data):
+            return response
+        response.set_data(compressed)
+        response_compression_bytes_saved_total.labels(encoding).inc(len(data) - len(compressed))
+
+    response.headers["Content-Encoding"] = encoding
+    _weaken_etag(response)
+    return response
+
+
+def register_compression(app):
+    if CompressionConfig.ENABLED:
+        app.after_request(compress_response)
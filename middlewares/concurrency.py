@@ -0,0 +1,84 @@
+"""
+Limiteurs de concurrence par étape (OCR, LLM, base de données).
+
+Les sémaphores reposent sur `threading`, ce qui fonctionne aussi bien avec
+les workers `gthread` qu'avec `gevent` (le module est alors monkey-patché
+par Gunicorn avant le chargement de l'application).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import jsonify
+from config.concurrency_config import ConcurrencyConfig
+from utils.metrics import stage_semaphore_wait_seconds, stage_rejections_total, stage_in_flight
+
+
+class StageOverloadedError(Exception):
+    def __init__(self, stage: str, retry_after: int):
+        super().__init__(f"Capacité '{stage}' saturée, réessayez dans {retry_after}s")
+        self.stage = stage
+        self.retry_after = retry_after
+
+
+class StageLimiter:
+    def __init__(self, stage: str, limit: int, acquire_timeout: float, retry_after: int):
+        self.stage = stage
+        self.limit = limit
+        self.acquire_timeout = acquire_timeout
+        self.retry_after = retry_after
+        self._semaphore = threading.BoundedSemaphore(limit)
+
+    @contextmanager
+    def slot(self):
+        start = time.perf_counter()
+        acquired = self._semaphore.acquire(timeout=self.acquire_timeout)
+        stage_semaphore_wait_seconds.labels(stage=self.stage).observe(time.perf_counter() - start)
+        if not acquired:
+            stage_rejections_total.labels(stage=self.stage).inc()
+            raise StageOverloadedError(self.stage, self.retry_after)
+
+        stage_in_flight.labels(stage=self.stage).inc()
+        try:
+            yield
+        finally:
+            stage_in_flight.labels(stage=self.stage).dec()
+            self._semaphore.release()
+
+
+_limiters = {
+    stage: StageLimiter(
+        stage,
+        limit,
+        ConcurrencyConfig.ACQUIRE_TIMEOUT_SECONDS,
+        ConcurrencyConfig.RETRY_AFTER_SECONDS,
+    )
+    for stage, limit in ConcurrencyConfig.get_stage_limits().items()
+}
+
+
+def stage_slot(stage: str):
+    """Context manager réservant un slot pour l'étape `stage` ou levant StageOverloadedError."""
+    return _limiters[stage].slot()
+
+
+def concurrency_limited(stage: str):
+    """Décorateur de route : réserve un slot `stage` pendant toute la durée de la vue."""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            with stage_slot(stage):
+                return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+
+def overload_response(error: StageOverloadedError):
+    response = jsonify({"error": str(error), "stage": error.stage})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+
+def register_overload_handler(app):
+    app.register_error_handler(StageOverloadedError, overload_response)
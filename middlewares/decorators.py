@@ -2,6 +2,7 @@ from functools import wraps
 from flask import request, jsonify
 from auth.authentication_model import UserDB, SessionLocal
 from middlewares.jwt_manager import verify_access_token
+from config.profiling_config import ProfilingConfig
 
 def token_required(f):
     @wraps(f)
@@ -25,3 +26,17 @@ def token_required(f):
 
         return f(user, *args, **kwargs)
     return decorated
+
+
+def is_admin(user) -> bool:
+    return bool(user and user.email and user.email.lower() in ProfilingConfig.ADMIN_EMAILS)
+
+
+def admin_required(f):
+    """À placer sous @token_required : réserve la route aux emails de ADMIN_EMAILS."""
+    @wraps(f)
+    def decorated(current_user, *args, **kwargs):
+        if not is_admin(current_user):
+            return jsonify({"error": "Accès réservé aux administrateurs"}), 403
+        return f(current_user, *args, **kwargs)
+    return decorated
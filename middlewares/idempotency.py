@@ -0,0 +1,131 @@
+"""
+Support de l'en-tête Idempotency-Key sur les endpoints /process.
+
+Une relance du front (timeout, réseau) avec la même clé ne repaye ni l'OCR
+ni le LLM :
+- première requête : un marqueur "en cours" est posé par `add` atomique
+  dans le cache partagé, puis la réponse est enregistrée à la fin ;
+- même clé pendant le traitement : la requête attend le résultat (409 avec
+  Retry-After au-delà de IDEMPOTENCY_WAIT_SECONDS) ;
+- même clé après le traitement : la réponse enregistrée (statut, corps et
+  en-têtes comme ETag ou X-Duplicate-Of) est renvoyée avec l'en-tête
+  Idempotent-Replayed.
+
+La clé est propre à l'utilisateur et liée au contenu envoyé : réutilisée
+avec d'autres fichiers, elle est refusée (422). Seules les réponses 2xx
+sont enregistrées : après un refus (400, 409 doublon, 429 quota) ou une
+erreur 5xx, la relance est réexécutée et voit l'état courant.
+"""
+import hashlib
+import time
+from functools import wraps
+from flask import Response, current_app, jsonify, request
+from cache.cache_service import get_cache
+from config.idempotency_config import IdempotencyConfig
+from utils.metrics import idempotency_requests_total
+
+POLL_INTERVAL = 0.1
+PENDING = "pending"
+DONE = "done"
+
+# En-têtes propres à chaque réponse, jamais rejoués
+UNREPLAYED_HEADERS = {"content-length", "date", "set-cookie", "x-request-id"}
+
+
+def _cache():
+    return get_cache("idempotency")
+
+
+def request_fingerprint() -> str:
+    """SHA-256 du chemin, des champs et des fichiers envoyés."""
+    digest = hashlib.sha256(request.path.encode())
+    for name in sorted(request.form):
+        digest.update(f"\0{name}={request.form[name]}".encode())
+    for name in sorted(request.files):
+        storage = request.files[name]
+        digest.update(f"\0{name}\0".encode())
+        for chunk in iter(lambda: storage.stream.read(65536), b""):
+            digest.update(chunk)
+        storage.stream.seek(0)
+    return digest.hexdigest()
+
+
+def _stored_headers(response: Response) -> list:
+    return [(name, value) for name, value in response.headers if name.lower() not in UNREPLAYED_HEADERS]
+
+
+def _replay(entry) -> Response:
+    response = Response(entry["body"], status=entry["status"], headers=entry["headers"])
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _error(message: str, status: int, retry_after: int = None):
+    response = jsonify({"error": message})
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+def _wait_for_result(key: str, fingerprint: str, document_type: str):
+    cache = _cache()
+    deadline = time.monotonic() + IdempotencyConfig.WAIT_SECONDS
+    entry = cache.get(key)
+    while entry is not None and entry["state"] == PENDING and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+
+    if entry is None:
+        # Traitement d'origine en échec (clé libérée) : la relance peut s'exécuter
+        return None
+    if entry["fingerprint"] != fingerprint:
+        idempotency_requests_total.labels(document_type=document_type, result="mismatch").inc()
+        return _error(f"{IdempotencyConfig.HEADER} déjà utilisé pour une autre requête", 422)
+    if entry["state"] == PENDING:
+        idempotency_requests_total.labels(document_type=document_type, result="conflict").inc()
+        return _error("Une requête avec la même clé est toujours en cours", 409, IdempotencyConfig.RETRY_AFTER_SECONDS)
+    idempotency_requests_total.labels(document_type=document_type, result="replayed").inc()
+    return _replay(entry)
+
+
+def idempotent(document_type: str):
+    """À placer sous @token_required et au-dessus de @quota_required (une relance ne consomme pas de quota)."""
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            idempotency_key = request.headers.get(IdempotencyConfig.HEADER)
+            if not idempotency_key:
+                return f(current_user, *args, **kwargs)
+            if len(idempotency_key) > IdempotencyConfig.MAX_KEY_LENGTH:
+                return _error(f"{IdempotencyConfig.HEADER} trop long (max {IdempotencyConfig.MAX_KEY_LENGTH})", 400)
+
+            cache = _cache()
+            key = f"{current_user.id}:{request.path}:{idempotency_key}"
+            fingerprint = request_fingerprint()
+            pending = {"state": PENDING, "fingerprint": fingerprint}
+
+            while not cache.add(key, pending, ttl=IdempotencyConfig.PENDING_TTL_SECONDS):
+                response = _wait_for_result(key, fingerprint, document_type)
+                if response is not None:
+                    return response
+
+            idempotency_requests_total.labels(document_type=document_type, result="executed").inc()
+            stored = False
+            try:
+                response = current_app.make_response(f(current_user, *args, **kwargs))
+                if 200 <= response.status_code < 300 and not response.is_streamed:
+                    cache.set(key, {
+                        "state": DONE,
+                        "fingerprint": fingerprint,
+                        "status": response.status_code,
+                        "headers": _stored_headers(response),
+                        "body": response.get_data(as_text=True),
+                    }, ttl=IdempotencyConfig.RESPONSE_TTL_SECONDS)
+                    stored = True
+                return response
+            finally:
+                if not stored:
+                    cache.delete(key)
+        return decorated
+    return decorator
@@ -1,32 +1,92 @@
 from datetime import datetime, timedelta
+import uuid
 import jwt
 from config.authentication_config import AuthConfig
+from auth.token_revocation import revocation_list
 
 JWT_SECRET = AuthConfig.SECRET_KEY
-JWT_ALGORITHM = "HS256"
-TOKEN_EXPIRATION_HOURS = AuthConfig.TOKEN_EXPIRATION_HOURS
+JWT_ALGORITHM = AuthConfig.JWT_ALGORITHM
+ACCESS_TOKEN_EXPIRATION = timedelta(minutes=AuthConfig.ACCESS_TOKEN_EXPIRATION_MINUTES)
+REFRESH_TOKEN_EXPIRATION = timedelta(days=AuthConfig.REFRESH_TOKEN_EXPIRATION_DAYS)
 
-def create_access_token(user_id: int) -> str:
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+
+def _load_pem(path: str, private: bool):
+    # Clé chargée une seule fois : PyJWT reparserait le PEM à chaque appel
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+
+    with open(path, "rb") as f:
+        data = f.read()
+    return load_pem_private_key(data, password=None) if private else load_pem_public_key(data)
+
+
+def load_keys(algorithm: str):
+    """(clé de signature, clé de vérification) selon l'algorithme configuré."""
+    if algorithm.startswith("HS"):
+        if not JWT_SECRET:
+            raise RuntimeError("⚠️ SECRET_KEY requis pour signer les JWT en " + algorithm)
+        return JWT_SECRET, JWT_SECRET
+    if not AuthConfig.JWT_PUBLIC_KEY_PATH:
+        raise RuntimeError(f"⚠️ JWT_PUBLIC_KEY_PATH requis pour {algorithm}")
+    verifying_key = _load_pem(AuthConfig.JWT_PUBLIC_KEY_PATH, private=False)
+    # Un service qui ne fait que vérifier les jetons peut se passer de la clé privée
+    signing_key = _load_pem(AuthConfig.JWT_PRIVATE_KEY_PATH, private=True) if AuthConfig.JWT_PRIVATE_KEY_PATH else None
+    return signing_key, verifying_key
+
+
+SIGNING_KEY, VERIFYING_KEY = load_keys(JWT_ALGORITHM)
+
+
+def _encode(user_id: int, token_type: str, lifetime: timedelta) -> str:
+    if SIGNING_KEY is None:
+        raise RuntimeError("⚠️ JWT_PRIVATE_KEY_PATH requis pour émettre des jetons")
     now = datetime.utcnow()
     payload = {
         "sub": str(user_id),  # JWT standard => string
         "iat": int(now.timestamp()),  # ✅ timestamp entier
-        "exp": int((now + timedelta(hours=TOKEN_EXPIRATION_HOURS)).timestamp()),
+        "exp": int((now + lifetime).timestamp()),
+        "jti": uuid.uuid4().hex,
+        "type": token_type,
     }
-    token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    token = jwt.encode(payload, SIGNING_KEY, algorithm=JWT_ALGORITHM)
 
     # Compatibilité PyJWT < 2 (retourne bytes au lieu de str)
     if isinstance(token, bytes):
         token = token.decode("utf-8")
     return token
 
-def verify_access_token(token: str) -> int:
+
+def create_access_token(user_id: int) -> str:
+    return _encode(user_id, ACCESS_TOKEN, ACCESS_TOKEN_EXPIRATION)
+
+
+def create_refresh_token(user_id: int) -> str:
+    return _encode(user_id, REFRESH_TOKEN, REFRESH_TOKEN_EXPIRATION)
+
+
+def create_token_pair(user_id: int) -> dict:
+    return {
+        "token": create_access_token(user_id),
+        "refresh_token": create_refresh_token(user_id),
+        "expires_in": int(ACCESS_TOKEN_EXPIRATION.total_seconds()),
+    }
+
+
+def decode_token(token: str, token_type: str = ACCESS_TOKEN, allow_expired: bool = False) -> dict:
+    """
+    Vérifie signature, expiration, type et révocation ; retourne les claims.
+
+    `allow_expired` (logout) accepte un jeton expiré dont la signature est
+    valide : il identifie encore l'utilisateur sans donner accès à l'API.
+    """
     try:
         payload = jwt.decode(
             token,
-            JWT_SECRET,
+            VERIFYING_KEY,
             algorithms=[JWT_ALGORITHM],
-            options={"require": ["exp", "iat", "sub"]},  # on garde strict
+            options={"require": ["exp", "iat", "sub", "jti"], "verify_exp": not allow_expired},  # on garde strict
         )
     except jwt.ExpiredSignatureError:
         raise Exception("Le token a expiré")
@@ -35,8 +95,35 @@ def verify_access_token(token: str) -> int:
     except jwt.InvalidTokenError as e:
         raise Exception(f"Token invalide: {str(e)}")
 
-    user_id = payload.get("sub")
-    if not user_id:
+    if payload.get("type", ACCESS_TOKEN) != token_type:
+        raise Exception(f"Token invalide: type '{token_type}' attendu")
+    if not payload.get("sub"):
         raise Exception("Claim 'sub' introuvable dans le token")
+    if revocation_list.is_revoked(payload["jti"]):
+        raise Exception("Le token a été révoqué")
+    return payload
+
+
+def verify_access_token(token: str) -> int:
+    return int(decode_token(token, ACCESS_TOKEN)["sub"])
+
+
+def is_expired(payload: dict) -> bool:
+    return payload["exp"] <= datetime.utcnow().timestamp()
+
+
+def revoke_token(payload: dict) -> None:
+    revocation_list.revoke(
+        payload["jti"],
+        datetime.utcfromtimestamp(payload["exp"]),
+        int(payload["sub"]),
+    )
+
 
-    return int(user_id)
+def claim_token(payload: dict) -> bool:
+    """Révoque atomiquement un refresh token à son usage ; False s'il avait déjà servi."""
+    return revocation_list.claim(
+        payload["jti"],
+        datetime.utcfromtimestamp(payload["exp"]),
+        int(payload["sub"]),
+    )
@@ -0,0 +1,148 @@
+"""
+Quotas des endpoints /process, par utilisateur et par tenant (domaine email).
+
+Deux limites par portée :
+- documents par minute (fenêtre fixe alignée sur la minute) ;
+- documents en cours de traitement simultanément.
+
+Les compteurs sont des `incr` atomiques dans le cache partagé : un document
+refusé annule ses incréments, il ne consomme donc pas de quota. Le
+décorateur se place sous @token_required, dont il reçoit l'utilisateur.
+
+Le compteur d'appels en cours voit son TTL (filet de sécurité contre un
+worker tué) repoussé à chaque nouvel appel : il n'expire pas tant que des
+appels sont en cours. Les décréments (fin d'appel, annulation) ne touchent
+qu'une clé existante et s'arrêtent à zéro : un compteur expiré n'est jamais
+recréé à -1, sans TTL.
+"""
+import math
+import time
+from functools import wraps
+from flask import jsonify
+from cache.cache_service import get_cache
+from config.quota_config import QuotaConfig
+from utils.metrics import quota_documents_total, quota_in_flight_documents, quota_rejections_total
+
+WINDOW_SECONDS = 60
+
+
+def _cache():
+    return get_cache("quotas")
+
+
+def tenant_of(user):
+    """Domaine de l'email, ou None pour un domaine de messagerie public."""
+    email = (getattr(user, "email", None) or "").lower()
+    domain = email.rpartition("@")[2]
+    if not domain or domain in QuotaConfig.PUBLIC_EMAIL_DOMAINS:
+        return None
+    return domain
+
+
+def _scopes(user):
+    scopes = [("user", str(user.id), QuotaConfig.USER_DOCUMENTS_PER_MINUTE, QuotaConfig.USER_MAX_IN_FLIGHT)]
+    tenant = tenant_of(user)
+    if tenant:
+        scopes.append(("tenant", tenant, QuotaConfig.TENANT_DOCUMENTS_PER_MINUTE, QuotaConfig.TENANT_MAX_IN_FLIGHT))
+    return scopes
+
+
+def _minute_key(scope: str, identifier: str, window: int) -> str:
+    return f"docs:{scope}:{identifier}:{window}"
+
+
+def _in_flight_key(scope: str, identifier: str) -> str:
+    return f"inflight:{scope}:{identifier}"
+
+
+class QuotaExceeded(Exception):
+    def __init__(self, scope: str, quota: str, limit: int, retry_after: int):
+        super().__init__(f"Quota {scope} dépassé ({quota}: {limit})")
+        self.scope = scope
+        self.quota = quota
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+def acquire(user):
+    """
+    Réserve un document pour `user` ; retourne les clés à relâcher via
+    `release`, ou lève QuotaExceeded après avoir annulé les incréments.
+    """
+    cache = _cache()
+    now = time.time()
+    window = int(now // WINDOW_SECONDS)
+    retry_after_window = max(1, math.ceil((window + 1) * WINDOW_SECONDS - now))
+
+    counters = []
+    for scope, identifier, per_minute, max_in_flight in _scopes(user):
+        checks = (
+            (_minute_key(scope, identifier, window), per_minute, "documents_per_minute", 2 * WINDOW_SECONDS, retry_after_window),
+            (_in_flight_key(scope, identifier), max_in_flight, "in_flight", QuotaConfig.IN_FLIGHT_TTL_SECONDS,
+             QuotaConfig.IN_FLIGHT_RETRY_AFTER_SECONDS),
+        )
+        for key, limit, quota, ttl, retry_after in checks:
+            if limit <= 0:
+                continue
+            in_flight = quota == "in_flight"
+            value = cache.incr(key, 1, ttl=ttl, refresh_ttl=in_flight)
+            counters.append((key, in_flight))
+            if value > limit:
+                for rollback_key, _ in counters:
+                    cache.decr_if_exists(rollback_key)
+                raise QuotaExceeded(scope, quota, limit, retry_after)
+
+    return [key for key, in_flight in counters if in_flight]
+
+
+def release(in_flight_keys):
+    cache = _cache()
+    for key in in_flight_keys:
+        cache.decr_if_exists(key)
+
+
+def usage(user) -> dict:
+    """Consommation courante des quotas de `user` (bloc stats de /me)."""
+    cache = _cache()
+    window = int(time.time() // WINDOW_SECONDS)
+    result = {}
+    for scope, identifier, per_minute, max_in_flight in _scopes(user):
+        result[scope] = {
+            "id": identifier,
+            "documents_this_minute": cache.get(_minute_key(scope, identifier, window), 0) or 0,
+            "documents_per_minute_limit": per_minute,
+            "in_flight": cache.get(_in_flight_key(scope, identifier), 0) or 0,
+            "max_in_flight": max_in_flight,
+        }
+    return result
+
+
+def quota_response(error: QuotaExceeded):
+    response = jsonify({"error": str(error), "scope": error.scope, "quota": error.quota})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+
+def quota_required(document_type: str):
+    """À placer sous @token_required : applique les quotas /process de l'utilisateur."""
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            if not QuotaConfig.ENABLED:
+                return f(current_user, *args, **kwargs)
+            try:
+                in_flight_keys = acquire(current_user)
+            except QuotaExceeded as e:
+                quota_rejections_total.labels(document_type=document_type, scope=e.scope, quota=e.quota).inc()
+                return quota_response(e)
+
+            quota_documents_total.labels(document_type=document_type).inc()
+            quota_in_flight_documents.labels(document_type=document_type).inc()
+            try:
+                return f(current_user, *args, **kwargs)
+            finally:
+                quota_in_flight_documents.labels(document_type=document_type).dec()
+                release(in_flight_keys)
+        return decorated
+    return decorator
@@ -0,0 +1,133 @@
+"""
+Limitation de débit par IP et par compte, avant tout accès base ou calcul bcrypt.
+
+Le décorateur `rate_limited` est placé sur les routes d'authentification :
+une tentative refusée reçoit un 429 avec Retry-After sans exécuter la vue,
+ce qui protège le CPU des workers contre le bourrage d'identifiants (y
+compris pour des emails inexistants).
+
+Deux backends :
+- memory : token bucket par clé, local au worker, borné à MAX_TRACKED_KEYS
+  clés (les moins récemment utilisées sont oubliées) ;
+- cache  : fenêtre glissante approchée (compteur de la fenêtre courante +
+  part restante de la fenêtre précédente) stockée dans le cache partagé,
+  commune à tous les workers.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import jsonify, request
+from config.rate_limit_config import RateLimitConfig
+from utils.metrics import rate_limit_rejections_total
+
+
+class TokenBucketLimiter:
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: float) -> float:
+        """Consomme un jeton ; retourne 0 si accepté, sinon le délai en secondes avant le prochain jeton."""
+        rate = limit / window
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (float(limit), now))
+            tokens = min(float(limit), tokens + (now - updated_at) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+class SlidingWindowLimiter:
+    def __init__(self, cache):
+        self.cache = cache
+
+    def hit(self, key: str, limit: int, window: float) -> float:
+        now = time.time()
+        index = int(now // window)
+        elapsed = now - index * window
+        current = self.cache.incr(f"{key}:{index}", 1, ttl=2 * window)
+        previous = self.cache.get(f"{key}:{index - 1}", 0) or 0
+        estimate = previous * (1 - elapsed / window) + current
+        if estimate <= limit:
+            return 0.0
+        if previous and current <= limit:
+            # La part de la fenêtre précédente décroît linéairement
+            return (estimate - limit) / previous * window
+        return window - elapsed
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                if RateLimitConfig.BACKEND == "cache":
+                    from cache.cache_service import get_cache
+                    _limiter = SlidingWindowLimiter(get_cache("rate-limit"))
+                elif RateLimitConfig.BACKEND == "memory":
+                    _limiter = TokenBucketLimiter(RateLimitConfig.MAX_TRACKED_KEYS)
+                else:
+                    raise ValueError(f"⚠️ RATE_LIMIT_BACKEND inconnu: {RateLimitConfig.BACKEND} (memory ou cache)")
+    return _limiter
+
+
+def client_ip() -> str:
+    if RateLimitConfig.TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("X-Forwarded-For", "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.remote_addr or "unknown"
+
+
+def request_email() -> str:
+    data = request.get_json(silent=True)
+    email = data.get("email") if isinstance(data, dict) else None
+    return email.strip().lower()[:254] if isinstance(email, str) else ""
+
+
+def rate_limited(scope: str, per_ip: int, per_account: int = 0):
+    """
+    Décorateur de route : `per_ip` tentatives par IP et `per_account`
+    tentatives par email (0 = pas de limite) sur RATE_LIMIT_WINDOW_SECONDS.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not RateLimitConfig.ENABLED:
+                return f(*args, **kwargs)
+
+            window = RateLimitConfig.WINDOW_SECONDS
+            checks = [("ip", client_ip(), per_ip)]
+            if per_account:
+                email = request_email()
+                if email:
+                    checks.append(("account", email, per_account))
+
+            limiter = get_limiter()
+            for key_type, identifier, limit in checks:
+                if limit <= 0:
+                    continue
+                retry_after = limiter.hit(f"{scope}:{key_type}:{identifier}", limit, window)
+                if retry_after > 0:
+                    rate_limit_rejections_total.labels(scope=scope, key_type=key_type).inc()
+                    response = jsonify({"error": "Trop de tentatives, réessayez plus tard"})
+                    response.status_code = 429
+                    response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+                    return response
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
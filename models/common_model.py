@@ -0,0 +1,55 @@
+"""
+Éléments communs aux modèles d'extraction (CIN, permis, carte grise).
+
+Les expressions régulières sont compilées une fois au chargement du module.
+Le ratio de caractères arabes est calculé en un seul passage C
+(`str.translate`) au lieu d'un générateur Python caractère par caractère.
+"""
+import re
+from pydantic import BaseModel, field_validator
+
+ARABIC_BLOCK = re.compile(r"[\u0600-\u06FF]")
+# Table de suppression du bloc arabe : len(v) - len(v.translate(...)) = nb de caractères arabes
+_DROP_ARABIC = dict.fromkeys(range(0x0600, 0x0700))
+
+# JJ.MM.AAAA ou JJ/MM/AAAA
+DATE_DOTS_OR_SLASHES = re.compile(r"\d{2}[./]\d{2}[./]\d{4}")
+
+
+def arabic_char_count(v: str) -> int:
+    return len(v) - len(v.translate(_DROP_ARABIC))
+
+
+def normalize_date(v: str) -> str:
+    """Valide JJ.MM.AAAA ou JJ/MM/AAAA et retourne JJ.MM.AAAA."""
+    if not DATE_DOTS_OR_SLASHES.fullmatch(v):
+        raise ValueError("La date doit être au format JJ.MM.AAAA ou JJ/MM/AAAA")
+    return v.replace("/", ".")
+
+
+class LangText(BaseModel):
+    fr: str
+    ar: str
+
+    @field_validator('fr')
+    @classmethod
+    def validate_french_text(cls, v):
+        if arabic_char_count(v) > len(v) * 0.3:  # Plus de 30% de caractères arabes
+            raise ValueError(f"Le champ français contient trop de caractères arabes: {v}")
+        return v
+
+    @field_validator('ar')
+    @classmethod
+    def validate_arabic_text(cls, v):
+        if v and not ARABIC_BLOCK.search(v):
+            raise ValueError(f"Le champ arabe ne contient aucun caractère arabe: {v}")
+        return v
+
+
+class Identite(BaseModel):
+    nom: LangText
+    prenom: LangText
+
+
+class Adresse(LangText):
+    pass
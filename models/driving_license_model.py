@@ -1,23 +1,32 @@
-from pydantic import BaseModel, Field, validator, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import Literal
 import re
+from models.common_model import LangText as BaseLangText, normalize_date
 
 ARABIC_LETTERS = r"\u0621-\u064A\u0660-\u0669"
+FR_LATIN = re.compile(r"[A-Z0-9\s\-\.'']+")
+AR_ARABIC = re.compile(rf"[{ARABIC_LETTERS}\s]+")
+CATEGORIE_PATTERN = re.compile(r"[A-Z0-9]+")
+NUMERO_PERMIS_PATTERN = re.compile(r"\d{1,2}/\d{6}")
 
-class LangText(BaseModel):
+# Variante stricte du permis : alphabet latin majuscule / lettres arabes uniquement.
+# Le nom LangText est conservé : il apparaît dans le schéma envoyé au LLM.
+class LangText(BaseLangText):
     fr: str = Field(..., description="Texte en alphabet latin")
     ar: str = Field(..., description="Texte en alphabet arabe")
 
-    @validator("fr")
-    def fr_must_be_latin(cls, v):
-        if not re.fullmatch(r"[A-Z0-9\s\-\.'']+", v):
+    @field_validator("fr")
+    @classmethod
+    def validate_french_text(cls, v):
+        if not FR_LATIN.fullmatch(v):
             raise ValueError("Le texte FR doit n’utiliser que A-Z, 0-9, espaces, apostrophes, traits d’union ou points")
         return v
 
-    @validator("ar")
-    def ar_must_be_arabic(cls, v):
+    @field_validator("ar")
+    @classmethod
+    def validate_arabic_text(cls, v):
         v_clean = v.rstrip(". ").strip()
-        if not re.fullmatch(rf"[{ARABIC_LETTERS}\s]+", v_clean):
+        if not AR_ARABIC.fullmatch(v_clean):
             raise ValueError("Le texte AR doit n’utiliser que des lettres arabes et chiffres arabes-indiens")
         return v_clean
 
@@ -29,50 +38,43 @@ class Naissance(BaseModel):
     date: str = Field(..., description="Date au format JJ.MM.AAAA ou JJ/MM/AAAA")
     lieu: LangText
 
-    @validator("date")
+    @field_validator("date")
+    @classmethod
     def check_date_format(cls, v):
-        if not re.fullmatch(r"\d{2}[./]\d{2}[./]\d{4}", v):
-            raise ValueError("La date doit être au format JJ.MM.AAAA ou JJ/MM/AAAA")
-        return v.replace("/", ".")
+        return normalize_date(v)
 
 class Permis(BaseModel):
     numero_permis: str = Field(..., description="Format N/MMMMMM ex. 55/193059")
     date_delivrance: str = Field(..., description="Date JJ.MM.AAAA ou JJ/MM/AAAA")
     date_expiration: str = Field(..., description="Date JJ.MM.AAAA ou JJ/MM/AAAA")
     categorie: str = Field(..., description="Catégorie du permis parmi: A1, A, B, C, D, E(B), E(C), E(D)")
-    
-    @validator("categorie")
-    def check_categorie(cls, v):
-        valid_categories = ["A1", "A", "B", "C", "D", "E(B)", "E(C)", "E(D)"]
-        if v not in valid_categories:
-            raise ValueError(f"La catégorie doit être l'une de ces valeurs : {', '.join(valid_categories)}")
-        return v
-        
-    @validator("categorie")
+
+    @field_validator("categorie")
+    @classmethod
     def check_categorie(cls, v):
-        if not re.fullmatch(r"[A-Z0-9]+", v):
+        if not CATEGORIE_PATTERN.fullmatch(v):
             raise ValueError("La catégorie doit n’utiliser que des lettres majuscules A-Z et chiffres 0-9")
         return v
 
-    @validator("numero_permis")
+    @field_validator("numero_permis")
+    @classmethod
     def check_numero_permis(cls, v):
-        if not re.fullmatch(r"\d{1,2}/\d{6}", v):
+        if not NUMERO_PERMIS_PATTERN.fullmatch(v):
             raise ValueError("Le numéro de permis doit suivre le format N/MMMMMM (ex. 55/193059)")
         return v
 
-    @validator("date_delivrance", "date_expiration")
+    @field_validator("date_delivrance", "date_expiration")
+    @classmethod
     def check_date_fields(cls, v):
-        if not re.fullmatch(r"\d{2}[./]\d{2}[./]\d{4}", v):
-            raise ValueError("La date doit être au format JJ.MM.AAAA ou JJ/MM/AAAA")
-        return v.replace("/", ".")
+        return normalize_date(v)
 
     @model_validator(mode="after")
-    def check_expiration_after_delivrance(cls, model):
-        d1 = list(map(int, model.date_delivrance.split(".")))
-        d2 = list(map(int, model.date_expiration.split(".")))
-        if (d2[2], d2[1], d2[0]) <= (d1[2], d1[1], d1[0]):
+    def check_expiration_after_delivrance(self):
+        d1 = self.date_delivrance.split(".")
+        d2 = self.date_expiration.split(".")
+        if (int(d2[2]), int(d2[1]), int(d2[0])) <= (int(d1[2]), int(d1[1]), int(d1[0])):
             raise ValueError("La date d'expiration doit être postérieure à la date de délivrance")
-        return model
+        return self
 
 class PermisData(BaseModel):
     permis: Permis
@@ -1,39 +1,28 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional
 import re
-
-
-class LangText(BaseModel):
-    fr: str
-    ar: str
-
-    @validator('fr')
-    def validate_french_text(cls, v):
-        arabic_chars = sum(1 for c in v if '\u0600' <= c <= '\u06FF')
-        if arabic_chars > len(v) * 0.3:  # Plus de 30% de caractères arabes
-            raise ValueError(
-                f"Le champ français contient trop de caractères arabes: {v}")
-        return v
-
-    @validator('ar')
-    def validate_arabic_text(cls, v):
-        arabic_chars = sum(1 for c in v if '\u0600' <= c <= '\u06FF')
-        if arabic_chars == 0 and len(v) > 0:
-            raise ValueError(
-                f"Le champ arabe ne contient aucun caractère arabe: {v}")
-        return v
-
-
-class Identite(BaseModel):
-    nom: LangText
-    prenom: LangText
+from models.common_model import LangText, Identite, Adresse
+
+DATE_DD_MM_YYYY = re.compile(r'^\d{2}\.\d{2}\.\d{4}$')
+DATE_DD_YYYY = re.compile(r'^\d{1,2}\.\d{4}$')
+CIN_PATTERNS = tuple(re.compile(p) for p in (
+    r'[A-Z]{1,3}\d{3,6}[A-Z]{0,3}',
+    r'[A-Z]{1,2}\d{3,6}',
+    r'\d{6,8}',
+    r'[A-Z0-9]{6,10}'
+))
+ETAT_CIVIL = re.compile(r'^\d{2,4}/\d{4}$')
+ETAT_CIVIL_PLAIN = re.compile(r'^(\d{2,4})(\d{4})$')
+ETAT_CIVIL_DASH = re.compile(r'^(\d+)-(\d{4})$')
+ETAT_CIVIL_SUFFIX = re.compile(r'^(\d{2,4}/\d{4}).*$')
 
 
 class Naissance(BaseModel):
     date: str = Field(..., description="Date au format DD.MM.YYYY")
     lieu: LangText
 
-    @validator('date')
+    @field_validator('date')
+    @classmethod
     def validate_date_format(cls, v: str) -> str:
         """
         Valide et reformate automatiquement la date.
@@ -43,19 +32,15 @@ class Naissance(BaseModel):
         """
         v = v.replace("-", ".").replace("/", ".")
 
-        if re.match(r'^\d{1,2}\.\d{4}$', v):
+        if DATE_DD_YYYY.match(v):
             day, year = v.split(".")
             v = f"{int(day):02d}.01.{year}"
 
-        if not re.match(r'^\d{2}\.\d{2}\.\d{4}$', v):
+        if not DATE_DD_MM_YYYY.match(v):
             raise ValueError(f"Date must be in DD.MM.YYYY format, got '{v}'")
         return v
 
 
-class Adresse(LangText):
-    pass
-
-
 class Parent(BaseModel):
     pere: LangText
     mere: LangText
@@ -66,32 +51,32 @@ class EtatCivil(BaseModel):
         None, description="Numéro d'état civil (format: XX/YYYY, XXX/YYYY, etc.)"
     )
 
+    @field_validator('numero_etat_civil')
+    @classmethod
+    def validate_and_format_etat_civil(cls, v: Optional[str]) -> Optional[str]:
+        if not v:
+            return v
 
-@validator('numero_etat_civil')
-def validate_and_format_etat_civil(cls, v: Optional[str]) -> Optional[str]:
-    if not v:
-        return v
-
-    # Normalisation classique
-    match_plain = re.match(r'^(\d{2,4})(\d{4})$', v)
-    if match_plain:
-        return f"{match_plain.group(1)}/{match_plain.group(2)}"
+        # Normalisation classique
+        match_plain = ETAT_CIVIL_PLAIN.match(v)
+        if match_plain:
+            return f"{match_plain.group(1)}/{match_plain.group(2)}"
 
-    v = re.sub(r'^(\d+)-(\d{4})$', r'\1/\2', v)
-    v = re.sub(r'^(\d{2,4}/\d{4}).*$', r'\1', v)
+        v = ETAT_CIVIL_DASH.sub(r'\1/\2', v)
+        v = ETAT_CIVIL_SUFFIX.sub(r'\1', v)
 
-    # Vérifier si c’est un vrai numéro d’état civil
-    if re.match(r'^\d{2,4}/\d{4}$', v):
-        return v
+        # Vérifier si c’est un vrai numéro d’état civil
+        if ETAT_CIVIL.match(v):
+            return v
 
-    # ✅ Si c’est un code genre CAN 279975 → on l’ignore
-    if v.startswith("CAN"):
-        return None
+        # ✅ Si c’est un code genre CAN 279975 → on l’ignore
+        if v.startswith("CAN"):
+            return None
 
-    raise ValueError(
-        f"Numéro état civil format not recognized: {v}. "
-        "Expected formats: XX/YYYY, XXX/YYYY, XXXX/YYYY, XXYYYY, or XX-YYYY"
-    )
+        raise ValueError(
+            f"Numéro état civil format not recognized: {v}. "
+            "Expected formats: XX/YYYY, XXX/YYYY, XXXX/YYYY, XXYYYY, or XX-YYYY"
+        )
 
 
 class CINData(BaseModel):
@@ -105,7 +90,8 @@ class CINData(BaseModel):
     parents: Parent
     etat_civil: EtatCivil
 
-    @validator('cin')
+    @field_validator('cin')
+    @classmethod
     def validate_cin(cls, v: str) -> str:
         """
         Extrait et valide le CIN : format flexible pour cartes marocaines
@@ -113,15 +99,8 @@ class CINData(BaseModel):
         """
         v = v.strip().upper()
 
-        patterns = [
-            r'[A-Z]{1,3}\d{3,6}[A-Z]{0,3}',
-            r'[A-Z]{1,2}\d{3,6}',
-            r'\d{6,8}',
-            r'[A-Z0-9]{6,10}'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, v)
+        for pattern in CIN_PATTERNS:
+            match = pattern.search(v)
             if match:
                 return match.group(0)
 
@@ -130,16 +109,18 @@ class CINData(BaseModel):
 
         raise ValueError(f"CIN format invalid: {v}")
 
-    @validator('sexe')
+    @field_validator('sexe')
+    @classmethod
     def validate_sexe(cls, v: str) -> str:
         if v not in ['M', 'F']:
             raise ValueError("Sexe must be 'M' or 'F'")
         return v
 
-    @validator('validite')
+    @field_validator('validite')
+    @classmethod
     def validate_validite(cls, v: str) -> str:
         v = v.replace("-", ".").replace("/", ".")
-        if not re.match(r'^\d{2}\.\d{2}\.\d{4}$', v):
+        if not DATE_DD_MM_YYYY.match(v):
             raise ValueError(
                 f"Validité must be in DD.MM.YYYY format, got '{v}'")
         return v
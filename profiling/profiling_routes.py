@@ -0,0 +1,57 @@
+"""
+Routes d'administration pour le profilage des workers
+"""
+from flask import Blueprint, Response, jsonify, request
+from config.profiling_config import ProfilingConfig
+from middlewares.decorators import token_required, admin_required
+from profiling.sampling_profiler import sample_stacks, format_collapsed, ProfilerBusyError
+from profiling.request_profiler import get_request_profile, format_profile_text
+
+profiling_bp = Blueprint("profiling_bp", __name__)
+
+
+@profiling_bp.route("/cpu", methods=["GET"])
+@token_required
+@admin_required
+def cpu_profile(current_user):
+    """Échantillonne le worker courant et retourne des piles au format collapsed"""
+    try:
+        seconds = float(request.args.get("seconds", ProfilingConfig.DEFAULT_SAMPLE_SECONDS))
+        interval = float(request.args.get("interval", ProfilingConfig.DEFAULT_SAMPLE_INTERVAL))
+    except ValueError:
+        return jsonify({"error": "Paramètres 'seconds' et 'interval' numériques attendus"}), 400
+
+    if not 0 < seconds <= ProfilingConfig.MAX_SAMPLE_SECONDS:
+        return jsonify({"error": f"'seconds' doit être compris entre 0 et {ProfilingConfig.MAX_SAMPLE_SECONDS}"}), 400
+    if not 0.001 <= interval <= 1:
+        return jsonify({"error": "'interval' doit être compris entre 0.001 et 1"}), 400
+
+    try:
+        stacks = sample_stacks(seconds, interval)
+    except ProfilerBusyError as e:
+        return jsonify({"error": str(e)}), 409
+
+    return Response(
+        format_collapsed(stacks),
+        mimetype="text/plain",
+        headers={"Content-Disposition": "attachment; filename=profile.collapsed"},
+    )
+
+
+@profiling_bp.route("/requests/<profile_id>", methods=["GET"])
+@token_required
+@admin_required
+def request_profile(current_user, profile_id):
+    """Retourne le profil cProfile d'une requête (pstats binaire ou texte)"""
+    profile = get_request_profile(profile_id)
+    if not profile:
+        return jsonify({"error": "Profil introuvable ou expiré"}), 404
+
+    if request.args.get("format") == "text":
+        return Response(format_profile_text(profile["stats"]), mimetype="text/plain")
+
+    return Response(
+        profile["stats"],
+        mimetype="application/octet-stream",
+        headers={"Content-Disposition": f"attachment; filename={profile_id}.prof"},
+    )
@@ -0,0 +1,110 @@
+"""
+Profil cProfile d'une requête unique, déclenché par l'en-tête X-Profile.
+
+Réservé aux administrateurs : l'en-tête est ignoré pour les autres
+utilisateurs. Les profils sont conservés dans le cache partagé (espace
+"request-profiles", PROFILING_REQUEST_TTL_SECONDS) et téléchargeables via
+/admin/profile/requests/<profile_id> depuis n'importe quel worker.
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import threading
+import uuid
+from flask import g, request
+from auth.authentication_model import UserDB, SessionLocal
+from cache.cache_service import get_cache
+from config.profiling_config import ProfilingConfig
+from middlewares.decorators import is_admin
+from middlewares.jwt_manager import verify_access_token
+
+# cProfile ne supporte qu'un profileur actif à la fois sur Python >= 3.12
+_active_lock = threading.Lock()
+
+
+def _cache():
+    return get_cache("request-profiles")
+
+
+def _request_is_from_admin() -> bool:
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("Bearer "):
+        return False
+    try:
+        user_id = verify_access_token(auth_header.split(" ")[1])
+    except Exception:
+        return False
+
+    db = SessionLocal()
+    try:
+        user = db.query(UserDB).filter(UserDB.id == user_id).first()
+    finally:
+        db.close()
+    return is_admin(user)
+
+
+def start_request_profile():
+    if not request.headers.get(ProfilingConfig.REQUEST_HEADER):
+        return
+    if not _request_is_from_admin():
+        return
+    if not _active_lock.acquire(blocking=False):
+        g.request_profile_skipped = True
+        return
+
+    profiler = cProfile.Profile()
+    g.request_profiler = profiler
+    profiler.enable()
+
+
+def finish_request_profile(response):
+    if g.pop("request_profile_skipped", False):
+        response.headers["X-Profile-Skipped"] = "another profile is running"
+        return response
+
+    profiler = g.pop("request_profiler", None)
+    if profiler is None:
+        return response
+
+    profiler.disable()
+    _active_lock.release()
+
+    profiler.create_stats()
+    profile_id = uuid.uuid4().hex
+    _cache().set(profile_id, {
+        "endpoint": request.path,
+        "stats": marshal.dumps(profiler.stats),
+    }, ttl=ProfilingConfig.REQUEST_PROFILE_TTL_SECONDS)
+
+    response.headers["X-Profile-Id"] = profile_id
+    return response
+
+
+def abort_request_profile(exc):
+    # Filet de sécurité si after_request n'a pas été exécuté
+    profiler = g.pop("request_profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        _active_lock.release()
+
+
+def get_request_profile(profile_id: str):
+    return _cache().get(profile_id)
+
+
+class _LoadedStats:
+    """Adaptateur permettant à pstats.Stats de lire des stats déjà collectées."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def format_profile_text(raw_stats: bytes, limit: int = 50) -> str:
+    stream = io.StringIO()
+    stats = pstats.Stats(_LoadedStats(marshal.loads(raw_stats)), stream=stream)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
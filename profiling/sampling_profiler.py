@@ -0,0 +1,67 @@
+"""
+Profileur par échantillonnage des piles Python d'un worker en production.
+
+Un thread échantillonne `sys._current_frames()` à intervalle régulier pendant
+une durée bornée et agrège les piles au format « collapsed stacks »
+(`frame;frame;frame count`), directement utilisable par flamegraph.pl,
+speedscope ou inferno.
+
+Avec les workers gevent, seules les piles des threads OS sont visibles
+(greenlet en cours d'exécution au moment de l'échantillon).
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class ProfilerBusyError(Exception):
+    pass
+
+
+_profile_lock = threading.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+def sample_stacks(duration: float, interval: float) -> Counter:
+    """Échantillonne toutes les piles (sauf celle du profileur) pendant `duration` secondes."""
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("Un profil est déjà en cours sur ce worker")
+
+    try:
+        stacks = Counter()
+        own_id = threading.get_ident()
+        thread_names = {}
+        deadline = time.monotonic() + duration
+
+        while time.monotonic() < deadline:
+            for thread in threading.enumerate():
+                thread_names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                thread_name = thread_names.get(thread_id, str(thread_id))
+                stacks[f"{thread_name};{_collapse(frame)}"] += 1
+            time.sleep(interval)
+
+        return stacks
+    finally:
+        _profile_lock.release()
+
+
+def format_collapsed(stacks: Counter) -> str:
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
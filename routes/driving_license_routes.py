@@ -1,9 +1,18 @@
 import os
+import time
 from flask import Blueprint, request, jsonify, current_app
 from azure.AzureOCRService import AzureOCRService
 from services.driving_license_ai_service import AIServicePermis
-from database.cart_permi_conduite.driving_license_database_service import save_permi_data, get_all_permi_data
+from database.cart_permi_conduite.driving_license_database_service import save_permi_data, get_all_permi_rows, stream_all_permi_rows, permi_number_index, permi_record
 from middlewares.decorators import token_required
+from database.upsert import DocumentOwnedByOtherUserError
+from middlewares.concurrency import stage_slot, StageOverloadedError
+from middlewares.quotas import quota_required
+from middlewares.idempotency import idempotent
+from utils.instrumentation import pipeline_stage
+from services.duplicate_detection import duplicate_response
+from config.duplicate_config import DuplicateConfig
+from utils.json_provider import rows_response, stream_rows_response
 
 ocr_service = AzureOCRService()
 ai_service_permis = AIServicePermis()
@@ -13,7 +22,10 @@ permis_bp = Blueprint("permis_bp", __name__)
 
 @permis_bp.route("/process", methods=["POST", "OPTIONS"])
 @token_required
+@idempotent("permis")
+@quota_required("permis")
 def process_permis(current_user):
+    started = time.perf_counter()
     recto = request.files.get("recto")
     verso = request.files.get("verso")
 
@@ -24,17 +36,33 @@ def process_permis(current_user):
         current_app.config["UPLOAD_FOLDER"], recto.filename)
     verso_path = os.path.join(
         current_app.config["UPLOAD_FOLDER"], verso.filename)
-    recto.save(recto_path)
-    verso.save(verso_path)
+    with pipeline_stage("permis", "upload_save"):
+        recto.save(recto_path)
+        verso.save(verso_path)
 
-    recto_text = ocr_service.extract_text(recto_path)
-    verso_text = ocr_service.extract_text(verso_path)
+    with stage_slot("ocr"):
+        with pipeline_stage("permis", "ocr_recto"):
+            recto_text = ocr_service.extract_text(recto_path, document_type="permis")
+        with pipeline_stage("permis", "ocr_verso"):
+            verso_text = ocr_service.extract_text(verso_path, document_type="permis")
     full_text = recto_text + "\n" + verso_text
 
     try:
-        permis_data = ai_service_permis.parse_permi_data(full_text)
-        save_permi_data(permis_data)
+        if DuplicateConfig.ENABLED:
+            # Permis déjà enregistré : pas d'appel LLM
+            with pipeline_stage("permis", "duplicate_check"):
+                existing = permi_number_index.find_existing(full_text, current_user.id)
+            if existing is not None:
+                return duplicate_response(existing, permi_record(existing))
+        with stage_slot("llm"):
+            permis_data = ai_service_permis.parse_permi_data(full_text)
+        with stage_slot("db"), pipeline_stage("permis", "db_insert"):
+            save_permi_data(permis_data, processing_duration=time.perf_counter() - started, user_id=current_user.id)
         return jsonify(permis_data.model_dump())
+    except StageOverloadedError:
+        raise
+    except DocumentOwnedByOtherUserError:
+        return jsonify({"error": "Document déjà enregistré par un autre utilisateur"}), 409
     except ValueError as ve:
         return jsonify({"error": f"Erreur de parsing: {str(ve)}"}), 400
     except Exception as e:
@@ -45,10 +73,14 @@ def process_permis(current_user):
 @token_required
 def get_all_permis(current_user):
     try:
-        permis_list = get_all_permi_data()
-        result = [permis.__dict__ for permis in permis_list]
-        for item in result:
-            item.pop('_sa_instance_state', None)
-        return jsonify(result)
+        if request.args.get("stream") == "1":
+            # Export volumineux : envoi par lots, mémoire bornée ; slot "db" tenu jusqu'à la fin de l'envoi
+            columns, batches = stream_all_permi_rows(slot=stage_slot("db"))
+            return stream_rows_response(columns, batches)
+        with stage_slot("db"):
+            columns, rows = get_all_permi_rows()
+        return rows_response(columns, rows)
+    except StageOverloadedError:
+        raise
     except Exception as e:
         return jsonify({"error": f"Erreur lors de la récupération des données: {str(e)}"}), 500
@@ -1,9 +1,18 @@
 import os
+import time
 from flask import Blueprint, request, jsonify, current_app
 from azure.AzureOCRService import AzureOCRService
 from services.identity_card_ai_service import AIService
-from database.cart_identite_national.identity_card_database_service import save_cin_data, get_all_cin_data
+from database.cart_identite_national.identity_card_database_service import save_cin_data, get_all_cin_rows, stream_all_cin_rows, cin_number_index, cin_record
 from middlewares.decorators import token_required
+from database.upsert import DocumentOwnedByOtherUserError
+from middlewares.concurrency import stage_slot, StageOverloadedError
+from middlewares.quotas import quota_required
+from middlewares.idempotency import idempotent
+from utils.instrumentation import pipeline_stage
+from services.duplicate_detection import duplicate_response
+from config.duplicate_config import DuplicateConfig
+from utils.json_provider import rows_response, stream_rows_response
 
 ocr_service = AzureOCRService()
 ai_service = AIService()
@@ -12,7 +21,10 @@ cin_bp = Blueprint("cin_bp", __name__)
 
 @cin_bp.route("/process", methods=["POST"])
 @token_required
+@idempotent("cin")
+@quota_required("cin")
 def process_cin(current_user):
+    started = time.perf_counter()
     recto = request.files.get("recto")
     verso = request.files.get("verso")
 
@@ -21,17 +33,33 @@ def process_cin(current_user):
 
     recto_path = os.path.join(current_app.config["UPLOAD_FOLDER"], recto.filename)
     verso_path = os.path.join(current_app.config["UPLOAD_FOLDER"], verso.filename)
-    recto.save(recto_path)
-    verso.save(verso_path)
+    with pipeline_stage("cin", "upload_save"):
+        recto.save(recto_path)
+        verso.save(verso_path)
 
-    recto_text = ocr_service.extract_text(recto_path)
-    verso_text = ocr_service.extract_text(verso_path)
+    with stage_slot("ocr"):
+        with pipeline_stage("cin", "ocr_recto"):
+            recto_text = ocr_service.extract_text(recto_path, document_type="cin")
+        with pipeline_stage("cin", "ocr_verso"):
+            verso_text = ocr_service.extract_text(verso_path, document_type="cin")
     full_text = recto_text + "\n" + verso_text
 
     try:
-        cin_data = ai_service.parse_cin_data(full_text)
-        save_cin_data(cin_data)
+        if DuplicateConfig.ENABLED:
+            # CIN déjà enregistrée : pas d'appel LLM
+            with pipeline_stage("cin", "duplicate_check"):
+                existing = cin_number_index.find_existing(full_text, current_user.id)
+            if existing is not None:
+                return duplicate_response(existing, cin_record(existing))
+        with stage_slot("llm"):
+            cin_data = ai_service.parse_cin_data(full_text)
+        with stage_slot("db"), pipeline_stage("cin", "db_insert"):
+            save_cin_data(cin_data, processing_duration=time.perf_counter() - started, user_id=current_user.id)
         return jsonify(cin_data.model_dump())  
+    except StageOverloadedError:
+        raise
+    except DocumentOwnedByOtherUserError:
+        return jsonify({"error": "Document déjà enregistré par un autre utilisateur"}), 409
     except ValueError as ve:
         return jsonify({"error": f"Erreur de parsing: {str(ve)}"}), 400
     except Exception as e:
@@ -41,11 +69,15 @@ def process_cin(current_user):
 @token_required
 def get_all_cin(current_user):
     try:
-        cin_list = get_all_cin_data()
-        result = [cin.__dict__ for cin in cin_list]
-        for item in result:
-            item.pop('_sa_instance_state', None)
-        return jsonify(result)
+        if request.args.get("stream") == "1":
+            # Export volumineux : envoi par lots, mémoire bornée ; slot "db" tenu jusqu'à la fin de l'envoi
+            columns, batches = stream_all_cin_rows(slot=stage_slot("db"))
+            return stream_rows_response(columns, batches)
+        with stage_slot("db"):
+            columns, rows = get_all_cin_rows()
+        return rows_response(columns, rows)
+    except StageOverloadedError:
+        raise
     except Exception as e:
         return jsonify({"error": f"Erreur lors de la récupération des données: {str(e)}"}), 500
 
@@ -1,9 +1,20 @@
 import os
+import time
+from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify, current_app
 from azure.AzureOCRService import AzureOCRService
 from services.vehicle_registration_ai_service import AIServiceCartGris
-from database.cart_gris_matricul.vehicle_registration_database_service import save_gris_data, get_all_gris_data
+from database.cart_gris_matricul.vehicle_registration_database_service import (
+    save_gris_data, get_all_gris_rows, stream_all_gris_rows, count_gris_by_registration_month
+)
 from middlewares.decorators import token_required
+from database.upsert import DocumentOwnedByOtherUserError
+from middlewares.concurrency import stage_slot, StageOverloadedError
+from middlewares.quotas import quota_required
+from middlewares.idempotency import idempotent
+from utils.instrumentation import pipeline_stage
+from utils.json_provider import rows_response, stream_rows_response
+from charts.chart_cache import cached_chart_response
 import json
 
 
@@ -14,7 +25,10 @@ gris_bp = Blueprint("gris_bp", __name__)
 
 @gris_bp.route("/process", methods=["POST"])
 @token_required
+@idempotent("gris")
+@quota_required("gris")
 def process_gris(current_user):
+    started = time.perf_counter()
     recto = request.files.get("recto")
     verso = request.files.get("verso")
 
@@ -23,17 +37,27 @@ def process_gris(current_user):
 
     recto_path = os.path.join(current_app.config["UPLOAD_FOLDER"], recto.filename)
     verso_path = os.path.join(current_app.config["UPLOAD_FOLDER"], verso.filename)
-    recto.save(recto_path)
-    verso.save(verso_path)
+    with pipeline_stage("gris", "upload_save"):
+        recto.save(recto_path)
+        verso.save(verso_path)
 
-    recto_text = ocr_service.extract_text(recto_path)
-    verso_text = ocr_service.extract_text(verso_path)
+    with stage_slot("ocr"):
+        with pipeline_stage("gris", "ocr_recto"):
+            recto_text = ocr_service.extract_text(recto_path, document_type="gris")
+        with pipeline_stage("gris", "ocr_verso"):
+            verso_text = ocr_service.extract_text(verso_path, document_type="gris")
     full_text = recto_text + "\n" + verso_text
 
     try:
-        gris_data = ai_service_gris.parse_cart_gris_data(full_text)
-        save_gris_data(gris_data)
+        with stage_slot("llm"):
+            gris_data = ai_service_gris.parse_cart_gris_data(full_text)
+        with stage_slot("db"), pipeline_stage("gris", "db_insert"):
+            save_gris_data(gris_data, processing_duration=time.perf_counter() - started, user_id=current_user.id)
         return jsonify(gris_data.model_dump())
+    except StageOverloadedError:
+        raise
+    except DocumentOwnedByOtherUserError:
+        return jsonify({"error": "Document déjà enregistré par un autre utilisateur"}), 409
     except ValueError as ve:
         return jsonify({"error": f"Erreur de parsing: {str(ve)}"}), 400
     except Exception as e:
@@ -43,29 +67,54 @@ def process_gris(current_user):
 @token_required
 def get_all_gris(current_user):
     try:
-        gris_list = get_all_gris_data()
-        result = [gris.__dict__ for gris in gris_list]
-        for item in result:
-            item.pop('_sa_instance_state', None)
-        return jsonify(result)
+        if request.args.get("stream") == "1":
+            # Export volumineux : envoi par lots, mémoire bornée ; slot "db" tenu jusqu'à la fin de l'envoi
+            columns, batches = stream_all_gris_rows(slot=stage_slot("db"))
+            return stream_rows_response(columns, batches)
+        with stage_slot("db"):
+            columns, rows = get_all_gris_rows()
+        return rows_response(columns, rows)
+    except StageOverloadedError:
+        raise
     except Exception as e:
         return jsonify({"error": f"Erreur lors de la récupération des données: {str(e)}"}), 500
 
+def parse_period_bound(value, is_end=False):
+    """
+    Borne de période "AAAA-MM" ou "AAAA-MM-JJ".
+    Une borne de fin est inclusive : elle est convertie en borne exclusive
+    (premier jour du mois suivant, ou lendemain).
+    """
+    if value is None:
+        return None
+    try:
+        if len(value) == 7:
+            parsed = datetime.strptime(value, "%Y-%m").date()
+            if is_end:
+                parsed = (parsed.replace(day=28) + timedelta(days=4)).replace(day=1)
+            return parsed
+        parsed = datetime.strptime(value, "%Y-%m-%d").date()
+        return parsed + timedelta(days=1) if is_end else parsed
+    except ValueError:
+        raise ValueError(f"Date invalide '{value}' : format AAAA-MM ou AAAA-MM-JJ attendu")
+
 @gris_bp.route("/evolution-mensuel", methods=["GET"])
 @token_required
 def get_monthly_evolution(current_user):
     try:
-        gris_list = get_all_gris_data()
-        monthly_counts = {}
+        start = parse_period_bound(request.args.get("from"))
+        end = parse_period_bound(request.args.get("to"), is_end=True)
+        if start and end and start >= end:
+            return jsonify({"error": "La date 'from' doit précéder la date 'to'"}), 400
 
-        for gris in gris_list:
-            month_year = gris.date_premiere_immatriculation.strftime("%Y-%m")
-            if month_year not in monthly_counts:
-                monthly_counts[month_year] = 0
-            monthly_counts[month_year] += 1
+        def compute():
+            # Regroupement par mois côté SQL, les cartes sans date sont ignorées
+            return {month: count for month, count in count_gris_by_registration_month(start, end)}
 
-        sorted_monthly_counts = dict(sorted(monthly_counts.items()))
-
-        return jsonify(sorted_monthly_counts)
+        return cached_chart_response(f"gris-evolution-mensuel:{start}:{end}", compute)
+    except StageOverloadedError:
+        raise
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         return jsonify({"error": f"Erreur lors de la récupération des données: {str(e)}"}), 500
@@ -3,6 +3,7 @@ import time
 import random
 from dotenv import load_dotenv
 from openai import OpenAI
+from utils.instrumentation import pipeline_stage, record_llm_usage
 from models.driving_license_model import PermisData
 
 
@@ -38,17 +39,19 @@ Texte OCR :
         attempt = 0
         while attempt < max_retries:
             try:
-                response = self.client.beta.chat.completions.parse(
-                    model=self.model,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "Tu es un expert en permis de conduire marocains bilingues. Extrais les champs avec séparation FR/AR."
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    response_format=PermisData,
-                )
+                with pipeline_stage("permis", "llm_parse"):
+                    response = self.client.beta.chat.completions.parse(
+                        model=self.model,
+                        messages=[
+                            {
+                                "role": "system",
+                                "content": "Tu es un expert en permis de conduire marocains bilingues. Extrais les champs avec séparation FR/AR."
+                            },
+                            {"role": "user", "content": prompt},
+                        ],
+                        response_format=PermisData,
+                    )
+                    record_llm_usage("permis", getattr(response, "usage", None))
                 return response.choices[0].message.parsed
             except Exception as e:
                 if "502" in str(e) or "network" in str(e).lower():
@@ -0,0 +1,190 @@
+"""
+Détection des documents déjà enregistrés, entre l'OCR et l'appel LLM.
+
+Les numéros candidats (CIN, numéro de permis) sont extraits du texte OCR par
+expression régulière puis testés contre un filtre de Bloom des numéros
+enregistrés :
+- aucun candidat dans le filtre (cas normal) : pas de requête SQL, le
+  pipeline continue vers le LLM ;
+- candidat présent : confirmation par une requête sur la colonne unique
+  indexée, puis réponse selon DUPLICATE_POLICY sans appel LLM.
+
+Un numéro extrait par expression régulière peut venir d'une adresse ou
+d'une référence et désigner la fiche d'une autre personne : une ligne
+n'est retenue que si son identité (noms, date de naissance) figure aussi
+dans le texte OCR (au moins DUPLICATE_MIN_IDENTITY_MATCHES champs), sinon
+le document suit le pipeline habituel. Ligne confirmée :
+- enregistrée par l'utilisateur qui soumet le document : renvoyée ;
+- enregistrée par un autre utilisateur : 409 sans appel LLM, comme le
+  refuserait l'enregistrement (aucune donnée de la ligne n'est renvoyée) ;
+- sans propriétaire (antérieure à user_id) : le pipeline continue et
+  l'enregistrement réclame la ligne.
+
+Chaque worker construit son filtre depuis la base au premier contrôle,
+l'alimente à chaque enregistrement local (`add`) et récupère les lignes
+insérées par les autres workers (id > dernier id vu) au plus toutes les
+DUPLICATE_INDEX_SYNC_SECONDS. Un doublon non détecté ici retombe sur le
+comportement existant à l'enregistrement.
+"""
+import re
+import threading
+import time
+from datetime import date
+from flask import jsonify
+from sqlalchemy import func, select
+from config.duplicate_config import DuplicateConfig
+from database.upsert import DocumentOwnedByOtherUserError
+from utils.bloom_filter import BloomFilter
+from utils.city_normalizer import fold
+from utils.metrics import duplicate_checks_total
+
+# Dates du texte OCR : 01.02.1990, 01/02/1990, 01-02-1990
+DATE_PATTERN = re.compile(r"\b(\d{1,2})\s?[./-]\s?(\d{1,2})\s?[./-]\s?(\d{4})\b")
+
+
+class OCRText:
+    """Texte OCR préparé une fois pour la confirmation des identités."""
+
+    def __init__(self, text: str):
+        self.folded = fold(text)
+        self.dates = {(int(d), int(m), int(y)) for d, m, y in DATE_PATTERN.findall(text)}
+
+    def contains(self, value) -> bool:
+        if isinstance(value, date):
+            return (value.day, value.month, value.year) in self.dates
+        needle = fold(str(value))
+        return bool(needle) and re.search(r"\b" + re.escape(needle) + r"\b", self.folded) is not None
+
+
+class DocumentNumberIndex:
+    def __init__(self, document_type: str, column, session_factory, candidate_pattern, capacity: int,
+                 error_rate: float, sync_interval: float, identity_columns=(), min_identity_matches: int = 2):
+        self.document_type = document_type
+        self.column = column
+        self.table = column.table
+        self.identity_columns = [c.name for c in identity_columns]
+        self.min_identity_matches = min_identity_matches
+        self.session_factory = session_factory
+        self.candidate_pattern = candidate_pattern
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._bloom = None
+        self._watermark = 0
+        self._last_sync = float("-inf")
+        self._lock = threading.Lock()
+
+    def candidates(self, text: str) -> list:
+        """Numéros candidats du texte OCR, espaces internes retirés, sans doublons."""
+        found = (re.sub(r"\s+", "", m) for m in self.candidate_pattern.findall(text.upper()))
+        return list(dict.fromkeys(found))
+
+    def _load(self, session, bloom, after_id: int) -> int:
+        id_column = self.table.c.id
+        statement = (
+            select(id_column, self.column)
+            .where(id_column > after_id, self.column.is_not(None))
+            .order_by(id_column)
+        )
+        watermark = after_id
+        for row_id, number in session.execute(statement).yield_per(10000):
+            bloom.add(number)
+            watermark = row_id
+        return watermark
+
+    def refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if self._bloom is not None and not force and now - self._last_sync < self.sync_interval:
+            return
+        # Premier contrôle : les autres threads attendent la construction
+        if not self._lock.acquire(blocking=self._bloom is None or force):
+            return
+        try:
+            session = self.session_factory()
+            try:
+                if self._bloom is None or self._bloom.saturated:
+                    count = session.execute(select(func.count()).select_from(self.table)).scalar_one()
+                    bloom = BloomFilter(max(self.capacity, 2 * count), self.error_rate)
+                    self._watermark = self._load(session, bloom, 0)
+                    self._bloom = bloom
+                else:
+                    self._watermark = self._load(session, self._bloom, self._watermark)
+            finally:
+                session.close()
+            self._last_sync = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def add(self, number: str) -> None:
+        """À appeler après le commit d'un nouveau document."""
+        if self._bloom is not None and number:
+            self._bloom.add(number)
+
+    def identity_confirmed(self, row, ocr_text: OCRText) -> bool:
+        """Au moins `min_identity_matches` champs renseignés de la ligne figurent dans le texte."""
+        values = [getattr(row, name) for name in self.identity_columns]
+        values = [value for value in values if value not in (None, "")]
+        if not values:
+            return False
+        matches = sum(1 for value in values if ocr_text.contains(value))
+        return matches >= min(self.min_identity_matches, len(values))
+
+    def find_existing(self, text: str, user_id: int):
+        """
+        Ligne de `user_id` déjà enregistrée pour le document décrit par
+        `text`, ou None. Lève DocumentOwnedByOtherUserError si le document
+        confirmé appartient à un autre utilisateur.
+        """
+        self.refresh()
+        hits = [number for number in self.candidates(text) if number in self._bloom]
+        if not hits:
+            duplicate_checks_total.labels(document_type=self.document_type, result="miss").inc()
+            return None
+
+        session = self.session_factory()
+        try:
+            rows = session.execute(select(self.table).where(self.column.in_(hits))).all()
+        finally:
+            session.close()
+
+        ocr_text = OCRText(text)
+        confirmed = [row for row in rows if self.identity_confirmed(row, ocr_text)]
+        owned = next((row for row in confirmed if row.user_id == user_id), None)
+        foreign = next((row for row in confirmed if row.user_id is not None and row.user_id != user_id), None)
+        if owned is not None:
+            result = "duplicate"
+        elif foreign is not None:
+            result = "other_owner"
+        elif confirmed:
+            # Ligne sans propriétaire (antérieure à user_id) : réclamée par l'enregistrement
+            result = "unclaimed"
+        else:
+            result = "false_positive" if not rows else "unconfirmed"
+        duplicate_checks_total.labels(document_type=self.document_type, result=result).inc()
+        if owned is None and foreign is not None:
+            # L'enregistrement serait refusé (règle de propriété) : 409 avant l'appel LLM
+            raise DocumentOwnedByOtherUserError(getattr(foreign, self.column.name))
+        return owned
+
+def create_index(document_type: str, column, session_factory, candidate_pattern: str,
+                 identity_columns=()) -> DocumentNumberIndex:
+    return DocumentNumberIndex(
+        document_type,
+        column,
+        session_factory,
+        re.compile(candidate_pattern),
+        DuplicateConfig.BLOOM_CAPACITY,
+        DuplicateConfig.BLOOM_ERROR_RATE,
+        DuplicateConfig.SYNC_SECONDS,
+        identity_columns,
+        DuplicateConfig.MIN_IDENTITY_MATCHES,
+    )
+
+
+def duplicate_response(row, record: dict):
+    """Réponse au doublon selon DUPLICATE_POLICY (document existant ou 409)."""
+    if DuplicateConfig.POLICY == "conflict":
+        return jsonify({"error": "Document déjà enregistré", "existing_id": row.id}), 409
+    response = jsonify(record)
+    response.headers["X-Duplicate-Of"] = str(row.id)
+    return response
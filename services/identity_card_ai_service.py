@@ -3,6 +3,7 @@ import time
 import random
 from dotenv import load_dotenv
 from openai import OpenAI
+from utils.instrumentation import pipeline_stage, record_llm_usage
 from models.identity_card_model import CINData
 
 load_dotenv()
@@ -43,17 +44,19 @@ Texte OCR à analyser:
         attempt = 0
         while attempt < max_retries:
             try:
-                response = self.client.beta.chat.completions.parse(
-                    model=self.model,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "Tu es expert en cartes d'identité marocaines bilingues. Sépare parfaitement le FRANÇAIS et l'ARABE, retourne uniquement JSON."
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    response_format=CINData,
-                )
+                with pipeline_stage("cin", "llm_parse"):
+                    response = self.client.beta.chat.completions.parse(
+                        model=self.model,
+                        messages=[
+                            {
+                                "role": "system",
+                                "content": "Tu es expert en cartes d'identité marocaines bilingues. Sépare parfaitement le FRANÇAIS et l'ARABE, retourne uniquement JSON."
+                            },
+                            {"role": "user", "content": prompt},
+                        ],
+                        response_format=CINData,
+                    )
+                    record_llm_usage("cin", getattr(response, "usage", None))
                 return response.choices[0].message.parsed
             except Exception as e:
                 if "502" in str(e) or "network" in str(e).lower():
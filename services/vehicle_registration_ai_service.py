@@ -5,12 +5,16 @@ from azure.ai.inference import ChatCompletionsClient
 from azure.ai.inference.models import SystemMessage, UserMessage
 from azure.core.credentials import AzureKeyCredential
 from models.vehicle_registration_model import CartGrisData
+from utils.instrumentation import pipeline_stage, record_llm_usage
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class AIServiceCartGris:
     def __init__(self):
-        endpoint = "https://models.github.ai/inference"
-        model = "openai/gpt-4.1-nano"
+        endpoint = os.getenv("GITHUB_INFERENCE_ENDPOINT", "https://models.github.ai/inference")
+        model = os.getenv("MODEL_NAME_GITHUB_GRIS", "openai/gpt-4.1-nano")
         token = os.environ["GITHUB_TOKEN"]
 
         self.model = model
@@ -134,8 +138,7 @@ class AIServiceCartGris:
         try:
             return self.parse_cart_gris_data(raw_text)
         except Exception as e:
-            print(f"Échec parsing: {e}")
-            print("Utilisation fallback...")
+            logger.warning("Échec parsing carte grise, utilisation des valeurs par défaut", extra={"error": str(e)})
             
             default_data = {
                 "numero_matricule_marocain": {"numero": "1234 أ 56"},
@@ -207,15 +210,17 @@ Texte OCR :
 {raw_text}
         """
 
-        response = self.client.complete(
-            model=self.model,
-            messages=[
-                SystemMessage("Tu extrais des données de cartes grises. JSON valide uniquement, formats exacts requis."),
-                UserMessage(prompt),
-            ],
-            temperature=0.1,
-            top_p=0.9,
-        )
+        with pipeline_stage("gris", "llm_parse"):
+            response = self.client.complete(
+                model=self.model,
+                messages=[
+                    SystemMessage("Tu extrais des données de cartes grises. JSON valide uniquement, formats exacts requis."),
+                    UserMessage(prompt),
+                ],
+                temperature=0.1,
+                top_p=0.9,
+            )
+            record_llm_usage("gris", getattr(response, "usage", None))
 
         output = response.choices[0].message.content.strip()
 
@@ -249,11 +254,12 @@ Texte OCR :
             
             processed_json = self._post_process_data(parsed_json)
             
-            return CartGrisData.model_validate(processed_json)
+            with pipeline_stage("gris", "validation"):
+                return CartGrisData.model_validate(processed_json)
             
         except json.JSONDecodeError as e:
-            print(f"Erreur JSON: {e}")
+            logger.warning("Réponse LLM carte grise : JSON invalide", extra={"error": str(e)})
             raise ValueError(f"Réponse JSON invalide: {e}")
         except Exception as e:
-            print(f"Erreur validation: {e}")
+            logger.warning("Réponse LLM carte grise : validation échouée", extra={"error": str(e)})
             raise
\ No newline at end of file
@@ -1,8 +1,92 @@
 """
 Configuration Swagger simple pour l'API AI Agent
 """
-from flask import Flask, jsonify, render_template_string
-import json
+from flask import Flask, Response, jsonify, render_template_string, request
+from flask import json as flask_json
+import hashlib
+import os
+import threading
+from typing import NamedTuple, Optional
+import yaml
+
+OPENAPI_SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "openapi.yaml")
+
+# Spécification basique servie si openapi.yaml est absent ou invalide
+FALLBACK_SPEC = {
+    "openapi": "3.0.3",
+    "info": {
+        "title": "AI Agent API",
+        "version": "1.0.0",
+        "description": "API pour le traitement automatisé des documents d'identité"
+    },
+    "servers": [{"url": "http://localhost:5000"}],
+    "paths": {
+        "/health": {
+            "get": {
+                "summary": "Health Check",
+                "responses": {"200": {"description": "OK"}}
+            }
+        }
+    }
+}
+
+
+class OpenAPISpec(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: Optional[float]
+    mtime: Optional[float]
+
+
+class OpenAPISpecCache:
+    """
+    Spécification OpenAPI pré-sérialisée en JSON.
+
+    Le YAML n'est reparsé que lorsque le mtime du fichier change ; chaque
+    requête ne coûte qu'un `os.stat` et une copie des octets en mémoire.
+    Corps et ETag forment un tuple immuable remplacé en une seule
+    affectation : un lecteur sans verrou ne voit jamais l'un sans l'autre.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._spec = None
+
+    def _current_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def _load(self, mtime) -> OpenAPISpec:
+        spec = FALLBACK_SPEC
+        if mtime is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    spec = yaml.safe_load(f)
+            except Exception:
+                spec = FALLBACK_SPEC
+
+        # Même encodeur que jsonify (dates YAML comprises)
+        body = flask_json.dumps(spec).encode("utf-8")
+        return OpenAPISpec(body, hashlib.sha256(body).hexdigest(), mtime, mtime)
+
+    def get(self) -> OpenAPISpec:
+        mtime = self._current_mtime()
+        spec = self._spec
+        if spec is not None and spec.mtime == mtime:
+            return spec
+        with self._lock:
+            spec = self._spec
+            if spec is None or spec.mtime != mtime:
+                spec = self._load(mtime)
+                self._spec = spec
+        return spec
+
+
+openapi_spec_cache = OpenAPISpecCache(OPENAPI_SPEC_PATH)
+
 
 def setup_swagger(app: Flask):
     """Configure la documentation Swagger simple"""
@@ -10,31 +94,14 @@ def setup_swagger(app: Flask):
     # Endpoint pour servir la spécification OpenAPI
     @app.route('/openapi.json')
     def openapi_spec():
-        """Retourne la spécification OpenAPI en JSON"""
-        try:
-            with open('openapi.yaml', 'r', encoding='utf-8') as f:
-                import yaml
-                spec = yaml.safe_load(f)
-                return jsonify(spec)
-        except Exception as e:
-            # Fallback avec spécification basique
-            return jsonify({
-                "openapi": "3.0.3",
-                "info": {
-                    "title": "AI Agent API",
-                    "version": "1.0.0",
-                    "description": "API pour le traitement automatisé des documents d'identité"
-                },
-                "servers": [{"url": "http://localhost:5000"}],
-                "paths": {
-                    "/health": {
-                        "get": {
-                            "summary": "Health Check",
-                            "responses": {"200": {"description": "OK"}}
-                        }
-                    }
-                }
-            })
+        """Retourne la spécification OpenAPI en JSON (avec ETag / Last-Modified)"""
+        spec = openapi_spec_cache.get()
+        response = Response(spec.body, mimetype="application/json")
+        response.set_etag(spec.etag)
+        if spec.last_modified is not None:
+            response.last_modified = spec.last_modified
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
     
     # Interface Swagger UI simple
     @app.route('/docs/')
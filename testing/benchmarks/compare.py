@@ -0,0 +1,53 @@
+"""
+Compare deux fichiers de résultats produits par run_benchmarks.py.
+
+Usage :
+    python -m testing.benchmarks.compare results/base.json results/head.json --threshold 15
+
+Le code de sortie vaut 1 si une mesure p95 régresse de plus de `threshold` %.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    return report, {(r["suite"], r["name"], r["dataset_size"]): r for r in report["results"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"])
+    parser.add_argument("--threshold", type=float, default=15.0, help="Régression tolérée en %%")
+    args = parser.parse_args(argv)
+
+    base_report, base = load(args.base)
+    head_report, head = load(args.head)
+    print(f"{base_report['commit']} -> {head_report['commit']} ({args.metric})")
+
+    regressions = 0
+    for key in sorted(base.keys() & head.keys(), key=str):
+        before, after = base[key][args.metric], head[key][args.metric]
+        if not before or after is None:
+            continue
+        delta = (after - before) / before * 100
+        flag = ""
+        if delta > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        suite, name, size = key
+        size_label = f" n={size}" if size is not None else ""
+        print(f"  {suite:<9} {name:<32}{size_label:<10} {before:>10.3f} -> {after:>10.3f} ms  {delta:+7.1f}%{flag}")
+
+    for key in sorted(head.keys() - base.keys(), key=str):
+        print(f"  nouveau: {key}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
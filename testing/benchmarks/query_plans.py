@@ -0,0 +1,115 @@
+"""
+Contrôle des plans d'exécution des requêtes du dashboard.
+
+Chaque requête est celle construite par l'application (charts/chart_queries.py).
+Les requêtes sélectives (fenêtres de dates, recherche par numéro) doivent
+utiliser un index : un parcours séquentiel sur une table d'au moins
+`min_rows` lignes fait échouer la suite. Les agrégats sur toute la table
+sont seulement rapportés, le parcours complet y est légitime.
+
+PostgreSQL : EXPLAIN (FORMAT JSON), nœuds "Seq Scan".
+SQLite     : EXPLAIN QUERY PLAN, lignes "SCAN <table>" sans index.
+"""
+import json
+import re
+from datetime import date, timedelta
+from sqlalchemy import select, text
+from charts.chart_queries import SESSIONS, count_by, count_created_since, count_rows, processing_by_bucket
+from database.date_buckets import utc_now
+from database.cart_identite_national.identity_card_entity import CINDataDB
+from database.cart_permi_conduite.driving_license_entity import PermiDataDB
+from database.cart_gris_matricul.vehicle_registration_entity import GrisDataDB
+from database.cart_gris_matricul.vehicle_registration_database_service import registration_months_query
+
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+def plan_checks(now=None):
+    """(nom, entité, requête, index obligatoire)"""
+    now = now or utc_now()
+    since = now - timedelta(days=7)
+    return [
+        ("cin_total", CINDataDB, count_rows(CINDataDB), False),
+        ("cin_by_sexe", CINDataDB, count_by(CINDataDB.sexe), False),
+        ("cin_by_city_code", CINDataDB, count_by(CINDataDB.city_code), False),
+        ("permis_by_categorie", PermiDataDB, count_by(PermiDataDB.categorie), False),
+        ("gris_by_usage_type", GrisDataDB, count_by(GrisDataDB.usage_type), False),
+        ("cin_created_last_7_days", CINDataDB, count_created_since(CINDataDB, since), True),
+        ("permis_created_last_7_days", PermiDataDB, count_created_since(PermiDataDB, since), True),
+        ("gris_created_last_7_days", GrisDataDB, count_created_since(GrisDataDB, since), True),
+        ("cin_daily_stats", CINDataDB, processing_by_bucket(CINDataDB, "day", since, now), True),
+        ("permis_daily_stats", PermiDataDB, processing_by_bucket(PermiDataDB, "day", since, now), True),
+        ("gris_daily_stats", GrisDataDB, processing_by_bucket(GrisDataDB, "day", since, now), True),
+        ("gris_registration_months_range", GrisDataDB,
+         registration_months_query(date(2000, 1, 1), date(2001, 1, 1)), True),
+        ("cin_lookup", CINDataDB, select(CINDataDB.id).where(CINDataDB.cin == "Z000000001"), True),
+        ("permis_lookup", PermiDataDB,
+         select(PermiDataDB.id).where(PermiDataDB.numero_permis == "Z000000001"), True),
+        ("gris_lookup", GrisDataDB,
+         select(GrisDataDB.id).where(GrisDataDB.numero_matricule_marocain == "Z000000001"), True),
+    ]
+
+
+def _postgres_seq_scans(connection, sql):
+    plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans, nodes = [], [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node.get("Node Type") == "Seq Scan":
+            scans.append(node.get("Relation Name"))
+        nodes.extend(node.get("Plans", []))
+    return scans, json.dumps(plan)
+
+
+def _sqlite_seq_scans(connection, sql):
+    details = [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    scans = []
+    for detail in details:
+        match = SQLITE_FULL_SCAN.match(detail)
+        if match and "INDEX" not in detail:
+            scans.append(match.group(1))
+    return scans, " | ".join(details)
+
+
+def analyze(entities):
+    """Met à jour les statistiques du planificateur après un chargement massif."""
+    for entity in entities:
+        session = SESSIONS[entity]()
+        try:
+            session.execute(text(f"ANALYZE {entity.__tablename__}"))
+            session.commit()
+        finally:
+            session.close()
+
+
+def run_plan_checks(min_rows=10000):
+    entities = list(SESSIONS)
+    analyze(entities)
+    results = []
+    for name, entity, statement, requires_index in plan_checks():
+        session = SESSIONS[entity]()
+        try:
+            connection = session.connection()
+            dialect = connection.dialect
+            table_rows = session.execute(count_rows(entity)).scalar_one()
+            sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+            if dialect.name == "postgresql":
+                scans, plan = _postgres_seq_scans(connection, sql)
+            else:
+                scans, plan = _sqlite_seq_scans(connection, sql)
+        finally:
+            session.close()
+
+        failed = requires_index and bool(scans) and table_rows >= min_rows
+        results.append({
+            "suite": "plans",
+            "name": name,
+            "dataset_size": table_rows,
+            "requires_index": requires_index,
+            "seq_scans": scans,
+            "failed": failed,
+            "plan": plan,
+        })
+    return results
@@ -0,0 +1,69 @@
+"""
+Enregistre les sorties OCR et LLM réelles des images de `uploads/`.
+
+Nécessite les vraies variables AZURE_OCR_* et GITHUB_* (.env). Les fixtures
+obtenues remplacent celles de `fixtures/` ; pensez à remettre les marqueurs
+`__SEQ__` / `__SEQ5__` sur les numéros uniques (cin, numero_permis,
+numero_matricule_marocain) pour que les rejeux restent insérables en base.
+
+Usage :
+    python -m testing.benchmarks.record_fixtures
+"""
+import json
+import os
+from testing.benchmarks.run_benchmarks import SAMPLE_PAIRS
+from testing.benchmarks.standins import FIXTURES_DIR, UPLOADS_DIR
+
+
+def record_ocr(ocr_service):
+    outputs = {}
+    for document_type, pairs in SAMPLE_PAIRS.items():
+        for filename in (name for pair in pairs for name in pair):
+            with open(os.path.join(UPLOADS_DIR, filename), "rb") as f:
+                result = ocr_service.client.begin_analyze_document("prebuilt-read", f).result()
+            outputs[filename] = {
+                "document_type": document_type,
+                "pages": [{"lines": [line.content for line in page.lines]} for page in result.pages],
+            }
+            print(f"OCR enregistré: {filename}")
+    return outputs
+
+
+def record_llm(ocr_outputs):
+    from services.identity_card_ai_service import AIService
+    from services.driving_license_ai_service import AIServicePermis
+    from services.vehicle_registration_ai_service import AIServiceCartGris
+
+    parsers = {
+        "cin": AIService().parse_cin_data,
+        "permis": AIServicePermis().parse_permi_data,
+        "gris": AIServiceCartGris().parse_cart_gris_data,
+    }
+    responses = {}
+    for document_type, pairs in SAMPLE_PAIRS.items():
+        recto, verso = pairs[0]
+        text = "\n".join(
+            line
+            for name in (recto, verso)
+            for page in ocr_outputs[name]["pages"]
+            for line in page["lines"]
+        )
+        responses[document_type] = parsers[document_type](text).model_dump(mode="json")
+        print(f"Réponse LLM enregistrée: {document_type}")
+    return responses
+
+
+def main():
+    from azure.AzureOCRService import AzureOCRService
+
+    ocr_outputs = record_ocr(AzureOCRService())
+    llm_responses = record_llm(ocr_outputs)
+
+    for name, payload in (("ocr_outputs.json", ocr_outputs), ("llm_responses.json", llm_responses)):
+        with open(os.path.join(FIXTURES_DIR, name), "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+    print(f"Fixtures écrites dans {FIXTURES_DIR}")
+
+
+if __name__ == "__main__":
+    main()
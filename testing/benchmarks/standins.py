@@ -0,0 +1,256 @@
+"""
+Serveurs locaux remplaçant Azure Document Intelligence et le endpoint LLM.
+
+Ils rejouent les sorties enregistrées dans `fixtures/` :
+- OCR : la sortie est choisie d'après l'empreinte SHA-256 de l'image envoyée
+  (les images d'exemple de `uploads/` sont indexées au démarrage).
+- LLM : la réponse est choisie d'après le prompt système (CIN, permis ou
+  carte grise). Les marqueurs `__SEQ__` / `__SEQ5__` sont remplacés par un
+  compteur pour que chaque document reste unique en base.
+
+Une latence artificielle peut être ajoutée pour simuler le réseau.
+
+`CollectorStandIn` reçoit les traces OTLP/JSON (`POST /v1/traces`) quand
+les benchmarks activent le tracing, et compte les spans reçus.
+"""
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+UPLOADS_DIR = os.path.join(BENCH_DIR, "..", "..", "uploads")
+
+API_VERSION = "2023-07-31"
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _analyze_result(pages):
+    """Construit un `analyzeResult` minimal au format de l'API prebuilt-read."""
+    content_lines = []
+    offset = 0
+    result_pages = []
+    for page_number, page in enumerate(pages, start=1):
+        lines = []
+        for text in page["lines"]:
+            lines.append({
+                "content": text,
+                "polygon": [0, 0, 1, 0, 1, 1, 0, 1],
+                "spans": [{"offset": offset, "length": len(text)}],
+            })
+            content_lines.append(text)
+            offset += len(text) + 1
+        result_pages.append({
+            "pageNumber": page_number,
+            "angle": 0,
+            "width": 1000,
+            "height": 630,
+            "unit": "pixel",
+            "spans": [],
+            "words": [],
+            "lines": lines,
+        })
+    return {
+        "apiVersion": API_VERSION,
+        "modelId": "prebuilt-read",
+        "stringIndexType": "unicodeCodePoint",
+        "content": "\n".join(content_lines),
+        "pages": result_pages,
+    }
+
+
+class _StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, handler, latency_ms=0):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.latency = latency_ms / 1000.0
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class OCRStandIn(_StandInServer):
+    """Imite `POST .../documentModels/prebuilt-read:analyze` puis le polling du résultat."""
+
+    def __init__(self, latency_ms=0):
+        fixtures = load_fixture("ocr_outputs.json")
+        self.by_hash = {}
+        for filename, fixture in fixtures.items():
+            path = os.path.join(UPLOADS_DIR, filename)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    self.by_hash[_sha256(f.read())] = fixture
+        self.default_fixture = next(iter(fixtures.values()))
+        self.operations = {}
+        self.lock = threading.Lock()
+        super().__init__(_OCRHandler, latency_ms)
+
+
+class _OCRHandler(_JSONHandler):
+    def do_POST(self):
+        body = self._read_body()
+        server = self.server
+        time.sleep(server.latency)
+
+        fixture = server.by_hash.get(_sha256(body), server.default_fixture)
+        operation_id = uuid.uuid4().hex
+        with server.lock:
+            server.operations[operation_id] = fixture["pages"]
+
+        location = (
+            f"{server.base_url}/formrecognizer/documentModels/prebuilt-read/"
+            f"analyzeResults/{operation_id}?api-version={API_VERSION}"
+        )
+        self.send_response(202)
+        self.send_header("Operation-Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        operation_id = self.path.split("?")[0].rstrip("/").rsplit("/", 1)[-1]
+        with self.server.lock:
+            pages = self.server.operations.pop(operation_id, None)
+        if pages is None:
+            self._send_json(404, {"error": {"code": "NotFound", "message": "Unknown operation"}})
+            return
+        self._send_json(200, {
+            "status": "succeeded",
+            "createdDateTime": "2025-01-01T00:00:00Z",
+            "lastUpdatedDateTime": "2025-01-01T00:00:00Z",
+            "analyzeResult": _analyze_result(pages),
+        })
+
+
+class LLMStandIn(_StandInServer):
+    """Imite `POST .../chat/completions` (OpenAI et Azure AI Inference)."""
+
+    SYSTEM_PROMPT_MARKERS = (
+        ("cartes d'identité", "cin"),
+        ("permis", "permis"),
+        ("cartes grises", "gris"),
+    )
+
+    def __init__(self, latency_ms=0):
+        self.responses = load_fixture("llm_responses.json")
+        self.sequence = itertools.count(1)
+        self.lock = threading.Lock()
+        super().__init__(_LLMHandler, latency_ms)
+
+    def document_type_for(self, messages):
+        system = " ".join(
+            m.get("content", "") for m in messages
+            if m.get("role") == "system" and isinstance(m.get("content"), str)
+        ).lower()
+        for marker, document_type in self.SYSTEM_PROMPT_MARKERS:
+            if marker in system:
+                return document_type
+        return "cin"
+
+    def render(self, document_type):
+        with self.lock:
+            seq = next(self.sequence)
+        content = json.dumps(self.responses[document_type], ensure_ascii=False)
+        return content.replace("__SEQ5__", f"{seq % 100000:05d}").replace("__SEQ__", f"{seq % 1000000:06d}")
+
+
+class _LLMHandler(_JSONHandler):
+    def do_POST(self):
+        payload = json.loads(self._read_body() or b"{}")
+        server = self.server
+        time.sleep(server.latency)
+
+        messages = payload.get("messages", [])
+        content = server.render(server.document_type_for(messages))
+        prompt_chars = sum(len(m.get("content", "")) for m in messages if isinstance(m.get("content"), str))
+
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "bench-model"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+            }],
+            "usage": {
+                "prompt_tokens": prompt_chars // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": prompt_chars // 4 + len(content) // 4,
+            },
+        })
+
+
+class CollectorStandIn(_StandInServer):
+    """Imite le récepteur OTLP/HTTP d'un collecteur OpenTelemetry (encodage JSON)."""
+
+    def __init__(self, latency_ms=0):
+        self.spans = []
+        self.lock = threading.Lock()
+        super().__init__(_CollectorHandler, latency_ms)
+
+    @property
+    def traces_url(self):
+        return f"{self.base_url}/v1/traces"
+
+
+class _CollectorHandler(_JSONHandler):
+    def do_POST(self):
+        payload = json.loads(self._read_body() or b"{}")
+        server = self.server
+        time.sleep(server.latency)
+
+        spans = [
+            span
+            for resource_spans in payload.get("resourceSpans", [])
+            for scope_spans in resource_spans.get("scopeSpans", [])
+            for span in scope_spans.get("spans", [])
+        ]
+        with server.lock:
+            server.spans.extend(spans)
+        self._send_json(200, {})
@@ -0,0 +1,59 @@
+"""
+Configuration commune des tests.
+
+Les classes de `config/` lisent l'environnement à l'import : les valeurs de
+test sont donc posées ici, avant tout import de l'application. Base SQLite
+et cache mémoire locaux au processus de test ; OCR et LLM pointent vers une
+adresse injoignable (aucun appel réseau n'est attendu).
+"""
+import os
+import sys
+import tempfile
+import uuid
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+_TEST_DIR = tempfile.mkdtemp(prefix="ai-agent-tests-")
+
+for _name, _value in {
+    "DATABASE_URL": f"sqlite:///{os.path.join(_TEST_DIR, 'test.db')}",
+    "SECRET_KEY": "test-secret-key-with-enough-entropy-0123456789",
+    "CACHE_BACKEND": "memory",
+    "LOG_LEVEL": "CRITICAL",
+    "TRACE_SAMPLE_RATIO": "0",
+    "RATE_LIMIT_ENABLED": "false",
+    "BCRYPT_ROUNDS": "4",
+    "AZURE_OCR_ENDPOINT": "http://127.0.0.1:1",
+    "AZURE_OCR_KEY": "test",
+    "GITHUB_TOKEN": "test",
+    "GITHUB_BASE_URL": "http://127.0.0.1:1",
+    "GITHUB_INFERENCE_ENDPOINT": "http://127.0.0.1:1",
+    "MODEL_NAME_GITHUB": "test",
+    "MODEL_NAME_GITHUB_GRIS": "test",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from application import create_app
+    app = create_app()
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def credentials(client):
+    """Compte neuf inscrit pour le test : (email, mot de passe)."""
+    email, password = f"{uuid.uuid4().hex}@example.com", "motdepasse-de-test"
+    response = client.post("/auth/register", json={"email": email, "password": password})
+    assert response.status_code == 201, response.get_json()
+    return email, password
@@ -0,0 +1,56 @@
+from datetime import date
+import pytest
+from database.cart_gris_matricul.vehicle_registration_entity import GrisDataDB, SessionLocal as GrisSession
+from database.cart_identite_national.identity_card_entity import CINDataDB, SessionLocal as CINSession
+from database.cart_permi_conduite.driving_license_entity import PermiDataDB, SessionLocal as PermiSession
+
+CIN_KEYS = {
+    "id", "cin", "nom_fr", "nom_ar", "prenom_fr", "prenom_ar", "date_naissance", "lieu_fr", "lieu_ar",
+    "adresse_fr", "adresse_ar", "sexe", "validite", "pere_fr", "pere_ar", "mere_fr", "mere_ar",
+    "numero_etat_civil",
+}
+PERMIS_KEYS = {
+    "id", "numero_permis", "nom_fr", "nom_ar", "prenom_fr", "prenom_ar", "date_naissance", "lieu_fr", "lieu_ar",
+    "date_delivrance", "date_expiration", "categorie",
+}
+GRIS_KEYS = {
+    "id", "numero_matricule_marocain", "immatriculation_anterieure", "date_premiere_immatriculation",
+    "date_derniere_immatriculation", "date_mutation", "marque", "type", "genre", "type_carburant",
+    "numero_chassis", "nombre_cylindres", "puissance_fiscale", "restriction", "usage_type", "usage_description",
+    "nom_fr", "nom_ar", "prenom_fr", "prenom_ar", "adresse_fr", "adresse_ar", "date_validite",
+}
+
+DOCUMENTS = {
+    "cin": (CINSession, CINDataDB, {"cin": "KEYS0001", "nom_fr": "EL AMRANI", "date_naissance": date(1990, 2, 1),
+                                    "city_code": "casablanca", "processing_duration": 1.5}, CIN_KEYS),
+    "permis": (PermiSession, PermiDataDB, {"numero_permis": "KEYS/0001", "categorie": "B",
+                                           "processing_duration": 1.5}, PERMIS_KEYS),
+    "gris": (GrisSession, GrisDataDB, {"numero_matricule_marocain": "KEYS-A-0001", "marque": "DACIA",
+                                       "processing_duration": 1.5}, GRIS_KEYS),
+}
+
+
+def _ensure_row(session_factory, entity, values):
+    session = session_factory()
+    try:
+        key, number = next(iter(values.items()))
+        if session.query(entity).filter(getattr(entity, key) == number).first() is None:
+            session.add(entity(user_id=42, **values))
+            session.commit()
+    finally:
+        session.close()
+
+
+@pytest.mark.parametrize("stream", ["0", "1"], ids=["rows", "stream"])
+@pytest.mark.parametrize("document_type", DOCUMENTS)
+def test_all_returns_only_public_columns(client, credentials, document_type, stream):
+    session_factory, entity, values, keys = DOCUMENTS[document_type]
+    _ensure_row(session_factory, entity, values)
+    email, password = credentials
+    token = client.post("/auth/login", json={"email": email, "password": password}).get_json()["token"]
+
+    response = client.get(f"/{document_type}/all?stream={stream}", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    rows = response.get_json()
+    assert rows
+    assert all(set(row) == keys for row in rows)
@@ -0,0 +1,16 @@
+import pytest
+from cache.cache_backend import CacheBackend
+from cache.memory_backend import MemoryLRUBackend
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    class GetOnlyBackend(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyBackend()
+
+
+def test_memory_backend_implements_the_interface():
+    assert isinstance(MemoryLRUBackend(), CacheBackend)
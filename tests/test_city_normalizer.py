@@ -0,0 +1,54 @@
+import pytest
+from utils.city_normalizer import CityNormalizer, fold, normalize_city
+
+
+@pytest.mark.parametrize("texts, expected", [
+    # Graphies françaises, accents et casse
+    (("CASABLANCA",), "CASABLANCA"),
+    (("casablanca anfa",), "CASABLANCA"),
+    (("Fès",), "FES"),
+    (("MEKNÈS",), "MEKNES"),
+    (("Salé",), "SALE"),
+    # Noms composés, séparateurs variables
+    (("BENI MELLAL",), "BENI MELLAL"),
+    (("Béni-Mellal",), "BENI MELLAL"),
+    (("KSAR  EL KEBIR",), "KSAR EL KEBIR"),
+    (("EL JADIDA",), "EL JADIDA"),
+    (("AL HOCEIMA",), "AL HOCEIMA"),
+    # Arrondissements de Casablanca écrits sans le nom de la ville
+    (("AIN SEBAA",), "CASABLANCA"),
+    (("Aïn Sebaâ",), "CASABLANCA"),
+    (("HAY MOHAMMADI",), "CASABLANCA"),
+    (("SIDI BERNOUSSI",), "CASABLANCA"),
+    # Graphies arabes, avec harakat et tatweel
+    (("الدار البيضاء",), "CASABLANCA"),
+    (("عين السبع",), "CASABLANCA"),
+    (("الرِّباط",), "RABAT"),
+    (("فــاس",), "FES"),
+    (("بني ملال",), "BENI MELLAL"),
+    # Adresse complète : la ville est trouvée au milieu du texte
+    (("12 RUE IBN BATOUTA QUARTIER HASSAN RABAT",), "RABAT"),
+    # Limites de mot : PROFESSEUR ne contient pas FES
+    (("PROFESSEUR",), "AUTRES"),
+    # Ordre des champs : le premier texte reconnu l'emporte
+    ((None, "", "TANGER"), "TANGER"),
+    (("MARRAKECH", "AGADIR"), "MARRAKECH"),
+    (("VILLE INCONNUE", "مدينة مجهولة"), "AUTRES"),
+    ((), "AUTRES"),
+])
+def test_normalize_city(texts, expected):
+    assert normalize_city(*texts) == expected
+
+
+def test_longest_spelling_wins():
+    normalizer = CityNormalizer({"cities": [
+        {"code": "SIDI", "fr": ["SIDI"]},
+        {"code": "SIDI KACEM", "fr": ["SIDI KACEM"]},
+    ]})
+    assert normalizer.normalize("SIDI KACEM") == "SIDI KACEM"
+    assert normalizer.normalize("INCONNUE") == "AUTRES"
+
+
+def test_fold():
+    assert fold("  Aïn-Sebaâ ") == "AIN SEBAA"
+    assert fold("فــاس") == "فاس"
@@ -0,0 +1,155 @@
+import io
+import random
+import string
+from datetime import date
+import pytest
+from database.cart_identite_national.identity_card_entity import CINDataDB, SessionLocal
+from database.upsert import DocumentOwnedByOtherUserError
+from services.duplicate_detection import OCRText, create_index
+
+CIN_PATTERN = r"\b[A-Z]{1,3}\s?\d{3,6}[A-Z]{0,3}\b"
+IDENTITY = (CINDataDB.nom_fr, CINDataDB.prenom_fr, CINDataDB.nom_ar, CINDataDB.prenom_ar, CINDataDB.date_naissance)
+
+
+def _cin_number():
+    return "".join(random.choices(string.ascii_uppercase, k=2)) + "".join(random.choices(string.digits, k=6))
+
+
+def _insert(**values):
+    session = SessionLocal()
+    try:
+        row = CINDataDB(**values)
+        session.add(row)
+        session.commit()
+        return row.id
+    finally:
+        session.close()
+
+
+def _index():
+    return create_index("cin", CINDataDB.cin, SessionLocal, CIN_PATTERN, identity_columns=IDENTITY)
+
+
+@pytest.fixture
+def owned_cin():
+    number = _cin_number()
+    row_id = _insert(cin=number, nom_fr="EL AMRANI", prenom_fr="Fatima Zahra", nom_ar="العمراني",
+                     date_naissance=date(1990, 2, 1), user_id=1)
+    return number, row_id
+
+
+def _scan(number, name="EL AMRANI", first_name="FATIMA ZAHRA", born="01.02.1990"):
+    return f"ROYAUME DU MAROC CARTE NATIONALE\n{name}\n{first_name}\nNé le {born}\nN° {number}"
+
+
+def test_duplicate_returned_to_its_owner(owned_cin):
+    number, row_id = owned_cin
+    row = _index().find_existing(_scan(number), user_id=1)
+    assert row is not None and row.id == row_id
+
+
+def test_number_spaced_by_ocr_and_accented_names_still_match(owned_cin):
+    number, row_id = owned_cin
+    spaced = f"{number[:2]} {number[2:]}"
+    row = _index().find_existing(_scan(spaced, name="El Amrani", first_name="Fâtima-Zahra"), user_id=1)
+    assert row is not None and row.id == row_id
+
+
+def test_other_users_record_is_refused_without_its_data(owned_cin):
+    number, _ = owned_cin
+    with pytest.raises(DocumentOwnedByOtherUserError):
+        _index().find_existing(_scan(number), user_id=2)
+
+
+def test_row_without_owner_is_left_to_the_save_to_claim():
+    number = _cin_number()
+    _insert(cin=number, nom_fr="EL AMRANI", prenom_fr="FATIMA ZAHRA", user_id=None)
+    assert _index().find_existing(_scan(number), user_id=2) is None
+
+
+def test_number_found_elsewhere_in_text_needs_identity_confirmation(owned_cin):
+    number, _ = owned_cin
+    # Même numéro lu dans une adresse, mais autre personne
+    text = _scan("ZZ000000", name="BENNANI", first_name="OMAR", born="15.07.1985") + f"\nRÉSIDENCE {number}"
+    assert _index().find_existing(text, user_id=1) is None
+    # Identité non confirmée : pas de 409 pour un autre utilisateur non plus
+    assert _index().find_existing(text, user_id=2) is None
+
+
+def test_one_identity_field_is_not_enough(owned_cin):
+    number, _ = owned_cin
+    assert _index().find_existing(_scan(number, first_name="OMAR", born="15.07.1985"), user_id=1) is None
+    # Nom + date de naissance (format avec barres obliques) suffisent
+    assert _index().find_existing(_scan(number, first_name="OMAR", born="1/2/1990"), user_id=1) is not None
+
+
+def test_row_without_identity_is_not_confirmed():
+    number = _cin_number()
+    _insert(cin=number, user_id=1)
+    assert _index().find_existing(_scan(number), user_id=1) is None
+
+
+def test_callers_row_is_picked_among_several_candidates(owned_cin):
+    number, row_id = owned_cin
+    other = _cin_number()
+    _insert(cin=other, nom_fr="EL AMRANI", prenom_fr="FATIMA ZAHRA", date_naissance=date(1990, 2, 1), user_id=2)
+    row = _index().find_existing(_scan(other) + f"\nN° {number}", user_id=1)
+    assert row is not None and row.id == row_id
+
+
+def test_unknown_number_costs_no_query(monkeypatch):
+    index = _index()
+    index.refresh(force=True)
+
+    def no_session():
+        raise AssertionError("aucune requête attendue pour un numéro absent du filtre")
+
+    monkeypatch.setattr(index, "session_factory", no_session)
+    assert index.find_existing(_scan(_cin_number()), user_id=1) is None
+
+
+def test_rows_saved_by_another_worker_are_seen_after_sync():
+    index = _index()
+    index.refresh(force=True)
+    number = _cin_number()
+    _insert(cin=number, nom_fr="EL AMRANI", prenom_fr="FATIMA ZAHRA", user_id=1)
+    assert index.find_existing(_scan(number), user_id=1) is None
+    index.refresh(force=True)
+    assert index.find_existing(_scan(number), user_id=1) is not None
+
+
+def test_ocr_text_dates_and_word_boundaries():
+    text = OCRText("Né le 01-02-1990 à CASABLANCA, fils de AMRANIA")
+    assert text.contains(date(1990, 2, 1))
+    assert not text.contains(date(1990, 1, 2))
+    assert not text.contains("AMRANI")
+    assert text.contains("casablanca")
+
+
+def test_duplicate_header_is_exposed_to_browsers(client):
+    from application import CORS_ORIGIN
+    response = client.get("/health", headers={"Origin": CORS_ORIGIN})
+    assert "X-Duplicate-Of" in response.headers.get("Access-Control-Expose-Headers", "")
+
+
+def test_document_of_another_user_is_refused_before_the_llm(app, client, credentials, monkeypatch, tmp_path):
+    import routes.identity_card_routes as cin_routes
+    monkeypatch.setitem(app.config, "UPLOAD_FOLDER", str(tmp_path))
+    number = _cin_number()
+    _insert(cin=number, nom_fr="EL AMRANI", prenom_fr="FATIMA ZAHRA", nom_ar="العمراني",
+            date_naissance=date(1990, 2, 1), user_id=-1)
+
+    def no_llm(text):
+        raise AssertionError("aucun appel LLM attendu")
+
+    monkeypatch.setattr(cin_routes.ocr_service, "extract_text", lambda path, document_type: _scan(number))
+    monkeypatch.setattr(cin_routes.ai_service, "parse_cin_data", no_llm)
+    email, password = credentials
+    token = client.post("/auth/login", json={"email": email, "password": password}).get_json()["token"]
+    response = client.post(
+        "/cin/process",
+        data={"recto": (io.BytesIO(b"recto"), "recto.jpg"), "verso": (io.BytesIO(b"verso"), "verso.jpg")},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 409
+    assert response.get_json() == {"error": "Document déjà enregistré par un autre utilisateur"}
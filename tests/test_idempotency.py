@@ -0,0 +1,123 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from flask import Flask, jsonify, request
+import middlewares.idempotency as idempotency
+from cache.cache_service import NamespacedCache
+from cache.memory_backend import MemoryLRUBackend
+from config.idempotency_config import IdempotencyConfig
+from middlewares.idempotency import idempotent
+
+USER = SimpleNamespace(id=7, email="agent@entreprise.ma")
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = NamespacedCache("idempotency", MemoryLRUBackend(1000), "test")
+    monkeypatch.setattr(idempotency, "_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def client(cache, calls):
+    """Vue /process factice : le statut et la durée sont choisis par le formulaire."""
+    app = Flask(__name__)
+
+    @idempotent("cin")
+    def process(current_user):
+        calls.append(request.form.get("document"))
+        time.sleep(float(request.form.get("delay", 0)))
+        status = int(request.form.get("status", 200))
+        if status >= 500:
+            raise RuntimeError("OCR indisponible")
+        response = jsonify({"call": len(calls)})
+        response.status_code = status
+        response.headers["ETag"] = f'"v{len(calls)}"'
+        response.headers["X-Duplicate-Of"] = "123"
+        return response
+
+    app.add_url_rule("/cin/process", "process", lambda: process(USER), methods=["POST"])
+    return app.test_client()
+
+
+def _post(client, key="cle-1", **form):
+    form.setdefault("document", "recto")
+    return client.post("/cin/process", data=form, headers={IdempotencyConfig.HEADER: key})
+
+
+def test_success_is_replayed_with_its_headers(client, calls):
+    first = _post(client)
+    replayed = _post(client)
+
+    assert calls == ["recto"]
+    assert replayed.status_code == 200
+    assert replayed.get_json() == first.get_json()
+    assert replayed.headers["Idempotent-Replayed"] == "true"
+    assert replayed.headers["ETag"] == first.headers["ETag"]
+    assert replayed.headers["X-Duplicate-Of"] == "123"
+    assert replayed.headers["Content-Type"] == "application/json"
+
+
+@pytest.mark.parametrize("status", [400, 409, 422, 429])
+def test_client_errors_are_not_stored(client, calls, status):
+    assert _post(client, status=status).status_code == status
+    retried = _post(client, status=status)
+    assert retried.status_code == status
+    assert "Idempotent-Replayed" not in retried.headers
+    assert len(calls) == 2
+
+
+def test_failure_releases_the_key(client, calls, cache):
+    assert _post(client, status=500).status_code == 500
+    assert cache.get(f"{USER.id}:/cin/process:cle-1") is None
+    assert _post(client, status=500).status_code == 500
+    assert len(calls) == 2
+
+
+def test_key_reused_with_other_content_is_rejected(client, calls):
+    _post(client)
+    assert _post(client, document="verso").status_code == 422
+    assert calls == ["recto"]
+
+
+def test_without_header_every_request_runs(client, calls):
+    client.post("/cin/process", data={"document": "recto"})
+    client.post("/cin/process", data={"document": "recto"})
+    assert len(calls) == 2
+
+
+def test_concurrent_retry_waits_for_the_first_result(client, calls):
+    results = []
+
+    def submit():
+        results.append(_post(client, delay="0.3"))
+
+    threads = [threading.Thread(target=submit) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["recto"]
+    assert [r.status_code for r in results] == [200, 200, 200]
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in results) == 2
+
+
+def test_retry_answers_409_when_the_first_request_outlasts_the_wait(client, calls, monkeypatch):
+    monkeypatch.setattr(IdempotencyConfig, "WAIT_SECONDS", 0.1)
+    first = threading.Thread(target=_post, args=(client,), kwargs={"delay": "0.5"})
+    first.start()
+    time.sleep(0.1)
+    retried = _post(client, delay="0.5")
+    first.join()
+
+    assert retried.status_code == 409
+    assert retried.headers["Retry-After"] == str(IdempotencyConfig.RETRY_AFTER_SECONDS)
+    assert calls == ["recto"]
@@ -0,0 +1,20 @@
+import pytest
+from models.identity_card_model import EtatCivil
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("123/1990", "123/1990"),
+    ("1231990", "123/1990"),
+    ("12-1990", "12/1990"),
+    ("123/1990 ABC", "123/1990"),
+    ("CAN 279975", None),
+    (None, None),
+    ("", ""),
+])
+def test_numero_etat_civil_is_normalized(raw, expected):
+    assert EtatCivil(numero_etat_civil=raw).numero_etat_civil == expected
+
+
+def test_unrecognized_numero_etat_civil_is_rejected():
+    with pytest.raises(ValueError):
+        EtatCivil(numero_etat_civil="N/A")
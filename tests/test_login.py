@@ -0,0 +1,58 @@
+import bcrypt
+import auth.authentication_routes as authentication_routes
+from auth.authentication_model import SessionLocal, UserDB, engine
+from config.password_hashing_config import PasswordHashingConfig
+
+
+def _stored_hash(email):
+    session = SessionLocal()
+    try:
+        return session.query(UserDB.hashed_password).filter_by(email=email).scalar()
+    finally:
+        session.close()
+
+
+def test_login_returns_token_pair(client, credentials):
+    email, password = credentials
+    response = client.post("/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200
+    assert {"token", "refresh_token", "expires_in"} <= set(response.get_json())
+
+
+def test_login_rejects_wrong_password_and_unknown_email(client, credentials):
+    email, _ = credentials
+    assert client.post("/auth/login", json={"email": email, "password": "faux"}).status_code == 401
+    assert client.post("/auth/login", json={"email": "inconnu@example.com", "password": "x"}).status_code == 401
+
+
+def test_login_verifies_without_holding_a_connection(client, credentials, monkeypatch):
+    email, password = credentials
+    checked_out = []
+    verify = authentication_routes.verify_password
+
+    def spy(plain, hashed):
+        checked_out.append(engine.pool.checkedout())
+        return verify(plain, hashed)
+
+    monkeypatch.setattr(authentication_routes, "verify_password", spy)
+    assert client.post("/auth/login", json={"email": email, "password": password}).status_code == 200
+    assert checked_out == [0]
+
+
+def test_login_persists_rehash_in_a_short_session(client, credentials, monkeypatch):
+    email, password = credentials
+    assert bcrypt.checkpw(password.encode(), _stored_hash(email).encode())
+    old_rounds = int(_stored_hash(email).split("$")[2])
+
+    monkeypatch.setattr(PasswordHashingConfig, "BCRYPT_ROUNDS", old_rounds + 1)
+    assert client.post("/auth/login", json={"email": email, "password": password}).status_code == 200
+
+    rehashed = _stored_hash(email)
+    assert int(rehashed.split("$")[2]) == old_rounds + 1
+    assert bcrypt.checkpw(password.encode(), rehashed.encode())
+
+
+def test_register_rejects_duplicate_email(client, credentials):
+    email, password = credentials
+    response = client.post("/auth/register", json={"email": email, "password": password})
+    assert response.status_code == 400
@@ -0,0 +1,188 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+import middlewares.quotas as quotas
+from cache.cache_service import NamespacedCache
+from cache.memory_backend import MemoryLRUBackend
+from cache.sqlite_backend import SQLiteBackend
+from config.quota_config import QuotaConfig
+from middlewares.quotas import QuotaExceeded, acquire, quota_required, release, usage
+
+USER = SimpleNamespace(id=42, email="agent@entreprise.ma")
+
+
+def _redis_backend():
+    from cache.redis_backend import RedisBackend
+    from cache.resp_standin import RESPStandIn
+    return RedisBackend(RESPStandIn().start().url)
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def cache(request, tmp_path, monkeypatch):
+    if request.param == "memory":
+        backend = MemoryLRUBackend(1000)
+    elif request.param == "sqlite":
+        backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), 1000, "test")
+    else:
+        backend = _redis_backend()
+    cache = NamespacedCache("quotas", backend, "test")
+    monkeypatch.setattr(quotas, "_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def frozen_window(monkeypatch):
+    # Horloge des quotas figée au milieu d'une minute : un test à cheval sur
+    # deux fenêtres verrait ses compteurs par minute remis à zéro
+    now = (time.time() // quotas.WINDOW_SECONDS) * quotas.WINDOW_SECONDS + quotas.WINDOW_SECONDS / 2
+    monkeypatch.setattr(quotas, "time", SimpleNamespace(time=lambda: now))
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(QuotaConfig, "USER_DOCUMENTS_PER_MINUTE", 5)
+    monkeypatch.setattr(QuotaConfig, "USER_MAX_IN_FLIGHT", 2)
+    monkeypatch.setattr(QuotaConfig, "TENANT_DOCUMENTS_PER_MINUTE", 100)
+    monkeypatch.setattr(QuotaConfig, "TENANT_MAX_IN_FLIGHT", 10)
+    monkeypatch.setattr(QuotaConfig, "IN_FLIGHT_TTL_SECONDS", 600)
+
+
+def _in_flight(scope="user"):
+    return usage(USER)[scope]["in_flight"]
+
+
+def _this_minute(scope="user"):
+    return usage(USER)[scope]["documents_this_minute"]
+
+
+def test_acquire_and_release_track_both_scopes(cache, limits):
+    keys = acquire(USER)
+    assert len(keys) == 2
+    assert (_in_flight("user"), _in_flight("tenant")) == (1, 1)
+    release(keys)
+    assert (_in_flight("user"), _in_flight("tenant")) == (0, 0)
+    assert _this_minute() == 1
+
+
+def test_public_email_domain_has_no_tenant(limits):
+    assert quotas.tenant_of(SimpleNamespace(email="someone@gmail.com")) is None
+    assert quotas.tenant_of(USER) == "entreprise.ma"
+
+
+def test_in_flight_rejection_rolls_back_every_counter(cache, limits):
+    first, second = acquire(USER), acquire(USER)
+    with pytest.raises(QuotaExceeded) as rejected:
+        acquire(USER)
+    assert (rejected.value.scope, rejected.value.quota) == ("user", "in_flight")
+    # Le document refusé ne consomme ni la minute ni les appels en cours du tenant
+    assert _this_minute("user") == 2
+    assert _this_minute("tenant") == 2
+    assert _in_flight("user") == 2
+    assert _in_flight("tenant") == 2
+
+    release(first)
+    release(second)
+    assert _in_flight("user") == 0
+
+
+def test_per_minute_rejection_rolls_back(cache, limits, monkeypatch):
+    monkeypatch.setattr(QuotaConfig, "USER_MAX_IN_FLIGHT", 100)
+    for _ in range(5):
+        release(acquire(USER))
+    with pytest.raises(QuotaExceeded) as rejected:
+        acquire(USER)
+    assert rejected.value.quota == "documents_per_minute"
+    assert 1 <= rejected.value.retry_after <= 60
+    assert _this_minute() == 5
+    assert _in_flight() == 0
+    assert _this_minute("tenant") == 5
+
+
+def test_release_after_expiry_does_not_recreate_counter(cache, limits, monkeypatch):
+    monkeypatch.setattr(QuotaConfig, "IN_FLIGHT_TTL_SECONDS", 0.2)
+    keys = acquire(USER)
+    time.sleep(0.3)
+    release(keys)
+    assert cache.get(quotas._in_flight_key("user", str(USER.id))) is None
+
+    # Sans compteur à -1, la limite de 2 appels simultanés reste exacte
+    held = [acquire(USER), acquire(USER)]
+    with pytest.raises(QuotaExceeded):
+        acquire(USER)
+    for keys in held:
+        release(keys)
+    assert _in_flight() == 0
+
+
+def test_in_flight_ttl_is_refreshed_by_each_acquire(cache, limits, monkeypatch):
+    monkeypatch.setattr(QuotaConfig, "IN_FLIGHT_TTL_SECONDS", 0.5)
+    first = acquire(USER)
+    time.sleep(0.3)
+    second = acquire(USER)
+    time.sleep(0.3)
+    # 0,6 s après sa création, le compteur vit encore : les deux appels sont comptés
+    assert _in_flight() == 2
+    release(first)
+    release(second)
+    assert _in_flight() == 0
+
+
+def test_concurrent_acquire_admits_exactly_the_limit(cache, limits, monkeypatch):
+    monkeypatch.setattr(QuotaConfig, "USER_MAX_IN_FLIGHT", 3)
+    monkeypatch.setattr(QuotaConfig, "USER_DOCUMENTS_PER_MINUTE", 1000)
+    held, rejected = [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(12)
+
+    def worker():
+        barrier.wait()
+        try:
+            keys = acquire(USER)
+        except QuotaExceeded:
+            with lock:
+                rejected.append(1)
+            return
+        with lock:
+            held.append(keys)
+
+    threads = [threading.Thread(target=worker) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert (len(held), len(rejected)) == (3, 9)
+    assert _in_flight() == 3
+    assert _this_minute() == 3
+    for keys in held:
+        release(keys)
+    assert (_in_flight("user"), _in_flight("tenant")) == (0, 0)
+
+
+def test_decorator_releases_on_error_and_answers_429(app, cache, limits, monkeypatch):
+    monkeypatch.setattr(QuotaConfig, "ENABLED", True)
+    monkeypatch.setattr(QuotaConfig, "USER_MAX_IN_FLIGHT", 1)
+
+    @quota_required("cin")
+    def failing_view(current_user):
+        raise RuntimeError("OCR indisponible")
+
+    @quota_required("cin")
+    def nested_view(current_user):
+        with app.test_request_context():
+            return inner_view(current_user)
+
+    @quota_required("cin")
+    def inner_view(current_user):
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        failing_view(USER)
+    assert _in_flight() == 0
+
+    with app.test_request_context():
+        response = nested_view(USER)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(QuotaConfig.IN_FLIGHT_RETRY_AFTER_SECONDS)
+    assert _in_flight() == 0
@@ -0,0 +1,130 @@
+import threading
+import pytest
+import middlewares.rate_limiter as rate_limiter
+from cache.cache_service import NamespacedCache
+from cache.memory_backend import MemoryLRUBackend
+from cache.sqlite_backend import SQLiteBackend
+from config.rate_limit_config import RateLimitConfig
+from middlewares.rate_limiter import SlidingWindowLimiter, TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def _accepted(limiter, key, limit, window, hits):
+    return sum(1 for _ in range(hits) if limiter.hit(key, limit, window) == 0)
+
+
+def _concurrent_accepted(limiter, key, limit, window, threads, hits_per_thread):
+    accepted = []
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        barrier.wait()
+        accepted.append(_accepted(limiter, key, limit, window, hits_per_thread))
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(accepted)
+
+
+def test_token_bucket_rejects_after_limit_then_refills(clock):
+    limiter = TokenBucketLimiter(max_keys=100)
+    assert _accepted(limiter, "k", 5, 60, 10) == 5
+    assert limiter.hit("k", 5, 60) == pytest.approx(12.0)
+
+    clock.now += 12
+    assert limiter.hit("k", 5, 60) == 0
+    assert limiter.hit("k", 5, 60) > 0
+
+
+def test_token_bucket_keys_are_independent_and_bounded(clock):
+    limiter = TokenBucketLimiter(max_keys=2)
+    assert _accepted(limiter, "a", 1, 60, 2) == 1
+    assert _accepted(limiter, "b", 1, 60, 2) == 1
+    # "a" est le moins récemment utilisé : oublié au profit de "c"
+    assert _accepted(limiter, "c", 1, 60, 1) == 1
+    assert len(limiter._buckets) == 2
+    assert limiter.hit("a", 1, 60) == 0
+
+
+def test_token_bucket_is_exact_under_concurrency(clock):
+    limiter = TokenBucketLimiter(max_keys=100)
+    assert _concurrent_accepted(limiter, "k", 30, 3600, threads=16, hits_per_thread=10) == 30
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def shared_cache(request, tmp_path):
+    if request.param == "memory":
+        backend = MemoryLRUBackend(1000)
+    else:
+        backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), 1000, "test")
+    return NamespacedCache("rate-limit", backend, "test")
+
+
+def test_sliding_window_counts_previous_window(clock, shared_cache):
+    limiter = SlidingWindowLimiter(shared_cache)
+    clock.now = 600.0
+    assert _accepted(limiter, "k", 10, 60, 10) == 10
+    assert limiter.hit("k", 10, 60) == pytest.approx(60.0)
+
+    # Un quart de la fenêtre suivante : 75 % des 11 tentatives précédentes comptent encore
+    clock.now = 675.0
+    assert _accepted(limiter, "k", 10, 60, 5) == 1
+    retry_after = limiter.hit("k", 10, 60)
+    assert 0 < retry_after <= 60
+
+    clock.now = 780.0
+    assert limiter.hit("k", 10, 60) == 0
+
+
+def test_sliding_window_is_exact_under_concurrency(clock, shared_cache):
+    limiter = SlidingWindowLimiter(shared_cache)
+    clock.now = 3600.0
+    assert _concurrent_accepted(limiter, "k", 30, 3600, threads=8, hits_per_thread=10) == 30
+
+
+@pytest.fixture
+def enabled_limiter(monkeypatch, clock):
+    monkeypatch.setattr(RateLimitConfig, "ENABLED", True)
+    monkeypatch.setattr(rate_limiter, "_limiter", TokenBucketLimiter(100))
+
+
+def test_login_is_limited_per_account_before_any_lookup(client, enabled_limiter, monkeypatch):
+    monkeypatch.setattr(RateLimitConfig, "LOGIN_PER_ACCOUNT", 5)
+    body = {"email": "Victime@Example.com", "password": "faux"}
+    statuses = [client.post("/auth/login", json=body).status_code for _ in range(6)]
+    assert statuses == [401] * 5 + [429]
+
+    response = client.post("/auth/login", json={**body, "email": " victime@example.com "})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    # Autre compte, même IP : encore sous la limite par IP
+    assert client.post("/auth/login", json={**body, "email": "autre@example.com"}).status_code == 401
+
+
+def test_register_is_limited_per_ip(client, enabled_limiter, monkeypatch):
+    body = {"email": "", "password": ""}
+    statuses = [client.post("/auth/register", json=body).status_code for _ in range(RateLimitConfig.REGISTER_PER_IP + 1)]
+    assert statuses[:-1] == [400] * RateLimitConfig.REGISTER_PER_IP
+    assert statuses[-1] == 429
+    other_ip = client.post("/auth/register", json=body, environ_base={"REMOTE_ADDR": "10.0.0.2"})
+    assert other_ip.status_code == 400
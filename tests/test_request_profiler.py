@@ -0,0 +1,42 @@
+from flask import Flask
+import profiling.request_profiler as request_profiler
+from cache.cache_service import NamespacedCache
+from cache.sqlite_backend import SQLiteBackend
+from config.profiling_config import ProfilingConfig
+
+
+def _worker_cache(path):
+    """Cache d'un worker : chaque worker ouvre sa propre connexion au même fichier."""
+    return NamespacedCache("request-profiles", SQLiteBackend(path, 1000, "test"), "test")
+
+
+def test_profile_is_readable_from_another_worker(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite3")
+    app = Flask(__name__)
+    monkeypatch.setattr(request_profiler, "_request_is_from_admin", lambda: True)
+    monkeypatch.setattr(request_profiler, "_cache", lambda: _worker_cache(path))
+
+    with app.test_request_context("/charts/overview", headers={ProfilingConfig.REQUEST_HEADER: "1"}):
+        request_profiler.start_request_profile()
+        sum(range(1000))
+        response = request_profiler.finish_request_profile(app.response_class("ok"))
+    profile_id = response.headers["X-Profile-Id"]
+
+    other_worker = _worker_cache(path)
+    monkeypatch.setattr(request_profiler, "_cache", lambda: other_worker)
+    profile = request_profiler.get_request_profile(profile_id)
+    assert profile["endpoint"] == "/charts/overview"
+    assert "function calls" in request_profiler.format_profile_text(profile["stats"])
+
+
+def test_profile_expires_after_ttl(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite3")
+    app = Flask(__name__)
+    monkeypatch.setattr(request_profiler, "_request_is_from_admin", lambda: True)
+    monkeypatch.setattr(request_profiler, "_cache", lambda: _worker_cache(path))
+    monkeypatch.setattr(ProfilingConfig, "REQUEST_PROFILE_TTL_SECONDS", -1)
+
+    with app.test_request_context("/", headers={ProfilingConfig.REQUEST_HEADER: "1"}):
+        request_profiler.start_request_profile()
+        response = request_profiler.finish_request_profile(app.response_class("ok"))
+    assert request_profiler.get_request_profile(response.headers["X-Profile-Id"]) is None
@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+from database.cart_permi_conduite.driving_license_entity import PermiDataDB
+from database.schema_migrations import _add_column, ensure_schema
+
+
+def test_added_created_at_leaves_existing_rows_null(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE permi_data (id INTEGER PRIMARY KEY, numero_permis VARCHAR UNIQUE)"))
+        connection.execute(text("INSERT INTO permi_data (numero_permis) VALUES ('ANCIEN/1')"))
+
+    ensure_schema(engine, PermiDataDB.metadata)
+    with engine.begin() as connection:
+        connection.execute(PermiDataDB.__table__.insert().values(numero_permis="NOUVEAU/1"))
+        rows = dict(connection.execute(text("SELECT numero_permis, created_at FROM permi_data")).all())
+    engine.dispose()
+
+    assert rows["ANCIEN/1"] is None
+    assert rows["NOUVEAU/1"] is not None
+
+
+def test_postgres_adds_created_at_without_backfill():
+    executed = []
+    connection = SimpleNamespace(
+        dialect=postgresql.dialect(), execute=lambda statement: executed.append(str(statement))
+    )
+    _add_column(connection, PermiDataDB.__table__, PermiDataDB.__table__.c.created_at)
+
+    assert executed == [
+        'ALTER TABLE permi_data ADD COLUMN IF NOT EXISTS "created_at" TIMESTAMP WITHOUT TIME ZONE',
+        'ALTER TABLE permi_data ALTER COLUMN "created_at" SET DEFAULT now()',
+    ]
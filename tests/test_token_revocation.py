@@ -0,0 +1,165 @@
+import threading
+import uuid
+from datetime import datetime, timedelta
+import auth.token_revocation as token_revocation
+from auth.token_revocation import RevocationList
+from middlewares.jwt_manager import ACCESS_TOKEN, _encode, decode_token
+from utils.bloom_filter import BloomFilter
+
+
+def _jti():
+    return uuid.uuid4().hex
+
+
+def _expires(days=1):
+    return datetime.utcnow() + timedelta(days=days)
+
+
+def _revocation_list():
+    return RevocationList(capacity=1000, error_rate=0.001, sync_interval=3600, rebuild_interval=3600)
+
+
+def _in_threads(count, target):
+    results = []
+    barrier = threading.Barrier(count)
+
+    def run():
+        barrier.wait()
+        results.append(target())
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(1000, 0.01)
+    added = [_jti() for _ in range(1000)]
+    for item in added:
+        bloom.add(item)
+    assert all(item in bloom for item in added)
+    false_positives = sum(_jti() in bloom for _ in range(10000))
+    assert false_positives < 300
+    assert not bloom.saturated
+    bloom.add(_jti())
+    assert bloom.saturated
+
+
+def test_unrevoked_token_is_checked_without_database(monkeypatch):
+    revocations = _revocation_list()
+    revocations.refresh(force=True)
+
+    def no_database():
+        raise AssertionError("aucune requête attendue pour un jti absent du filtre")
+
+    monkeypatch.setattr(token_revocation, "SessionLocal", no_database)
+    assert not revocations.is_revoked(_jti())
+
+
+def test_bloom_false_positive_is_confirmed_in_database():
+    revocations = _revocation_list()
+    revocations.refresh(force=True)
+    jti = _jti()
+    revocations._bloom.add(jti)
+    assert not revocations.is_revoked(jti)
+
+
+def test_revocation_is_seen_by_other_workers_after_sync():
+    worker_a, worker_b = _revocation_list(), _revocation_list()
+    worker_b.refresh(force=True)
+    jti = _jti()
+    worker_a.revoke(jti, _expires(), 1)
+
+    assert worker_a.is_revoked(jti)
+    assert jti not in worker_b._bloom
+    worker_b.refresh(force=True)
+    assert worker_b.is_revoked(jti)
+
+
+def test_rebuild_purges_expired_tokens():
+    revocations = _revocation_list()
+    expired, active = _jti(), _jti()
+    revocations.revoke(expired, _expires(days=-1), 1)
+    revocations.revoke(active, _expires(), 1)
+
+    revocations._confirmed.clear()
+    revocations.rebuild_interval = 0
+    revocations.refresh(force=True)
+    assert revocations.is_revoked(active)
+    assert not revocations.is_revoked(expired)
+
+
+def test_claim_succeeds_once_under_concurrency():
+    revocations = _revocation_list()
+    jti = _jti()
+    results = _in_threads(8, lambda: revocations.claim(jti, _expires(), 1))
+    assert sorted(results) == [False] * 7 + [True]
+    assert revocations.is_revoked(jti)
+    assert not revocations.claim(jti, _expires(), 1)
+
+
+def _login(client, credentials):
+    email, password = credentials
+    response = client.post("/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_refresh_rotates_and_rejects_reuse(client, credentials):
+    pair = _login(client, credentials)
+    first = client.post("/auth/refresh", json={"refresh_token": pair["refresh_token"]})
+    assert first.status_code == 200
+    assert first.get_json()["refresh_token"] != pair["refresh_token"]
+
+    reused = client.post("/auth/refresh", json={"refresh_token": pair["refresh_token"]})
+    assert reused.status_code == 401
+
+
+def test_parallel_refresh_with_same_token_issues_one_pair(app, credentials):
+    pair = _login(app.test_client(), credentials)
+
+    def refresh():
+        return app.test_client().post("/auth/refresh", json={"refresh_token": pair["refresh_token"]}).status_code
+
+    assert sorted(_in_threads(6, refresh)) == [200] + [401] * 5
+
+
+def test_logout_with_expired_access_token_revokes_refresh_token(client, credentials):
+    pair = _login(client, credentials)
+    user_id = decode_token(pair["token"])["sub"]
+    expired_access = _encode(int(user_id), ACCESS_TOKEN, timedelta(seconds=-5))
+
+    response = client.post(
+        "/auth/logout",
+        json={"refresh_token": pair["refresh_token"]},
+        headers={"Authorization": f"Bearer {expired_access}"},
+    )
+    assert response.status_code == 200
+    assert client.post("/auth/refresh", json={"refresh_token": pair["refresh_token"]}).status_code == 401
+    # Un token expiré reste refusé par les routes protégées
+    assert client.get("/me", headers={"Authorization": f"Bearer {expired_access}"}).status_code == 401
+
+
+def test_logout_revokes_access_token(client, credentials):
+    pair = _login(client, credentials)
+    headers = {"Authorization": f"Bearer {pair['token']}"}
+    assert client.get("/me", headers=headers).status_code == 200
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    assert client.get("/me", headers=headers).status_code == 401
+
+
+def test_logout_rejects_refresh_token_of_another_user(client, credentials):
+    pair = _login(client, credentials)
+    other = (f"{_jti()}@example.com", "autre-mdp")
+    assert client.post("/auth/register", json={"email": other[0], "password": other[1]}).status_code == 201
+    other_pair = _login(client, other)
+    response = client.post(
+        "/auth/logout",
+        json={"refresh_token": other_pair["refresh_token"]},
+        headers={"Authorization": f"Bearer {pair['token']}"},
+    )
+    assert response.status_code == 400
+
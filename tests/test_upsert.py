@@ -0,0 +1,165 @@
+import random
+import string
+import threading
+import pytest
+from sqlalchemy.dialects import postgresql, sqlite
+from config.merge_config import MergeConfig
+from database.cart_identite_national import identity_card_database_service as cin_service
+from database.cart_identite_national.identity_card_entity import CINDataDB, SessionLocal
+from database.upsert import DocumentOwnedByOtherUserError, KEEP_NEWEST, KEEP_NON_EMPTY, merge
+from database.user_stats.user_stats_database_service import get_user_stats
+from models.identity_card_model import CINData
+
+
+def _user_id():
+    return random.randint(10**6, 10**9)
+
+
+def _cin_data(number, adresse_fr="12 RUE DES ORANGERS CASABLANCA", nom_fr="EL AMRANI"):
+    return CINData.model_validate({
+        "cin": number,
+        "identite": {"nom": {"fr": nom_fr, "ar": "العمراني"}, "prenom": {"fr": "FATIMA", "ar": "فاطمة"}},
+        "naissance": {"date": "01.02.1990", "lieu": {"fr": "CASABLANCA", "ar": "الدار البيضاء"}},
+        "adresse": {"fr": adresse_fr, "ar": "12 زنقة البرتقال الدار البيضاء"},
+        "sexe": "F",
+        "validite": "01.02.2030",
+        "parents": {"pere": {"fr": "AHMED", "ar": "أحمد"}, "mere": {"fr": "KHADIJA", "ar": "خديجة"}},
+        "etat_civil": {"numero_etat_civil": "123/1990"},
+    })
+
+
+@pytest.fixture
+def number():
+    return "".join(random.choices(string.ascii_uppercase, k=2)) + "".join(random.choices(string.digits, k=6))
+
+
+def _rows(number):
+    session = SessionLocal()
+    try:
+        return session.query(CINDataDB).filter(CINDataDB.cin == number).all()
+    finally:
+        session.close()
+
+
+def test_rescan_by_owner_merges_and_counts_once(number):
+    owner = _user_id()
+    cin_service.save_cin_data(_cin_data(number), user_id=owner)
+    first = _rows(number)[0]
+    cin_service.save_cin_data(_cin_data(number, adresse_fr="3 AVENUE HASSAN II RABAT"), user_id=owner)
+
+    rows = _rows(number)
+    assert len(rows) == 1
+    assert rows[0].id == first.id and rows[0].created_at == first.created_at
+    assert rows[0].adresse_fr == "3 AVENUE HASSAN II RABAT"
+    assert get_user_stats(owner)["identity_cards"] == 1
+
+
+def test_keep_non_empty_keeps_previous_values(number, monkeypatch):
+    owner = _user_id()
+    cin_service.save_cin_data(_cin_data(number), user_id=owner)
+    monkeypatch.setattr(MergeConfig, "POLICY", KEEP_NON_EMPTY)
+    cin_service.save_cin_data(_cin_data(number, adresse_fr=""), user_id=owner)
+    assert _rows(number)[0].adresse_fr == "12 RUE DES ORANGERS CASABLANCA"
+
+    monkeypatch.setattr(MergeConfig, "POLICY", KEEP_NEWEST)
+    cin_service.save_cin_data(_cin_data(number, adresse_fr=""), user_id=owner)
+    assert _rows(number)[0].adresse_fr == ""
+
+
+def test_rescan_by_other_user_changes_nothing(number):
+    owner, other = _user_id(), _user_id()
+    cin_service.save_cin_data(_cin_data(number), user_id=owner)
+    with pytest.raises(DocumentOwnedByOtherUserError):
+        cin_service.save_cin_data(_cin_data(number, nom_fr="BENNANI"), user_id=other)
+
+    rows = _rows(number)
+    assert len(rows) == 1
+    assert rows[0].user_id == owner and rows[0].nom_fr == "EL AMRANI"
+    assert get_user_stats(other)["identity_cards"] == 0
+
+
+def test_failed_save_rolls_back_document_and_stats(number, monkeypatch):
+    owner = _user_id()
+
+    def failing_record(*args):
+        raise RuntimeError("panne")
+
+    monkeypatch.setattr(cin_service, "record_document", failing_record)
+    with pytest.raises(RuntimeError):
+        cin_service.save_cin_data(_cin_data(number), user_id=owner)
+    assert _rows(number) == []
+    assert get_user_stats(owner)["identity_cards"] == 0
+
+
+def test_failed_merge_keeps_previous_row(number, monkeypatch):
+    owner = _user_id()
+    cin_service.save_cin_data(_cin_data(number), user_id=owner)
+
+    def failing_commit(self):
+        raise RuntimeError("panne")
+
+    # Échec du commit : la fusion est annulée avec le reste de la transaction
+    monkeypatch.setattr(SessionLocal.class_, "commit", failing_commit)
+    with pytest.raises(RuntimeError):
+        cin_service.save_cin_data(_cin_data(number, adresse_fr="3 AVENUE HASSAN II RABAT"), user_id=owner)
+    monkeypatch.undo()
+    assert _rows(number)[0].adresse_fr == "12 RUE DES ORANGERS CASABLANCA"
+
+
+def test_concurrent_saves_of_same_document(number):
+    owner = _user_id()
+    errors = []
+    start = threading.Barrier(6)
+
+    def save():
+        start.wait()
+        try:
+            cin_service.save_cin_data(_cin_data(number), user_id=owner)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(_rows(number)) == 1
+    assert get_user_stats(owner)["identity_cards"] == 1
+
+
+def _insert_legacy(number):
+    session = SessionLocal()
+    try:
+        session.add(CINDataDB(cin=number, nom_fr="EL AMRANI", adresse_fr="ANCIENNE ADRESSE", user_id=None))
+        session.commit()
+    finally:
+        session.close()
+
+
+def test_first_rescan_claims_row_without_owner(number):
+    claimer, other = _user_id(), _user_id()
+    _insert_legacy(number)
+    cin_service.save_cin_data(_cin_data(number), user_id=claimer)
+
+    row = _rows(number)[0]
+    assert row.user_id == claimer and row.adresse_fr == "12 RUE DES ORANGERS CASABLANCA"
+    with pytest.raises(DocumentOwnedByOtherUserError):
+        cin_service.save_cin_data(_cin_data(number), user_id=other)
+    assert _rows(number)[0].user_id == claimer
+
+
+@pytest.mark.parametrize("dialect", [postgresql.dialect(), sqlite.dialect()], ids=["postgresql", "sqlite"])
+def test_merge_claims_rows_without_owner_in_every_dialect(dialect):
+    values = {"cin": "AB123456", "nom_fr": "EL AMRANI", "user_id": 7}
+    statement = merge(dialect.name, CINDataDB.__table__, values, "cin", KEEP_NEWEST)
+    sql = " ".join(str(statement.compile(dialect=dialect)).split())
+
+    assert "user_id = excluded.user_id" in sql.split(" WHERE ")[0]
+    assert "WHERE cin_data.user_id IS NULL OR cin_data.user_id = excluded.user_id" in sql
+
+
+def test_unsupported_dialect_is_rejected():
+    with pytest.raises(ValueError):
+        merge("mysql", CINDataDB.__table__, {"cin": "AB123456", "user_id": 7}, "cin", KEEP_NEWEST)
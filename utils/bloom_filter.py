@@ -0,0 +1,51 @@
+"""
+Filtre de Bloom : ensemble compact à réponse probabiliste.
+
+`x in bloom` vaut False si x n'a jamais été ajouté (aucun faux négatif) et
+True pour un élément ajouté ou, avec une probabilité proche de
+`error_rate` tant que `capacity` n'est pas dépassée, pour un élément absent.
+Une réponse positive doit donc être confirmée par une source exacte.
+
+Les k positions sont dérivées d'un seul condensé blake2b (double hachage
+de Kirsch-Mitzenmacher).
+"""
+import hashlib
+import math
+import threading
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        positions = self._positions(item)
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def saturated(self) -> bool:
+        """Au-delà de la capacité, le taux de faux positifs dépasse error_rate."""
+        return self.count > self.capacity
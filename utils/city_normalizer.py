@@ -0,0 +1,72 @@
+"""
+Normalisation des villes marocaines à partir du lieu de naissance / de l'adresse.
+
+Le gazetteer (CITY_GAZETTEER_PATH, par défaut utils/data/moroccan_cities.json)
+liste pour chaque ville un code et ses graphies française et arabe. Toutes
+les graphies sont compilées en une seule expression régulière (alternance,
+plus longues d'abord, bornée aux limites de mot) : un texte est classé en un
+seul passage, au lieu d'une chaîne de tests `in` répétée à chaque affichage.
+
+Le classement est fait une fois à l'enregistrement (colonne city_code) ;
+le graphique des villes n'est plus qu'un GROUP BY sur cette colonne.
+"""
+import json
+import re
+import unicodedata
+from config.city_config import CityConfig
+
+# Accents latins, harakat arabes et tatweel, retirés après décomposition NFKD
+_MARKS = re.compile("[\u0300-\u036f\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_SPACES = re.compile(r"[\s\-]+")
+
+
+def fold(text: str) -> str:
+    """Forme de comparaison : sans accents ni diacritiques, majuscules, espaces simples."""
+    text = _MARKS.sub("", unicodedata.normalize("NFKD", text))
+    return _SPACES.sub(" ", text).strip().upper()
+
+
+class CityNormalizer:
+    def __init__(self, gazetteer: dict):
+        self.other = gazetteer.get("other", "AUTRES")
+        self.codes = {}
+        for city in gazetteer["cities"]:
+            for spelling in city.get("fr", []) + city.get("ar", []):
+                self.codes.setdefault(fold(spelling), city["code"])
+
+        alternatives = sorted(self.codes, key=len, reverse=True)
+        self.pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, alternatives)) + r")\b")
+
+    @classmethod
+    def from_file(cls, path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def match(self, text):
+        """Code de la première ville trouvée dans le texte, ou None."""
+        if not text:
+            return None
+        found = self.pattern.search(fold(text))
+        return self.codes[found.group(0)] if found else None
+
+    def normalize(self, *texts) -> str:
+        """Code de ville du premier texte reconnu (ex: lieu_fr, adresse_fr, lieu_ar...)."""
+        for text in texts:
+            code = self.match(text)
+            if code:
+                return code
+        return self.other
+
+
+_normalizer = None
+
+
+def get_city_normalizer() -> CityNormalizer:
+    global _normalizer
+    if _normalizer is None:
+        _normalizer = CityNormalizer.from_file(CityConfig.GAZETTEER_PATH)
+    return _normalizer
+
+
+def normalize_city(*texts) -> str:
+    return get_city_normalizer().normalize(*texts)
@@ -0,0 +1,63 @@
+"""
+Instrumentation partagée du pipeline de traitement des documents.
+
+Étapes mesurées : upload_save, ocr_recto, ocr_verso, duplicate_check,
+llm_parse, validation, db_insert. Chaque mesure est étiquetée par type de
+document (cin, permis, gris) et par issue (success, error, rejected) ;
+les durées sont aussi reportées dans les logs de la requête en cours et,
+si elle est tracée, chaque étape est un span enfant de la requête.
+"""
+import time
+from contextlib import contextmanager
+from middlewares.concurrency import StageOverloadedError
+from utils.logger import record_stage
+from utils.tracing import set_attributes, span
+from utils.metrics import (
+    pipeline_stage_duration_seconds,
+    llm_tokens_total,
+    ocr_pages_total,
+    ocr_lines_total,
+)
+
+
+@contextmanager
+def pipeline_stage(document_type: str, stage: str):
+    start = time.perf_counter()
+    outcome = "success"
+    with span(stage, {"document.type": document_type}) as stage_span:
+        try:
+            yield
+        except StageOverloadedError:
+            outcome = "rejected"
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            pipeline_stage_duration_seconds.labels(
+                document_type=document_type, stage=stage, outcome=outcome
+            ).observe(elapsed)
+            record_stage(stage, elapsed)
+            if stage_span is not None:
+                stage_span.set_attribute("outcome", outcome)
+
+
+def record_llm_usage(document_type: str, usage):
+    """
+    Comptabilise l'objet `usage` d'une réponse OpenAI / Azure AI Inference ;
+    appelée dans l'étape llm_parse, dont le span reçoit les tokens.
+    """
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or 0
+    llm_tokens_total.labels(document_type=document_type, kind="prompt").inc(prompt_tokens)
+    llm_tokens_total.labels(document_type=document_type, kind="completion").inc(completion_tokens)
+    set_attributes({"gen_ai.usage.input_tokens": prompt_tokens, "gen_ai.usage.output_tokens": completion_tokens})
+
+
+def record_ocr_result(document_type: str, pages: int, lines: int):
+    ocr_pages_total.labels(document_type=document_type).inc(pages)
+    ocr_lines_total.labels(document_type=document_type).inc(lines)
+    set_attributes({"ocr.pages": pages, "ocr.lines": lines})
@@ -0,0 +1,90 @@
+"""
+Sérialisation JSON rapide basée sur orjson.
+
+- `OrjsonProvider` remplace le fournisseur JSON de Flask : jsonify, les
+  retours de dict des routes et `current_app.json.dumps` passent tous par
+  orjson. Les dates et datetimes gardent le format HTTP-date du fournisseur
+  Flask par défaut (`Thu, 01 Feb 1990 00:00:00 GMT`), inchangé pour les clients.
+- `rows_response` / `stream_rows_response` sérialisent directement des
+  lignes SQL (tuples) sans passer par des objets ORM.
+"""
+import decimal
+from datetime import date
+import orjson
+from flask import Response, stream_with_context
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+
+# Dates passées à _default au lieu de l'encodage ISO 8601 natif d'orjson
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _default(obj):
+    # Types non gérés nativement par orjson (même rendu que le fournisseur Flask)
+    if isinstance(obj, date):
+        return http_date(obj)
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj, indent: bool = False) -> bytes:
+    option = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else ORJSON_OPTIONS
+    return orjson.dumps(obj, default=_default, option=option)
+
+
+class OrjsonProvider(JSONProvider):
+    mimetype = "application/json"
+    compact = None
+
+    def dumps(self, obj, **kwargs) -> str:
+        return dumps_bytes(obj, indent="indent" in kwargs).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def _indent(self) -> bool:
+        return (self.compact is None and self._app.debug) or self.compact is False
+
+    def response(self, *args, **kwargs) -> Response:
+        # Le corps reste en bytes : pas d'aller-retour str -> bytes
+        obj = self._prepare_response_obj(args, kwargs)
+        body = dumps_bytes(obj, indent=self._indent()) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def rows_to_dicts(columns, rows) -> list:
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def rows_response(columns, rows) -> Response:
+    """Réponse JSON (liste d'objets) construite à partir de tuples SQL."""
+    return Response(dumps_bytes(rows_to_dicts(columns, rows)), mimetype="application/json")
+
+
+def stream_rows_response(columns, batches) -> Response:
+    """
+    Réponse JSON envoyée par morceaux : un tableau encodé lot par lot.
+
+    `batches` est un itérable de listes de tuples ; la mémoire reste bornée
+    à un lot quelle que soit la taille de la table. Sa méthode `close()`,
+    si elle existe, est appelée à la fin de la réponse, même interrompue.
+    """
+    def generate():
+        yield b"["
+        first = True
+        for batch in batches:
+            if not batch:
+                continue
+            chunk = dumps_bytes(rows_to_dicts(columns, batch))[1:-1]
+            yield chunk if first else b"," + chunk
+            first = False
+        yield b"]"
+
+    response = Response(stream_with_context(generate()), mimetype="application/json")
+    close = getattr(batches, "close", None)
+    if close is not None:
+        response.call_on_close(close)
+    return response
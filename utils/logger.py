@@ -1,11 +1,172 @@
+"""
+Logs structurés et non bloquants.
+
+Les threads de requête ne font jamais d'entrée/sortie : chaque message est
+mis en file (`QueueHandler`) et écrit sur stdout par un thread dédié
+(`QueueListener`). File pleine, le message est abandonné et compté dans
+`log_records_dropped_total`.
+
+Chaque ligne porte l'identifiant de la requête en cours (en-tête
+X-Request-ID reçu ou généré) et les durées des étapes du pipeline déjà
+mesurées (`pipeline_stage`). Les messages fréquents passent
+`extra={"sample_rate": ...}` : seule cette fraction est écrite, avec le
+taux dans le champ `sample_rate`.
+
+Usage : `logger = get_logger(__name__)` puis `logger.info(...)`, les champs
+passés dans `extra` deviennent des clés JSON.
+"""
+import atexit
+import contextvars
 import logging
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+import orjson
+from config.logging_config import LoggingConfig
+from utils.metrics import log_records_dropped_total
+
+ROOT_LOGGER = "cin-agent"
+
+_request_id = contextvars.ContextVar("request_id", default=None)
+_stages = contextvars.ContextVar("stages", default=None)
+
+# Attributs standards d'un LogRecord : tout le reste vient de `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+def bind_request(request_id: str) -> None:
+    """Associe les logs du contexte courant (thread ou greenlet de la requête) à `request_id`."""
+    _request_id.set(request_id)
+    _stages.set({})
+
+
+def unbind_request() -> None:
+    _request_id.set(None)
+    _stages.set(None)
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Ajoute la durée d'une étape aux logs de la requête en cours (cumulée si l'étape se répète)."""
+    stages = _stages.get()
+    if stages is not None:
+        stages[stage] = round(stages.get(stage, 0.0) + seconds * 1000, 2)
+
+
+def stage_timings() -> dict:
+    """Durées des étapes de la requête en cours, en millisecondes."""
+    return dict(_stages.get() or {})
+
+
+class RequestContextFilter(logging.Filter):
+    """Exécuté dans le thread appelant : les contextvars y sont encore lisibles."""
+
+    def filter(self, record):
+        sample_rate = getattr(record, "sample_rate", None)
+        if sample_rate is not None and record.levelno < logging.WARNING and random.random() >= sample_rate:
+            return False
+        record.request_id = _request_id.get()
+        stages = _stages.get()
+        if stages and not hasattr(record, "stages"):
+            record.stages = dict(stages)
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped_total.inc()
+
+    def prepare(self, record):
+        # Message et trace formatés ici ; le formateur de sortie garde la
+        # trace dans un champ séparé au lieu de la concaténer au message
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode("utf-8")
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s [%(levelname)s] %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        request_id = getattr(record, "request_id", None)
+        return f"{line} [request_id={request_id}]" if request_id else line
+
+
+_listener = None
+_configure_lock = threading.Lock()
+
+
+def _start_listener():
+    global _listener
+    log_queue = queue.Queue(maxsize=LoggingConfig.QUEUE_SIZE)
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(TextFormatter() if LoggingConfig.FORMAT == "text" else JsonFormatter())
+
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(RequestContextFilter())
+    root = logging.getLogger(ROOT_LOGGER)
+    for previous in list(root.handlers):
+        root.removeHandler(previous)
+    root.addHandler(handler)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _configure():
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(LoggingConfig.LEVEL)
+    # Pas de double écriture par le logger racine de Python
+    root.propagate = False
+    _start_listener()
+    atexit.register(_stop_listener)
+    # Le thread d'écriture n'existe pas dans un processus forké (workers Gunicorn avec preload_app)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_start_listener)
+
 
-def get_logger(name="cin-agent"):
-    logger = logging.getLogger(name)
-    if not logger.handlers:
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
-    return logger
+def get_logger(name=ROOT_LOGGER):
+    if _listener is None:
+        with _configure_lock:
+            if _listener is None:
+                _configure()
+    if name == ROOT_LOGGER or name.startswith(ROOT_LOGGER + "."):
+        return logging.getLogger(name)
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
@@ -0,0 +1,206 @@
+"""
+Métriques Prometheus partagées par l'application.
+
+Les métriques sont déclarées au niveau du module pour n'être enregistrées
+qu'une seule fois dans le registre, même si `create_app()` est appelé
+plusieurs fois (tests, scripts).
+
+En mode multiprocess (PROMETHEUS_MULTIPROC_DIR défini, cf. gunicorn.conf.py)
+chaque worker écrit ses valeurs dans ce dossier et `/metrics` les agrège ;
+les jauges utilisent `livesum` pour additionner les workers vivants.
+"""
+import os
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+
+REQUEST_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+requests_total = Counter(
+    "requests_total",
+    "Total HTTP requests",
+    ["method", "endpoint"]
+)
+
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Durée des requêtes HTTP par route",
+    ["endpoint", "method", "status"],
+    buckets=REQUEST_DURATION_BUCKETS,
+)
+
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "Requêtes HTTP en cours de traitement",
+    ["endpoint", "method"],
+    multiprocess_mode="livesum",
+)
+
+STAGE_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+stage_semaphore_wait_seconds = Histogram(
+    "stage_semaphore_wait_seconds",
+    "Temps d'attente pour obtenir un slot de concurrence",
+    ["stage"],
+    buckets=STAGE_WAIT_BUCKETS,
+)
+
+stage_rejections_total = Counter(
+    "stage_rejections_total",
+    "Requêtes rejetées faute de slot de concurrence disponible",
+    ["stage"],
+)
+
+stage_in_flight = Gauge(
+    "stage_in_flight",
+    "Nombre d'appels en cours par étape",
+    ["stage"],
+    multiprocess_mode="livesum",
+)
+
+PIPELINE_STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0)
+
+pipeline_stage_duration_seconds = Histogram(
+    "pipeline_stage_duration_seconds",
+    "Durée de chaque étape du pipeline de traitement des documents",
+    ["document_type", "stage", "outcome"],
+    buckets=PIPELINE_STAGE_BUCKETS,
+)
+
+llm_tokens_total = Counter(
+    "llm_tokens_total",
+    "Tokens consommés par les appels LLM",
+    ["document_type", "kind"],
+)
+
+ocr_pages_total = Counter(
+    "ocr_pages_total",
+    "Pages analysées par l'OCR",
+    ["document_type"],
+)
+
+ocr_lines_total = Counter(
+    "ocr_lines_total",
+    "Lignes de texte extraites par l'OCR",
+    ["document_type"],
+)
+
+
+cache_requests_total = Counter(
+    "cache_requests_total",
+    "Lectures du cache partagé",
+    ["namespace", "backend", "result"],
+)
+
+cache_evictions_total = Counter(
+    "cache_evictions_total",
+    "Entrées évincées du cache (capacité ou expiration)",
+    ["backend"],
+)
+
+
+COMPRESSION_DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+response_compression_bytes_saved_total = Counter(
+    "response_compression_bytes_saved_total",
+    "Octets économisés par la compression des réponses",
+    ["encoding"],
+)
+
+response_compression_duration_seconds = Histogram(
+    "response_compression_duration_seconds",
+    "Temps CPU passé à compresser une réponse",
+    ["encoding", "streamed"],
+    buckets=COMPRESSION_DURATION_BUCKETS,
+)
+
+
+PASSWORD_HASH_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+password_hash_duration_seconds = Histogram(
+    "password_hash_duration_seconds",
+    "Temps de calcul bcrypt dans le pool de hachage",
+    ["operation"],
+    buckets=PASSWORD_HASH_BUCKETS,
+)
+
+password_hash_queue_wait_seconds = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Attente dans la file du pool de hachage avant le calcul bcrypt",
+    ["operation"],
+    buckets=PASSWORD_HASH_BUCKETS,
+)
+
+password_rehash_total = Counter(
+    "password_rehash_total",
+    "Mots de passe rehachés au login après un changement de BCRYPT_ROUNDS",
+)
+
+
+rate_limit_rejections_total = Counter(
+    "rate_limit_rejections_total",
+    "Tentatives rejetées (429) par la limitation de débit",
+    ["scope", "key_type"],
+)
+
+
+quota_documents_total = Counter(
+    "quota_documents_total",
+    "Documents admis sur les endpoints /process",
+    ["document_type"],
+)
+
+quota_rejections_total = Counter(
+    "quota_rejections_total",
+    "Documents refusés (429) par les quotas",
+    ["document_type", "scope", "quota"],
+)
+
+quota_in_flight_documents = Gauge(
+    "quota_in_flight_documents",
+    "Documents /process admis par les quotas et en cours de traitement",
+    ["document_type"],
+    multiprocess_mode="livesum",
+)
+
+
+idempotency_requests_total = Counter(
+    "idempotency_requests_total",
+    "Requêtes /process portant un Idempotency-Key, par issue",
+    ["document_type", "result"],
+)
+
+
+duplicate_checks_total = Counter(
+    "duplicate_checks_total",
+    "Contrôles de doublon avant l'appel LLM (miss, false_positive, unconfirmed, other_owner, unclaimed, duplicate)",
+    ["document_type", "result"],
+)
+
+
+log_records_dropped_total = Counter(
+    "log_records_dropped_total",
+    "Messages de log abandonnés, file d'écriture pleine",
+)
+
+
+trace_spans_dropped_total = Counter(
+    "trace_spans_dropped_total",
+    "Spans non exportés (file pleine, échec d'export)",
+    ["reason"],
+)
+
+
+def render_latest():
+    """Sérialise les métriques, agrégées sur tous les workers en mode multiprocess."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
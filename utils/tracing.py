@@ -0,0 +1,309 @@
+"""
+Traces des requêtes, exportées au format OTLP/JSON.
+
+Un span racine par requête HTTP, un span enfant par étape du pipeline
+(`pipeline_stage` : upload_save, ocr_recto, ocr_verso, duplicate_check,
+llm_parse avec les tokens consommés, validation, db_insert).
+
+- Échantillonnage à la racine : TRACE_SAMPLE_RATIO des requêtes, ou la
+  décision portée par un en-tête W3C `traceparent` entrant (la trace se
+  rattache alors à celle de l'appelant). Hors échantillon, aucun span n'est
+  créé : `span()` se réduit à la lecture d'une contextvar.
+- Les spans terminés sont mis en file et exportés par lots depuis un
+  thread dédié, vers un fichier (une ExportTraceServiceRequest par ligne)
+  ou un collecteur OTLP/HTTP. File pleine, ils sont abandonnés.
+- Tâches exécutées dans un autre processus (pool bcrypt) : `record_span`
+  rattache au span courant un span dont les horodatages ont été mesurés
+  par le processus de la tâche.
+"""
+import atexit
+import contextvars
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+import orjson
+import requests
+from config.tracing_config import TracingConfig
+from utils.logger import get_logger
+from utils.metrics import trace_spans_dropped_total
+
+logger = get_logger(__name__)
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_id(bits: int) -> str:
+    # Identifiant nul interdit par la spécification W3C
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_span_id", "name", "kind", "start_ns", "end_ns", "attributes",
+                 "status", "status_message")
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: str = None, kind: int = SPAN_KIND_INTERNAL,
+                 start_ns: int = None, attributes: dict = None):
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_OK
+        self.status_message = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, error) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+
+    def end(self, end_ns: int = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        _processor.submit(self)
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def encode_spans(spans, service_name: str) -> bytes:
+    """ExportTraceServiceRequest OTLP/JSON (corps de POST /v1/traces)."""
+    return orjson.dumps({
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+            "scopeSpans": [{
+                "scope": {"name": "utils.tracing"},
+                "spans": [span.to_otlp() for span in spans],
+            }],
+        }],
+    })
+
+
+class FileSpanExporter:
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, payload: bytes) -> None:
+        # Une seule écriture en mode ajout : les lignes des workers ne s'entremêlent pas
+        with open(self.path, "ab") as f:
+            f.write(payload + b"\n")
+
+
+class OTLPHttpSpanExporter:
+    def __init__(self, endpoint: str, timeout: float):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def export(self, payload: bytes) -> None:
+        response = self.session.post(
+            self.endpoint, data=payload, headers={"Content-Type": "application/json"}, timeout=self.timeout
+        )
+        response.raise_for_status()
+
+
+def create_exporter():
+    if TracingConfig.EXPORTER == "otlp_http":
+        return OTLPHttpSpanExporter(TracingConfig.OTLP_ENDPOINT, TracingConfig.OTLP_TIMEOUT_SECONDS)
+    if TracingConfig.EXPORTER == "file":
+        return FileSpanExporter(TracingConfig.EXPORT_FILE)
+    raise ValueError(f"⚠️ TRACE_EXPORTER inconnu : {TracingConfig.EXPORTER}")
+
+
+class BatchSpanProcessor:
+    def __init__(self, exporter_factory, queue_size: int, batch_size: int, interval: float, service_name: str):
+        self.exporter_factory = exporter_factory
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.interval = interval
+        self.service_name = service_name
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            # File et thread hérités d'un autre processus (preload_app) inutilisables
+            if self._pid != os.getpid():
+                exporter = self.exporter_factory()
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._queue, exporter), name="trace-exporter", daemon=True
+                )
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def submit(self, span: Span) -> None:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            trace_spans_dropped_total.labels(reason="queue_full").inc()
+
+    def _run(self, span_queue, exporter):
+        while True:
+            batch = []
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                try:
+                    span = span_queue.get(timeout=max(deadline - time.monotonic(), 0.001))
+                except queue.Empty:
+                    break
+                if span is None:
+                    self._export(exporter, batch)
+                    return
+                batch.append(span)
+            self._export(exporter, batch)
+
+    def _export(self, exporter, batch):
+        if not batch:
+            return
+        try:
+            exporter.export(encode_spans(batch, self.service_name))
+        except Exception as e:
+            trace_spans_dropped_total.labels(reason="export_error").inc(len(batch))
+            logger.warning("Export des spans échoué", extra={"error": str(e), "spans": len(batch)})
+
+    def shutdown(self):
+        """Exporte les spans en attente et arrête le thread (relancé au prochain span)."""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            try:
+                self._queue.put(None, timeout=1)
+            except queue.Full:
+                return
+            self._thread.join(timeout=self.interval + TracingConfig.OTLP_TIMEOUT_SECONDS)
+            self._pid = None
+
+
+_processor = BatchSpanProcessor(
+    create_exporter,
+    TracingConfig.QUEUE_SIZE,
+    TracingConfig.BATCH_SIZE,
+    TracingConfig.EXPORT_INTERVAL_SECONDS,
+    TracingConfig.SERVICE_NAME,
+)
+atexit.register(_processor.shutdown)
+
+
+def flush() -> None:
+    _processor.shutdown()
+
+
+def start_request_span(name: str, traceparent: str = None, attributes: dict = None):
+    """Ouvre le span racine de la requête, ou retourne None si elle n'est pas échantillonnée."""
+    parent = TRACEPARENT.match(traceparent.strip().lower()) if traceparent else None
+    if parent:
+        trace_id, parent_span_id, flags = parent.groups()
+        if not int(flags, 16) & 1:
+            return None
+    elif random.random() < TracingConfig.SAMPLE_RATIO:
+        trace_id, parent_span_id = _new_id(128), None
+    else:
+        return None
+    root = Span(name, trace_id, parent_span_id, SPAN_KIND_SERVER, attributes=attributes)
+    _current_span.set(root)
+    return root
+
+
+def end_request_span(root: Span, error: BaseException = None) -> None:
+    if error is not None:
+        root.set_error(error)
+    _current_span.set(None)
+    root.end()
+
+
+def current_span():
+    return _current_span.get()
+
+
+def current_traceparent():
+    """En-tête traceparent à transmettre à un appel sortant, ou None hors trace."""
+    parent = _current_span.get()
+    return parent.traceparent() if parent is not None else None
+
+
+@contextmanager
+def span(name: str, attributes: dict = None):
+    """Span enfant du span courant ; sans trace en cours, ne fait rien (yield None)."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, parent.trace_id, parent.span_id, attributes=attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.set_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+def set_attributes(attributes: dict) -> None:
+    """Ajoute des attributs au span courant (ex: tokens LLM sur llm_parse)."""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def record_span(name: str, start_time: float, end_time: float, attributes: dict = None) -> None:
+    """Span déjà terminé (horodatages time.time() mesurés ailleurs), enfant du span courant."""
+    parent = _current_span.get()
+    if parent is None:
+        return
+    child = Span(name, parent.trace_id, parent.span_id, start_ns=int(start_time * 1e9), attributes=attributes)
+    child.end(int(end_time * 1e9))